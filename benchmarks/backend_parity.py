@@ -0,0 +1,121 @@
+# benchmarks/backend_parity.py
+# PyTorch (Ultralytics) çıkarımı ile dışa aktarılmış ONNX / OpenVINO çıkarımını aynı kareler
+# üzerinde karşılaştırır: kare başına kişi sayısı farkı, eşleşen kutuların IoU'su, güven farkı
+# ve kare/sn. Sayı farkı toleransı aşan arka uç "BAŞARISIZ" olarak işaretlenir.
+# Kullanım: python -m benchmarks.backend_parity --backends onnx openvino --max-frames 200 --threads 2
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+
+import config
+from benchmarks.batch_throughput import load_frames
+from features.detection_filter import pairwise_iou
+from features.exported_model import BACKEND_ONNX, BACKEND_OPENVINO, BACKEND_PYTORCH, load_detector
+
+MATCH_IOU = 0.5  # Bu IoU'nun üstündeki kutular aynı kişi kabul edilir
+
+
+def run_detector(detector, frames, batch_size):
+    """Tüm kareleri işler; (kare başına tespitler, kare/sn) döndürür"""
+    detector.detect(frames[:batch_size])  # Isınma
+    detections = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        detections.extend(detector.detect(frames[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+    return detections, (len(frames) / elapsed if elapsed > 0 else 0.0)
+
+
+def match_boxes(reference, candidate):
+    """Referans kutuları adaya açgözlü eşler; (eşleşme IoU'ları, güven farkları) döndürür"""
+    if len(reference) == 0 or len(candidate) == 0:
+        return [], []
+    boxes = np.concatenate([reference[:, :4], candidate[:, :4]])
+    iou = pairwise_iou(boxes)[:len(reference), len(reference):]
+    ious, conf_deltas = [], []
+    used = np.zeros(len(candidate), dtype=bool)
+    for ref_index in np.argsort(-reference[:, 4]):
+        row = np.where(used, -1.0, iou[ref_index])
+        best = int(row.argmax())
+        if row[best] >= MATCH_IOU:
+            used[best] = True
+            ious.append(float(row[best]))
+            conf_deltas.append(abs(float(reference[ref_index, 4] - candidate[best, 4])))
+    return ious, conf_deltas
+
+
+def compare(reference, candidate):
+    """Kare bazlı sayı farkı ve kutu eşleşme istatistikleri"""
+    count_deltas = np.array([len(c) - len(r) for r, c in zip(reference, candidate)])
+    ious, conf_deltas = [], []
+    for r, c in zip(reference, candidate):
+        frame_ious, frame_conf_deltas = match_boxes(r, c)
+        ious.extend(frame_ious)
+        conf_deltas.extend(frame_conf_deltas)
+    reference_boxes = sum(len(r) for r in reference)
+    return {
+        "mismatched_frames": int((count_deltas != 0).sum()),
+        "max_count_delta": int(np.abs(count_deltas).max()) if len(count_deltas) else 0,
+        "mean_count_delta": float(count_deltas.mean()) if len(count_deltas) else 0.0,
+        "match_ratio": len(ious) / reference_boxes if reference_boxes else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "max_conf_delta": float(np.max(conf_deltas)) if conf_deltas else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorch / ONNX / OpenVINO doğruluk ve hız karşılaştırması")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--backends", nargs="+", choices=[BACKEND_ONNX, BACKEND_OPENVINO],
+                        default=[BACKEND_ONNX, BACKEND_OPENVINO])
+    parser.add_argument("--max-frames", type=int, default=200, help="Video başına okunacak kare sayısı")
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=config.TORCH_THREADS_PER_WORKER,
+                        help="Tüm arka uçların kullanacağı thread sayısı (adil karşılaştırma için)")
+    parser.add_argument("--max-mismatch-ratio", type=float, default=0.02,
+                        help="Sayısı PyTorch'tan farklı olan karelerin izin verilen en yüksek oranı")
+    args = parser.parse_args()
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    import torch
+    torch.set_num_threads(args.threads)
+
+    frames = []
+    for video_file in video_files:
+        frames.extend(load_frames(video_file, args.max_frames))
+    print(f"🎞️ {len(video_files)} videodan {len(frames)} kare, batch={args.batch_size}, thread={args.threads}")
+
+    reference, reference_fps = run_detector(load_detector(BACKEND_PYTORCH), frames, args.batch_size)
+    print(f"\n{'arka uç':<10}{'fps':>8}{'hızlanma':>10}{'farklı kare':>13}{'maks fark':>11}"
+          f"{'eşleşme %':>11}{'ort. IoU':>10}{'maks Δconf':>12}  sonuç")
+    print(f"{BACKEND_PYTORCH:<10}{reference_fps:>8.2f}{1.0:>9.2f}x")
+
+    failed = False
+    for backend in args.backends:
+        try:
+            detector = load_detector(backend, intra_op_threads=args.threads)
+        except ImportError as e:
+            print(f"{backend:<10} atlandı: {e}")
+            continue
+        detections, fps = run_detector(detector, frames, args.batch_size)
+        stats = compare(reference, detections)
+        passed = stats["mismatched_frames"] <= args.max_mismatch_ratio * len(frames)
+        failed |= not passed
+        speedup = fps / reference_fps if reference_fps else 0.0
+        print(f"{backend:<10}{fps:>8.2f}{speedup:>9.2f}x{stats['mismatched_frames']:>13}"
+              f"{stats['max_count_delta']:>11}{stats['match_ratio'] * 100:>11.1f}{stats['mean_iou']:>10.3f}"
+              f"{stats['max_conf_delta']:>12.3f}  {'✅ GEÇTİ' if passed else '❌ BAŞARISIZ'}")
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/batch_throughput.py
+# Farklı batch boyutlarında tespit + takip hızını (kare/sn) karşılaştırır.
+# Kullanım: python -m benchmarks.batch_throughput --batch-sizes 1 4 8 16 --max-frames 300
+import argparse
+import glob
+import os
+import time
+
+import cv2
+from ultralytics import YOLO
+
+import config
+from features.inference import BatchedTracker, FrameTracker, UltralyticsDetector
+
+DEFAULT_BATCH_SIZES = [1, 4, 8, 16]
+
+
+def load_frames(video_file, max_frames):
+    """Çözümleme süresini ölçüme katmamak için kareleri önceden belleğe okur"""
+    cap = cv2.VideoCapture(video_file)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (config.VIDEO_WIDTH, config.VIDEO_HEIGHT)))
+    cap.release()
+    return frames
+
+
+def measure_fps(model, frames, batch_size):
+    """Verilen karelerin tamamını batch_size'lık gruplarla işler ve kare/sn döndürür"""
+    batched_tracker = BatchedTracker(UltralyticsDetector(model), FrameTracker())
+    # İlk çağrıdaki model ısınma maliyetini ölçüme katma
+    batched_tracker.detector.detect(frames[:batch_size])
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        batched_tracker.track(frames[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed if elapsed > 0 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch boyutuna göre çıkarım hızı karşılaştırması")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--max-frames", type=int, default=300)
+    args = parser.parse_args()
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    model = YOLO(config.MODEL_NAME)
+    totals = {batch_size: [] for batch_size in args.batch_sizes}
+
+    print(f"{'video':<20}" + "".join(f"{f'batch={b}':>12}" for b in args.batch_sizes))
+    for video_file in video_files:
+        frames = load_frames(video_file, args.max_frames)
+        if not frames:
+            continue
+        row = f"{os.path.basename(video_file):<20}"
+        for batch_size in args.batch_sizes:
+            fps = measure_fps(model, frames, batch_size)
+            totals[batch_size].append(fps)
+            row += f"{fps:>12.2f}"
+        print(row)
+
+    row = f"{'ortalama':<20}"
+    for batch_size in args.batch_sizes:
+        values = totals[batch_size]
+        row += f"{(sum(values) / len(values) if values else 0.0):>12.2f}"
+    print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# benchmarks/counting.py
+# Benchmark'ların ortak sayım döngüsü: process_video ile aynı takip, filtre ve bölge mantığı,
+# ama depolama/çizim olmadan. Farklı modelleri/ayarları sayım sonucuyla karşılaştırmak için.
+import time
+
+import numpy as np
+
+import config
+from features.detection_filter import filter_detections
+from features.counting import TrackedIdSet
+from features.inference import BatchedTracker, FrameTracker
+from features.zone_lookup import COUNTING_ZONE_NAME, anchor_points
+
+
+def count_video(detector, frames, batch_size, zone_lookup):
+    """
+    Kareleri takip ederek sayar. (sayım bölgesine giren farklı kişi sayısı,
+    kare başına bölgedeki kişi tespiti sayıları, kare/sn) döndürür.
+    """
+    batched_tracker = BatchedTracker(detector, FrameTracker())
+    people_tracked = TrackedIdSet()
+    in_zone_per_frame = np.zeros(len(frames), dtype=np.int32)
+    frame_index = 0
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        for tracks in batched_tracker.track(frames[i:i + batch_size]):
+            boxes = filter_detections(tracks, config.VIDEO_WIDTH, config.VIDEO_HEIGHT)
+            if len(boxes):
+                in_zone = zone_lookup.contains(COUNTING_ZONE_NAME, anchor_points(boxes))
+                in_zone &= boxes[:, 6] == config.PERSON_ID
+                people_tracked.add(boxes[in_zone, 4].astype(np.int64))
+                in_zone_per_frame[frame_index] = int(in_zone.sum())
+            frame_index += 1
+    elapsed = time.perf_counter() - start
+    return len(people_tracked), in_zone_per_frame, (len(frames) / elapsed if elapsed > 0 else 0.0)
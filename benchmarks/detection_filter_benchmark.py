@@ -0,0 +1,95 @@
+# benchmarks/detection_filter_benchmark.py
+# Eski kutu kutu Python filtrelemesi ile vektörize detection_filter modülünü karşılaştırır.
+# Kullanım: python -m benchmarks.detection_filter_benchmark --counts 10 100 300
+import argparse
+import time
+
+import numpy as np
+
+import config
+from features.detection_filter import filter_detections
+
+
+def legacy_filter(boxes, frame_width, frame_height, iou_threshold):
+    """process_video içindeki eski (int'e çevrilmiş, O(n²) Python döngülü) filtrelemenin kopyası"""
+    valid_boxes = []
+    for box in np.array(boxes.tolist(), dtype="int"):
+        width = box[2] - box[0]
+        height = box[3] - box[1]
+        if width < config.MIN_DETECTION_WIDTH or height < config.MIN_DETECTION_HEIGHT:
+            continue
+        if (width > frame_width * config.MAX_DETECTION_WIDTH_RATIO or
+                height > frame_height * config.MAX_DETECTION_HEIGHT_RATIO):
+            continue
+        valid_boxes.append(box)
+
+    sorted_boxes = sorted(valid_boxes, key=lambda x: x[4], reverse=True)
+    filtered_boxes = []
+    used_indices = set()
+    for i, box1 in enumerate(sorted_boxes):
+        if i in used_indices:
+            continue
+        filtered_boxes.append(box1)
+        used_indices.add(i)
+        for j, box2 in enumerate(sorted_boxes):
+            if j <= i or j in used_indices:
+                continue
+            x1_inter = max(box1[0], box2[0])
+            y1_inter = max(box1[1], box2[1])
+            x2_inter = min(box1[2], box2[2])
+            y2_inter = min(box1[3], box2[3])
+            inter_area = 0
+            if x2_inter > x1_inter and y2_inter > y1_inter:
+                inter_area = (x2_inter - x1_inter) * (y2_inter - y1_inter)
+            area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+            area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+            union_area = area1 + area2 - inter_area
+            if union_area > 0 and inter_area / union_area > iou_threshold:
+                used_indices.add(j)
+    return np.array(filtered_boxes, dtype="int") if filtered_boxes else np.array([])
+
+
+def random_tracks(count, frame_width, frame_height, rng):
+    """Kare içinde rastgele kişi boyutlu (N, 7) takip kutuları üretir"""
+    widths = rng.uniform(15, 200, count)
+    heights = rng.uniform(30, 400, count)
+    x1 = rng.uniform(0, frame_width - widths)
+    y1 = rng.uniform(0, frame_height - heights)
+    return np.stack([
+        x1, y1, x1 + widths, y1 + heights,
+        np.arange(1, count + 1),            # track_id
+        rng.uniform(0.3, 1.0, count),       # score
+        np.zeros(count)                     # class_id
+    ], axis=1).astype(np.float32)
+
+
+def time_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tespit filtreleme mikro-benchmark'ı")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    width, height = config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+    iou_threshold = config.DETECTION_IOU_THRESHOLD
+    rng = np.random.default_rng(0)
+
+    print(f"{'kutu':>6}{'eski (µs)':>14}{'vektörize (µs)':>18}{'hızlanma':>10}{'kalan eski/yeni':>18}")
+    for count in args.counts:
+        tracks = random_tracks(count, width, height, rng)
+        legacy_us = time_call(lambda: legacy_filter(tracks, width, height, iou_threshold), args.repeats)
+        vector_us = time_call(lambda: filter_detections(tracks, width, height, iou_threshold), args.repeats)
+        kept_legacy = len(legacy_filter(tracks, width, height, iou_threshold))
+        kept_vector = len(filter_detections(tracks, width, height, iou_threshold))
+        print(f"{count:>6}{legacy_us:>14.1f}{vector_us:>18.1f}{legacy_us / vector_us:>9.1f}x"
+              f"{f'{kept_legacy}/{kept_vector}':>18}")
+
+
+if __name__ == "__main__":
+    main()
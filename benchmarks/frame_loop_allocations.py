@@ -0,0 +1,209 @@
+# benchmarks/frame_loop_allocations.py
+# Kare döngüsünün bellek ayırma davranışını eski ve yeni yol arasında karşılaştırır:
+# - eski: her karede yeni okuma + cv2.resize dizisi, set/list ile sayım
+# - yeni: tekrar kullanılan okuma tamponu + FrameRing yuvaları, TrackedIdSet ile sayım
+# Model çalıştırılmaz; takip kutuları önceden üretilir, böylece sadece okuma/boyutlandırma,
+# filtre, bölge ve sayım adımlarının ayırmaları ölçülür. Kareler işleme hattındaki gibi
+# halka boyu kadar bir süre tutulur. Her yol ayrı süreçte çalışır (tepe RSS karışmasın diye).
+# Kullanım: python -m benchmarks.frame_loop_allocations --max-frames 600
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+import cv2
+import numpy as np
+
+import config
+from benchmarks.detection_filter_benchmark import random_tracks
+from features.counting import (STATUS_IGNORED, STATUS_IN_ZONE, STATUS_OUTSIDE, STATUS_TRACKED, TrackedIdSet,
+                               count_people)
+from features.database.storage import STORAGE_MEMORY
+from features.detection_filter import filter_detections
+from features.frame_buffers import FrameRing, ring_slots_for
+from features.zone_lookup import COUNTING_ZONE_NAME, ZoneLookup, anchor_points, zones_for_camera
+
+VARIANTS = ("legacy", "current")
+TRACK_ID_LIFETIME_FRAMES = 60  # Sentetik kutuların id'leri bu kadar karede bir yenilenir
+
+
+def legacy_iter_frame_batches(cap, batch_size, width, height):
+    """iter_frame_batches'in önceki hali: her karede yeni okuma ve boyutlandırma dizisi"""
+    batch = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        batch.append(cv2.resize(frame, (width, height)))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def legacy_count_people(bboxes, in_counting_zone, people_tracked, person_id, statuses_for):
+    """count_people'ın önceki hali: bölgedeki id'ler set'e, geçmiş kontrolü Python listesiyle"""
+    if len(bboxes) == 0:
+        return set(), np.empty(0, dtype=np.int8)
+    track_ids = bboxes[:, 4].astype(np.int64)
+    is_person = bboxes[:, 6] == person_id
+    in_zone = in_counting_zone & is_person
+    in_zone_ids = set(track_ids[in_zone].tolist())
+    people_tracked.update(in_zone_ids)
+    was_tracked = np.array([track_id in people_tracked for track_id in track_ids.tolist()], dtype=bool)
+    return in_zone_ids, statuses_for(in_zone, was_tracked, is_person)
+
+
+def synthetic_tracks(frame_count, boxes_per_frame, width, height):
+    rng = np.random.default_rng(0)
+    tracks = []
+    for index in range(frame_count):
+        boxes = random_tracks(boxes_per_frame, width, height, rng)
+        boxes[:, 4] += (index // TRACK_ID_LIFETIME_FRAMES) * boxes_per_frame
+        tracks.append(boxes)
+    return tracks
+
+
+def current_rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def run_variant(variant, video_file, args):
+    """Tek yolu ölçer ve sonuç sözlüğü döndürür (alt süreçte çalışır)"""
+    # iter_frame_batches video_processor'da; depolama import sırasında seçildiği için önce bellek içi arka uç
+    config.STORAGE_BACKEND = STORAGE_MEMORY
+    config.LOCAL_HISTORY_DIRECTORY = tempfile.mkdtemp(prefix="alloc_bench_history_")
+    from features.video_processor import iter_frame_batches
+
+    def statuses_for(in_zone, was_tracked, is_person):
+        statuses = np.where(in_zone, STATUS_IN_ZONE, np.where(was_tracked, STATUS_TRACKED, STATUS_OUTSIDE))
+        statuses[~is_person] = STATUS_IGNORED
+        return statuses.astype(np.int8)
+
+    width, height = config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+    camera_id = os.path.splitext(os.path.basename(video_file))[0]
+    zone_lookup = ZoneLookup(zones_for_camera(camera_id), width, height)
+    tracks = synthetic_tracks(args.max_frames, args.boxes, width, height)
+    slots = ring_slots_for(args.batch_size, config.PIPELINE_QUEUE_SIZE)
+    held_frames = deque(maxlen=slots)  # Kuyruklardaki karelerin ömrünü taklit eder
+
+    cap = cv2.VideoCapture(video_file)
+    if variant == "legacy":
+        people_tracked = set()
+        batches = legacy_iter_frame_batches(cap, args.batch_size, width, height)
+    else:
+        people_tracked = TrackedIdSet()
+        batches = iter_frame_batches(cap, args.batch_size, width, height, ring=FrameRing(slots, width, height))
+
+    rss_before = current_rss_bytes()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    batch_peaks = []
+    in_zone_total = 0
+    frame_index = 0
+    start = time.perf_counter()
+    while frame_index < args.max_frames:
+        tracemalloc.reset_peak()
+        batch_start = tracemalloc.get_traced_memory()[0]
+        frames = next(batches, None)
+        if frames is None:
+            break
+        for frame in frames:
+            if frame_index >= args.max_frames:
+                break
+            bboxes = filter_detections(tracks[frame_index], width, height)
+            in_zone = zone_lookup.contains(COUNTING_ZONE_NAME, anchor_points(bboxes))
+            if variant == "legacy":
+                people_in_zone, _ = legacy_count_people(bboxes, in_zone, people_tracked, config.PERSON_ID,
+                                                        statuses_for)
+                in_zone_total += len(people_in_zone)
+            else:
+                people_in_zone, _ = count_people(bboxes, in_zone, people_tracked)
+                in_zone_total += people_in_zone
+            held_frames.append(frame)
+            frame_index += 1
+        batch_peaks.append((tracemalloc.get_traced_memory()[1] - batch_start) / max(1, len(frames)))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cap.release()
+
+    rss_after = current_rss_bytes()
+    # Linux'ta ru_maxrss KB cinsindendir
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    peaks = np.asarray(batch_peaks[1:] or batch_peaks, dtype=np.float64)  # İlk batch tamponları ayırır
+    return {
+        "variant": variant,
+        "frames": frame_index,
+        "people_tracked": len(people_tracked),
+        "in_zone_total": in_zone_total,
+        "per_frame_peak_bytes_mean": float(peaks.mean()) if len(peaks) else 0.0,
+        "per_frame_peak_bytes_max": float(peaks.max()) if len(peaks) else 0.0,
+        "traced_current_bytes": current - baseline,
+        "traced_peak_bytes": peak - baseline,
+        "rss_growth_bytes": rss_after - rss_before if rss_before is not None else None,
+        "max_rss_bytes": max_rss,
+        "ms_per_frame_traced": elapsed / max(1, frame_index) * 1000,
+    }
+
+
+def megabytes(value):
+    return "-" if value is None else f"{value / 1024 / 1024:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kare döngüsü bellek ayırma karşılaştırması")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE)
+    parser.add_argument("--boxes", type=int, default=20, help="Kare başına sentetik takip kutusu")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--video", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.video, args)))
+        return
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    print(f"{'video':<20}{'yol':>9}{'kare':>7}{'kare başı tepe KB':>19}{'izlenen tepe MB':>17}"
+          f"{'RSS artışı MB':>15}{'tepe RSS MB':>13}{'kişi':>6}")
+    for video_file in video_files:
+        results = {}
+        for variant in VARIANTS:
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.frame_loop_allocations", "--variant", variant,
+                 "--video", video_file, "--max-frames", str(args.max_frames),
+                 "--batch-size", str(args.batch_size), "--boxes", str(args.boxes)],
+                capture_output=True, text=True, check=True)
+            results[variant] = json.loads(completed.stdout.strip().splitlines()[-1])
+        for variant, result in results.items():
+            print(f"{os.path.basename(video_file):<20}{variant:>9}{result['frames']:>7}"
+                  f"{result['per_frame_peak_bytes_mean'] / 1024:>19.1f}{megabytes(result['traced_peak_bytes']):>17}"
+                  f"{megabytes(result['rss_growth_bytes']):>15}{megabytes(result['max_rss_bytes']):>13}"
+                  f"{result['people_tracked']:>6}")
+        legacy, current = results["legacy"], results["current"]
+        if (legacy["people_tracked"], legacy["in_zone_total"]) != (current["people_tracked"], current["in_zone_total"]):
+            print(f"⚠️ {os.path.basename(video_file)}: sayımlar farklı "
+                  f"(eski {legacy['people_tracked']}/{legacy['in_zone_total']}, "
+                  f"yeni {current['people_tracked']}/{current['in_zone_total']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/imgsz_calibration.py
+# Her kameranın videosunu birkaç çıkarım boyutunda (imgsz) sayar ve en büyük boyuttaki sayımla
+# karşılaştırır: son kişi sayısı farkı ve kare başına bölgedeki tespit sayısı farkı.
+# Hata bütçesi (config.IMGSZ_MAX_*) içinde kalan en küçük boyut kameranın profiline yazılır;
+# process_video bu boyutu çalışma anında okur.
+# Kullanım: python -m benchmarks.imgsz_calibration --sizes 320 416 512 640 --max-frames 600
+import argparse
+import glob
+import os
+
+import numpy as np
+
+import config
+from benchmarks.batch_throughput import load_frames
+from benchmarks.counting import count_video
+from features.camera_profile import save_camera_profile, select_imgsz
+from features.exported_model import load_detector
+from features.roi_crop import RoiDetector, zone_roi
+from features.zone_lookup import ZoneLookup, zones_for_camera
+
+
+def compare_to_reference(count, in_zone_per_frame, reference_count, reference_per_frame):
+    """Referansa göre (son sayı göreli farkı, kare başına ortalama mutlak fark / ortalama sayı)"""
+    count_error = abs(count - reference_count) / max(reference_count, 1)
+    frame_error = (np.abs(in_zone_per_frame - reference_per_frame).mean()
+                   / max(reference_per_frame.mean(), 1e-9)) if len(reference_per_frame) else 0.0
+    return float(count_error), float(frame_error)
+
+
+def calibrate_camera(video_file, sizes, max_frames, batch_size):
+    """Videoyu her boyutta sayar; {imgsz: sonuç} döndürür (en büyük boyut referanstır)"""
+    frames = load_frames(video_file, max_frames)
+    if not frames:
+        return {}
+    width, height = config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+    camera_id = os.path.splitext(os.path.basename(video_file))[0]
+    zone_lookup = ZoneLookup(zones_for_camera(camera_id), width, height)
+    roi = zone_roi(zone_lookup.polygons.values(), width, height) if config.ROI_CROP_ENABLED else None
+
+    results = {}
+    reference = None
+    for imgsz in sorted(sizes, reverse=True):
+        detector = load_detector(imgsz=imgsz)
+        if roi is not None:
+            detector = RoiDetector(detector, roi)
+        detector.detect(frames[:batch_size])  # Isınma
+        count, in_zone_per_frame, fps = count_video(detector, frames, batch_size, zone_lookup)
+        if reference is None:
+            reference = (count, in_zone_per_frame)
+        count_error, frame_error = compare_to_reference(count, in_zone_per_frame, *reference)
+        results[imgsz] = {"count": count, "fps": round(fps, 2),
+                          "count_error": round(count_error, 4), "frame_error": round(frame_error, 4)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kamera başına çıkarım boyutu (imgsz) kalibrasyonu")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=config.IMGSZ_CALIBRATION_SIZES)
+    parser.add_argument("--max-frames", type=int, default=600, help="Kamera başına sayılacak kare sayısı")
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE)
+    parser.add_argument("--max-count-error", type=float, default=config.IMGSZ_MAX_COUNT_ERROR)
+    parser.add_argument("--max-frame-error", type=float, default=config.IMGSZ_MAX_FRAME_ERROR)
+    parser.add_argument("--dry-run", action="store_true", help="Sonuçları göster, profile yazma")
+    args = parser.parse_args()
+
+    invalid = [size for size in args.sizes if size % 32]
+    if invalid:
+        parser.error(f"Boyutlar 32'nin katı olmalı: {invalid}")
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    for video_file in video_files:
+        camera_id = os.path.splitext(os.path.basename(video_file))[0]
+        results = calibrate_camera(video_file, args.sizes, args.max_frames, args.batch_size)
+        if not results:
+            print(f"⚠️ {camera_id}: kare okunamadı, atlandı.")
+            continue
+        chosen = select_imgsz(results, args.max_count_error, args.max_frame_error)
+
+        print(f"\n📷 {camera_id}")
+        print(f"{'imgsz':>7}{'fps':>9}{'sayı':>7}{'sayı hatası':>13}{'kare hatası':>13}")
+        for imgsz in sorted(results):
+            r = results[imgsz]
+            marker = "  ◀ seçildi" if imgsz == chosen else ""
+            print(f"{imgsz:>7}{r['fps']:>9.2f}{r['count']:>7}{r['count_error'] * 100:>12.1f}%"
+                  f"{r['frame_error'] * 100:>12.1f}%{marker}")
+
+        if not args.dry_run:
+            save_camera_profile(camera_id, {
+                "imgsz": chosen,
+                "reference_imgsz": max(results),
+                "max_count_error": args.max_count_error,
+                "max_frame_error": args.max_frame_error,
+                "candidates": {str(imgsz): r for imgsz, r in sorted(results.items())},
+            })
+    if not args.dry_run:
+        print(f"\n✅ Profiller {config.CAMERA_PROFILE_PATH} dosyasına yazıldı.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/inference_server_scaling.py
+# Vagon sayısı arttıkça iki modu karşılaştırır:
+#   - process: her vagon süreci kendi YOLO modelini yükler (mevcut davranış)
+#   - server : tek çıkarım sunucusu, vagonlar paylaşımlı bellekle kare gönderir
+# Toplam kare/sn ve tüm süreçlerin toplam RSS belleği raporlanır.
+# Kullanım: python -m benchmarks.inference_server_scaling --wagons 1 2 4 --max-frames 150
+import argparse
+import glob
+import os
+import time
+from multiprocessing import Process, Queue, freeze_support
+
+import config
+from benchmarks.batch_throughput import load_frames
+
+
+def _rss_bytes(pid):
+    """Linux'ta /proc üzerinden bir sürecin RSS belleğini okur, okunamazsa 0 döndürür"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _worker(video_file, max_frames, batch_size, inference_lane, result_queue):
+    from ultralytics import YOLO
+    from features.inference import BatchedTracker, FrameTracker, UltralyticsDetector
+    from features.inference_server import ServerDetector
+
+    frames = load_frames(video_file, max_frames)
+    if inference_lane is not None:
+        detector = ServerDetector(inference_lane)
+    else:
+        detector = UltralyticsDetector(YOLO(config.MODEL_NAME))
+    batched_tracker = BatchedTracker(detector, FrameTracker())
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        batched_tracker.track(frames[i:i + batch_size])
+    result_queue.put((len(frames), time.perf_counter() - start))
+
+
+def run(mode, video_files, num_wagons, max_frames, batch_size):
+    """Belirtilen modda num_wagons süreç çalıştırır; (toplam fps, en yüksek toplam RSS) döndürür"""
+    from features.inference_server import InferenceServer
+
+    server = InferenceServer(num_lanes=num_wagons).start() if mode == "server" else None
+    result_queue = Queue()
+    processes = []
+    for index in range(num_wagons):
+        # Vagon sayısı video sayısından fazlaysa videolar sırayla tekrar kullanılır
+        video_file = video_files[index % len(video_files)]
+        lane = server.lane(index) if server else None
+        p = Process(target=_worker, args=(video_file, max_frames, batch_size, lane, result_queue))
+        p.start()
+        processes.append(p)
+
+    pids = [p.pid for p in processes] + ([server.process.pid] if server else [])
+    peak_rss = 0
+    while any(p.is_alive() for p in processes):
+        peak_rss = max(peak_rss, sum(_rss_bytes(pid) for pid in pids))
+        time.sleep(0.5)
+    for p in processes:
+        p.join()
+    if server:
+        server.stop()
+
+    results = [result_queue.get() for _ in processes]
+    total_frames = sum(frames for frames, _ in results)
+    wall_time = max(elapsed for _, elapsed in results)
+    return (total_frames / wall_time if wall_time > 0 else 0.0), peak_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paylaşımlı çıkarım sunucusu ölçeklenme karşılaştırması")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--wagons", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--max-frames", type=int, default=150)
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    print(f"{'vagon':>6}{'mod':>10}{'toplam fps':>14}{'RSS (MB)':>12}")
+    for num_wagons in args.wagons:
+        for mode in ("process", "server"):
+            fps, peak_rss = run(mode, video_files, num_wagons, args.max_frames, args.batch_size)
+            rss_text = f"{peak_rss / 1024 / 1024:.0f}" if peak_rss else "n/a"
+            print(f"{num_wagons:>6}{mode:>10}{fps:>14.2f}{rss_text:>12}")
+
+
+if __name__ == "__main__":
+    freeze_support()
+    main()
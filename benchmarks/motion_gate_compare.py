@@ -0,0 +1,57 @@
+# benchmarks/motion_gate_compare.py
+# Aynı videoyu tam hızda ve hareket kapılı (adaptif) modda işler; atlanan kare oranını,
+# hız farkını ve son people_tracked sayısındaki değişimi raporlar.
+# Depolama olarak bellek içi arka uç kullanılır (canlı dokümanlara yazılmaz); iki çalıştırma da
+# headless moddadır ki fps farkı çizim/kodlama değil hareket kapısı kaynaklı olsun.
+# Kullanım: python -m benchmarks.motion_gate_compare --threshold 0.02 --max-stride 10
+import argparse
+import glob
+import os
+import tempfile
+
+import config
+from features.database.storage import STORAGE_MEMORY
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hareket kapılı kare atlama karşılaştırması")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--threshold", type=float, default=config.MOTION_THRESHOLD)
+    parser.add_argument("--min-stride", type=int, default=config.MOTION_MIN_STRIDE)
+    parser.add_argument("--max-stride", type=int, default=config.MOTION_MAX_STRIDE)
+    args = parser.parse_args()
+
+    config.MOTION_THRESHOLD = args.threshold
+    config.MOTION_MIN_STRIDE = args.min_stride
+    config.MOTION_MAX_STRIDE = args.max_stride
+
+    # Depolama, video_processor import edilirken config'ten seçildiği için önce config değiştirilir
+    config.STORAGE_BACKEND = STORAGE_MEMORY
+    config.LOCAL_HISTORY_DIRECTORY = tempfile.mkdtemp(prefix="motion_gate_history_")
+    from features.video_processor import RENDER_MODE_HEADLESS, process_video
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    rows = []
+    for video_file in video_files:
+        full = process_video(video_file, motion_gated=False, render_mode=RENDER_MODE_HEADLESS,
+                             checkpointed=False, cached=False)
+        gated = process_video(video_file, motion_gated=True, render_mode=RENDER_MODE_HEADLESS,
+                              checkpointed=False, cached=False)
+        if not full or not gated:
+            continue
+        rows.append((os.path.basename(video_file), full, gated))
+
+    print(f"\n{'video':<20}{'atlanan %':>10}{'fps tam':>10}{'fps adaptif':>13}"
+          f"{'kişi tam':>10}{'kişi adaptif':>14}{'fark':>6}")
+    for name, full, gated in rows:
+        delta = gated["people_tracked"] - full["people_tracked"]
+        print(f"{name:<20}{gated['skip_ratio'] * 100:>10.1f}{full['fps']:>10.1f}{gated['fps']:>13.1f}"
+              f"{full['people_tracked']:>10}{gated['people_tracked']:>14}{delta:>+6}")
+
+
+if __name__ == "__main__":
+    main()
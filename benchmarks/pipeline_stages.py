@@ -0,0 +1,205 @@
+# benchmarks/pipeline_stages.py
+# process_video'yu data/videos üzerinde çalıştırır ve kare başına aşama sürelerini ölçer:
+# decode, resize, inference (tespit + takip), filter, zone, db_write, draw, encode.
+# p50/p95/p99 ve fps içeren JSON + Markdown rapor yazar, kayıtlı temel ölçümle (baseline)
+# karşılaştırır ve eşikleri aşan gerilemede 1 koduyla çıkar.
+# Depolama olarak bellek içi arka uç kullanılır; ağ ve Firebase kimlik bilgisi gerekmez.
+# Kullanım: python -m benchmarks.pipeline_stages --mode headless
+#           python -m benchmarks.pipeline_stages --save-baseline   (mevcut ölçümü temel yapar)
+# Not: full/preview modlarında çıktı videoları yine outputs/videos altına yazılır.
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import config
+from features.database.storage import STORAGE_MEMORY
+from features.pipeline import StageTimings
+
+# Raporda aşamaların sırası; burada olmayan aşamalar (örn. frames, render toplamları) sona eklenir
+STAGE_ORDER = ["decode", "resize", "inference", "filter", "zone", "db_write", "draw", "encode"]
+MAX_STAGE_SAMPLES = 5_000_000
+
+
+def stage_summary(samples_seconds):
+    """Öğe başına süre dizisinden (sn) ms cinsinden özet"""
+    samples = np.asarray(samples_seconds, dtype=np.float64) * 1000
+    if len(samples) == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"count": int(len(samples)), "mean_ms": float(samples.mean()), "p50_ms": float(p50),
+            "p95_ms": float(p95), "p99_ms": float(p99), "total_seconds": float(samples.sum() / 1000)}
+
+
+def ordered_stages(names):
+    return [name for name in STAGE_ORDER if name in names] + sorted(set(names) - set(STAGE_ORDER))
+
+
+def run_benchmark(video_files, args):
+    """Videoları sırayla işler; rapor sözlüğünü döndürür"""
+    # Depolama, video_processor import edilirken config'ten seçildiği için önce config değiştirilir
+    config.STORAGE_BACKEND = STORAGE_MEMORY
+    config.LOCAL_HISTORY_DIRECTORY = tempfile.mkdtemp(prefix="stage_bench_history_")
+    from features.video_processor import process_video
+
+    videos = {}
+    all_samples = {}
+    total_frames = 0
+    total_seconds = 0.0
+    for video_file in video_files:
+        timings = StageTimings(max_samples=MAX_STAGE_SAMPLES)
+        summary = process_video(video_file, batch_size=args.batch_size, pipelined=args.pipeline,
+                                render_mode=args.mode, stage_timings=timings,
+                                checkpointed=False, cached=False)
+        if not summary:
+            continue
+        stages = {}
+        for name, stats in timings.stages.items():
+            stages[name] = stage_summary(stats.samples)
+            all_samples.setdefault(name, []).append(np.frombuffer(stats.samples, dtype=np.float64))
+        videos[summary["video"]] = {"frames": summary["frames"], "fps": summary["fps"],
+                                    "people_tracked": summary["people_tracked"], "stages": stages}
+        total_frames += summary["frames"]
+        total_seconds += summary["elapsed_seconds"]
+
+    overall_stages = {name: stage_summary(np.concatenate(parts)) for name, parts in all_samples.items()}
+    return {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "settings": {
+            "batch_size": args.batch_size,
+            "pipelined": args.pipeline,
+            "render_mode": args.mode,
+            "inference_backend": config.INFERENCE_BACKEND,
+            "model": config.MODEL_NAME,
+            "motion_gate": config.MOTION_GATE_ENABLED,
+            "roi_crop": config.ROI_CROP_ENABLED,
+            "storage": STORAGE_MEMORY,
+        },
+        "environment": {"python": sys.version.split()[0], "platform": platform.platform(),
+                        "cpu_count": os.cpu_count()},
+        "overall": {"frames": total_frames, "elapsed_seconds": total_seconds,
+                    "fps": total_frames / total_seconds if total_seconds > 0 else 0.0,
+                    "stages": overall_stages},
+        "videos": videos,
+    }
+
+
+def compare_to_baseline(report, baseline, latency_threshold, fps_threshold, min_delta_ms):
+    """Eşikleri aşan gerilemelerin listesini döndürür (her biri okunabilir bir satır)"""
+    regressions = []
+    current_fps = report["overall"]["fps"]
+    baseline_fps = baseline["overall"]["fps"]
+    if baseline_fps and current_fps < baseline_fps * (1 - fps_threshold):
+        regressions.append(f"fps: {baseline_fps:.2f} -> {current_fps:.2f} "
+                           f"({(current_fps / baseline_fps - 1) * 100:+.1f}%)")
+
+    for name, current in report["overall"]["stages"].items():
+        previous = baseline["overall"]["stages"].get(name)
+        if not previous or not previous.get("count") or not current.get("count"):
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            delta = current[metric] - previous[metric]
+            if delta > min_delta_ms and current[metric] > previous[metric] * (1 + latency_threshold):
+                regressions.append(f"{name} {metric[:3]}: {previous[metric]:.2f} -> {current[metric]:.2f} ms "
+                                   f"({(current[metric] / previous[metric] - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def stage_table(stages, baseline_stages=None):
+    lines = ["| aşama | kare | ort. ms | p50 ms | p95 ms | p99 ms | toplam sn |" + (" temel p50 ms |" if baseline_stages else ""),
+             "|---|---:|---:|---:|---:|---:|---:|" + ("---:|" if baseline_stages else "")]
+    for name in ordered_stages(stages):
+        s = stages[name]
+        if not s.get("count"):
+            continue
+        row = (f"| {name} | {s['count']} | {s['mean_ms']:.2f} | {s['p50_ms']:.2f} | {s['p95_ms']:.2f} "
+               f"| {s['p99_ms']:.2f} | {s['total_seconds']:.2f} |")
+        if baseline_stages:
+            previous = baseline_stages.get(name, {})
+            row += f" {previous['p50_ms']:.2f} |" if previous.get("count") else " - |"
+        lines.append(row)
+    return lines
+
+
+def markdown_report(report, baseline=None, regressions=None):
+    overall = report["overall"]
+    settings = ", ".join(f"{key}={value}" for key, value in report["settings"].items())
+    lines = [f"# İşlem hattı aşama benchmark'ı ({report['created_at']})", "",
+             f"Ayarlar: {settings}", "",
+             f"Toplam: {overall['frames']} kare, {overall['elapsed_seconds']:.1f} sn, **{overall['fps']:.2f} fps**"]
+    if baseline:
+        lines.append(f"Temel ölçüm ({baseline['created_at']}): {baseline['overall']['fps']:.2f} fps")
+    lines += ["", "## Tüm videolar", ""]
+    lines += stage_table(overall["stages"], baseline["overall"]["stages"] if baseline else None)
+    lines += ["", "## Videolar", "", "| video | kare | fps | kişi |", "|---|---:|---:|---:|"]
+    for name, video in report["videos"].items():
+        lines.append(f"| {name} | {video['frames']} | {video['fps']:.2f} | {video['people_tracked']} |")
+    for name, video in report["videos"].items():
+        lines += ["", f"### {name}", ""] + stage_table(video["stages"])
+    if baseline is not None:
+        lines += ["", "## Temel ölçümle karşılaştırma", ""]
+        lines += [f"- ❌ {line}" for line in regressions] if regressions else ["- ✅ Gerileme yok"]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="process_video aşama süreleri benchmark'ı (çevrimdışı)")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE)
+    parser.add_argument("--pipeline", action=argparse.BooleanOptionalAction, default=config.PIPELINE_ENABLED)
+    parser.add_argument("--mode", default=config.RENDER_MODE, choices=["full", "headless", "preview"])
+    parser.add_argument("--output-dir", default=config.BENCHMARK_REPORT_DIRECTORY)
+    parser.add_argument("--baseline", default=config.BENCHMARK_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Bu ölçümü temel ölçüm olarak kaydet")
+    parser.add_argument("--latency-threshold", type=float, default=config.BENCHMARK_LATENCY_REGRESSION)
+    parser.add_argument("--fps-threshold", type=float, default=config.BENCHMARK_FPS_REGRESSION)
+    parser.add_argument("--min-delta-ms", type=float, default=config.BENCHMARK_MIN_DELTA_MS)
+    args = parser.parse_args()
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    report = run_benchmark(video_files, args)
+
+    baseline = None
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.latency_threshold, args.fps_threshold,
+                                          args.min_delta_ms)
+        report["regressions"] = regressions
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    json_path = os.path.join(args.output_dir, "pipeline_stages.json")
+    markdown_path = os.path.join(args.output_dir, "pipeline_stages.md")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    markdown = markdown_report(report, baseline, regressions)
+    with open(markdown_path, "w", encoding="utf-8") as f:
+        f.write(markdown)
+    print("\n" + markdown)
+    print(f"📄 Rapor: {json_path}, {markdown_path}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📌 Temel ölçüm kaydedildi: {args.baseline}")
+    elif baseline is None:
+        print(f"ℹ️ Temel ölçüm bulunamadı ({args.baseline}); kaydetmek için --save-baseline kullanın.")
+    elif regressions:
+        print(f"❌ {len(regressions)} gerileme eşiği aştı.")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
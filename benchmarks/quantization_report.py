@@ -0,0 +1,81 @@
+# benchmarks/quantization_report.py
+# INT8 modeli (gerekirse kalibre edip oluşturarak) FP32 ile karşılaştırır: video başına
+# kare/sn, hızlanma ve process_video ile aynı sayım mantığıyla elde edilen son kişi sayısı farkı.
+# FP32 referansı varsayılan olarak aynı çalışma zamanındaki ONNX modelidir, böylece fark
+# sadece nicemlemeden kaynaklanır (--baseline pytorch ile Ultralytics de seçilebilir).
+# Kullanım: python -m benchmarks.quantization_report --max-frames 600 --threads 2
+import argparse
+import glob
+import os
+
+import numpy as np
+
+import config
+from benchmarks.batch_throughput import load_frames
+from benchmarks.counting import count_video
+from features.exported_model import BACKEND_ONNX, BACKEND_ONNX_INT8, BACKEND_PYTORCH, load_detector
+from features.quantization import quantize_model, sample_calibration_frames
+from features.roi_crop import RoiDetector, zone_roi
+from features.zone_lookup import ZoneLookup, zones_for_camera
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 nicemleme hız ve sayım farkı raporu")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--baseline", choices=[BACKEND_ONNX, BACKEND_PYTORCH], default=BACKEND_ONNX)
+    parser.add_argument("--calibration-frames", type=int,
+                        default=config.QUANTIZATION_CALIBRATION_FRAMES_PER_VIDEO,
+                        help="--requantize ile video başına kalibrasyon karesi")
+    parser.add_argument("--requantize", action="store_true", help="Önbellekteki INT8 modeli yeniden oluştur")
+    parser.add_argument("--max-frames", type=int, default=600, help="Video başına sayılacak kare sayısı")
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=config.TORCH_THREADS_PER_WORKER)
+    args = parser.parse_args()
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    import torch
+    torch.set_num_threads(args.threads)
+
+    if args.requantize:
+        calibration = sample_calibration_frames(video_files, args.calibration_frames)
+        quantize_model(frames=calibration, force=True)
+    fp32 = load_detector(args.baseline, intra_op_threads=args.threads)
+    int8 = load_detector(BACKEND_ONNX_INT8, intra_op_threads=args.threads)
+
+    width, height = config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+    print(f"\n{'video':<20}{'fps FP32':>10}{'fps INT8':>10}{'hızlanma':>10}"
+          f"{'sayı FP32':>11}{'sayı INT8':>11}{'fark':>7}")
+    totals = np.zeros(4)
+    for video_file in video_files:
+        frames = load_frames(video_file, args.max_frames)
+        if not frames:
+            continue
+        camera_id = os.path.splitext(os.path.basename(video_file))[0]
+        zone_lookup = ZoneLookup(zones_for_camera(camera_id), width, height)
+        fp32_detector, int8_detector = fp32, int8
+        if config.ROI_CROP_ENABLED:
+            roi = zone_roi(zone_lookup.polygons.values(), width, height)
+            fp32_detector, int8_detector = RoiDetector(fp32, roi), RoiDetector(int8, roi)
+
+        fp32_detector.detect(frames[:args.batch_size])  # Isınma
+        int8_detector.detect(frames[:args.batch_size])
+        fp32_count, _, fp32_fps = count_video(fp32_detector, frames, args.batch_size, zone_lookup)
+        int8_count, _, int8_fps = count_video(int8_detector, frames, args.batch_size, zone_lookup)
+        totals += (fp32_count, int8_count, len(frames) / fp32_fps if fp32_fps else 0.0,
+                   len(frames) / int8_fps if int8_fps else 0.0)
+        speedup = int8_fps / fp32_fps if fp32_fps else 0.0
+        print(f"{os.path.basename(video_file):<20}{fp32_fps:>10.2f}{int8_fps:>10.2f}{speedup:>9.2f}x"
+              f"{fp32_count:>11}{int8_count:>11}{int8_count - fp32_count:>+7}")
+
+    fp32_total, int8_total, fp32_seconds, int8_seconds = totals
+    overall = fp32_seconds / int8_seconds if int8_seconds else 0.0
+    print(f"\nToplam: hızlanma {overall:.2f}x, son sayı FP32={int(fp32_total)} INT8={int(int8_total)} "
+          f"(fark {int(int8_total - fp32_total):+d})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/roi_crop_benchmark.py
+# Tam kare ile bölgeye kırpılmış (ROI) çıkarımı karşılaştırır: işlenen piksel oranı,
+# kare/sn ve sayım bölgesine düşen tespit sayısı.
+# Kullanım: python -m benchmarks.roi_crop_benchmark --margin 40 --max-frames 300
+import argparse
+import glob
+import os
+import time
+
+from ultralytics import YOLO
+
+import config
+from benchmarks.batch_throughput import load_frames
+from features.detection_filter import filter_detections
+from features.inference import BatchedTracker, FrameTracker, UltralyticsDetector
+from features.roi_crop import RoiDetector, roi_pixel_ratio, zone_roi
+from features.zone_lookup import COUNTING_ZONE_NAME, ZoneLookup, anchor_points, zones_for_camera
+
+
+def run(detector, frames, batch_size, zone_lookup):
+    """Kareleri işler; (kare/sn, bölgedeki toplam tespit sayısı) döndürür"""
+    batched_tracker = BatchedTracker(detector, FrameTracker())
+    detector.detect(frames[:batch_size])
+
+    in_zone_total = 0
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        for tracks in batched_tracker.track(frames[i:i + batch_size]):
+            boxes = filter_detections(tracks, config.VIDEO_WIDTH, config.VIDEO_HEIGHT)
+            in_zone_total += int(zone_lookup.contains(COUNTING_ZONE_NAME, anchor_points(boxes)).sum())
+    elapsed = time.perf_counter() - start
+    return (len(frames) / elapsed if elapsed > 0 else 0.0), in_zone_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bölgeye kırpılmış çıkarım hız karşılaştırması")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--margin", type=int, default=config.ROI_MARGIN)
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=config.INFERENCE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    width, height = config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+    model = YOLO(config.MODEL_NAME)
+
+    print(f"{'video':<20}{'piksel %':>10}{'fps tam':>10}{'fps ROI':>10}{'hızlanma':>10}"
+          f"{'bölgede tam':>13}{'bölgede ROI':>13}")
+    for video_file in video_files:
+        frames = load_frames(video_file, args.max_frames)
+        if not frames:
+            continue
+        camera_id = os.path.splitext(os.path.basename(video_file))[0]
+        zone_lookup = ZoneLookup(zones_for_camera(camera_id), width, height)
+        roi = zone_roi(zone_lookup.polygons.values(), width, height, args.margin)
+
+        full_fps, full_in_zone = run(UltralyticsDetector(model), frames, args.batch_size, zone_lookup)
+        roi_fps, roi_in_zone = run(RoiDetector(UltralyticsDetector(model), roi), frames,
+                                   args.batch_size, zone_lookup)
+        speedup = roi_fps / full_fps if full_fps else 0.0
+        print(f"{os.path.basename(video_file):<20}{roi_pixel_ratio(roi, width, height) * 100:>10.1f}"
+              f"{full_fps:>10.2f}{roi_fps:>10.2f}{speedup:>9.2f}x{full_in_zone:>13}{roi_in_zone:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/storage_throughput.py
+# Depolama arka uçlarının (memory, sqlite, isteğe bağlı firestore) işleme hattındaki
+# yazma/okuma desenleriyle saniyedeki işlem sayısını ölçer.
+# Kullanım: python -m benchmarks.storage_throughput --backends memory sqlite --records 5000
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from features.database.storage import (SERVER_TIMESTAMP, STORAGE_MEMORY, STORAGE_SQLITE,
+                                       STORAGE_BACKENDS, SQLiteStorage, create_storage)
+
+CURRENT_COLLECTION = "benchmark_fullness_current"
+HISTORY_COLLECTION = "benchmark_fullness_history"
+WAGONS = ("wagon1", "wagon2", "wagon3")
+
+
+def history_records(count):
+    """Vagonlar arasında dönüşümlü, saniyede bir kayıtlık tarihsel doluluk kayıtları üretir"""
+    start = datetime.now(timezone.utc)
+    return [{
+        "wagon_id": WAGONS[i % len(WAGONS)],
+        "fullness_percentage": float(i % 100),
+        "timestamp": start + timedelta(seconds=i),
+        "frame_count": i
+    } for i in range(count)]
+
+
+def rate(count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed > 0 else float("inf")
+
+
+def run_backend(storage, records, batch_size, page_size):
+    storage.delete_all_documents_in_collection(CURRENT_COLLECTION)
+    storage.delete_all_documents_in_collection(HISTORY_COLLECTION)
+    updates = len(records)
+
+    def current_writes():
+        # Anlık doluluk: aynı üç dokümanın sürekli üzerine yazılması
+        for i in range(updates):
+            storage.create_document(CURRENT_COLLECTION, {"fullness_percentage": float(i % 100),
+                                                         "last_updated": SERVER_TIMESTAMP},
+                                    document_id=WAGONS[i % len(WAGONS)])
+
+    def history_batches():
+        for start in range(0, len(records), batch_size):
+            storage.create_documents(HISTORY_COLLECTION, records[start:start + batch_size])
+
+    def paged_replay():
+        # Zaman sırasıyla imleçli sayfa sayfa okuma (oynatma deseni)
+        last = None
+        while True:
+            page = storage.query_documents(HISTORY_COLLECTION, order_by="timestamp",
+                                           limit=page_size, start_after=last)
+            if not page:
+                break
+            last = page[-1]
+
+    def wagon_query():
+        storage.query_documents(HISTORY_COLLECTION, filters={"wagon_id": WAGONS[0]}, order_by="timestamp")
+
+    return {
+        "current_write": rate(updates, current_writes),
+        "history_batch_write": rate(len(records), history_batches),
+        "full_read": rate(len(records), lambda: storage.get_all_documents(HISTORY_COLLECTION)),
+        "paged_replay": rate(len(records), paged_replay),
+        "wagon_query": rate(len(records) // len(WAGONS), wagon_query)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Depolama arka ucu verim benchmark'ı")
+    parser.add_argument("--backends", nargs="+", choices=STORAGE_BACKENDS,
+                        default=[STORAGE_MEMORY, STORAGE_SQLITE],
+                        help="firestore seçilirse gerçek projeye benchmark koleksiyonları yazılır")
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args()
+
+    records = history_records(args.records)
+    columns = ("current_write", "history_batch_write", "full_read", "paged_replay", "wagon_query")
+    print(f"{'arka uç':>10}" + "".join(f"{name:>22}" for name in columns) + "   (işlem/sn)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            if backend == STORAGE_SQLITE:
+                # Benchmark gerçek veritabanı dosyasına dokunmasın
+                storage = SQLiteStorage(os.path.join(tmp, "benchmark.sqlite3"))
+            else:
+                storage = create_storage(backend)
+            if storage is None:
+                print(f"{backend:>10}  başlatılamadı, atlanıyor")
+                continue
+            try:
+                results = run_backend(storage, records, args.batch_size, args.page_size)
+            finally:
+                storage.close()
+            print(f"{backend:>10}" + "".join(f"{results[name]:>22.0f}" for name in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,10 @@ COUNTING_ZONE_POLYGON = [
     [1177, 703],
     [213, 709]
 ]
+# Kamera başına ek adlandırılmış bölgeler (örn. kapı alanı ve koridor).
+# Anahtar video adıdır (uzantısız); "counting" bölgesi tanımlanmazsa COUNTING_ZONE_POLYGON kullanılır.
+# Örnek: {"wagon1": {"door": [[...], ...], "aisle": [[...], ...]}}
+CAMERA_ZONES = {}
 VIDEO_WIDTH = 1200
 VIDEO_HEIGHT = 750
 
@@ -32,6 +36,98 @@ DETECTION_IOU_THRESHOLD = 0.4  # 0.3'ten 0.4'e çıkarıldı - daha az agresif f
 YOLO_TRACKER = "bytetrack.yaml"  # Daha iyi tracking için
 YOLO_TRACK_PERSIST = True        # Tracking ID'lerini korumak için
 
+# Toplu (batch) çıkarım ayarları
+# Kareler bu boyuttaki gruplar halinde tek ileri geçişte modele verilir, takip kare kare uygulanır.
+# Varsayılanı seçmek için: python -m benchmarks.batch_throughput
+INFERENCE_BATCH_SIZE = 1
+
+# Çıkarım arka ucu: "pytorch" (Ultralytics), "onnx" (ONNX Runtime), "openvino" (CPU) veya
+# "onnx_int8" (data/videos karelerinden kalibre edilmiş INT8 ONNX modeli).
+# PyTorch dışı seçilirse MODEL_NAME bir kez dışa aktarılır ve ağırlık özetiyle models/ altına önbelleklenir.
+# Doğruluk ve hız karşılaştırması için: python -m benchmarks.backend_parity
+INFERENCE_BACKEND = "pytorch"
+INFERENCE_IMGSZ = None             # Dışa aktarma giriş boyutu; None: modelin eğitim boyutu
+INFERENCE_INTRA_OP_THREADS = None  # None: işçi sürecin PyTorch thread sayısı (TORCH_THREADS_PER_WORKER)
+# INT8 kalibrasyonu: her videodan eşit aralıklarla örneklenecek kare sayısı
+# Hız ve sayım farkı raporu için: python -m benchmarks.quantization_report
+QUANTIZATION_CALIBRATION_FRAMES_PER_VIDEO = 32
+
+# Kamera başına çıkarım boyutu (imgsz) profili
+# python -m benchmarks.imgsz_calibration her kamerayı aşağıdaki boyutlarda sayar, en büyük boyuta
+# göre hata bütçesi içinde kalan en küçük boyutu profile yazar; process_video bunu çalışma anında okur.
+CAMERA_PROFILE_PATH = "data/camera_profiles.json"
+IMGSZ_CALIBRATION_SIZES = [320, 416, 512, 640, 800]  # 32'nin katları
+IMGSZ_MAX_COUNT_ERROR = 0.05   # Son kişi sayısının en büyük boyuttaki sayıma göre göreli farkı
+IMGSZ_MAX_FRAME_ERROR = 0.10   # Kare başına bölgedeki tespit sayısının ortalama mutlak farkı / ortalama sayı
+
+# Aşamalı işlem hattı (pipeline) ayarları
+# Açıkken decode ve çizim/VideoWriter aşamaları ayrı thread'lerde, sınırlı kuyruklarla çalışır.
+PIPELINE_ENABLED = True
+PIPELINE_QUEUE_SIZE = 8      # Çizim kuyruğundaki en fazla kare
+PIPELINE_PREFETCH_FRAMES = 8  # Decode kuyruğunda önden okunan en fazla kare (en az bir batch tutulur)
+# Bellek maliyeti: kareler önceden ayrılmış halkaya (features/frame_buffers.py) yazılır, her kare
+# VIDEO_WIDTH * VIDEO_HEIGHT * 3 bayttır (1200x750'de ~2.7 MB). İşçi başına halka
+# (ceil(PIPELINE_PREFETCH_FRAMES / batch) + 2) * batch + (PIPELINE_QUEUE_SIZE + 1) * çizim adımı karedir:
+# batch 1'de 19 kare (~51 MB), batch 16'da 57 kare (~154 MB); toplam bunun eşzamanlı işçi sayısı katıdır.
+
+# Aşama benchmark'ı (python -m benchmarks.pipeline_stages)
+# Rapor JSON + Markdown olarak yazılır ve kayıtlı temel ölçümle (baseline) karşılaştırılır.
+BENCHMARK_REPORT_DIRECTORY = "outputs/benchmarks"
+BENCHMARK_BASELINE_PATH = "benchmarks/baselines/pipeline_stages.json"
+BENCHMARK_LATENCY_REGRESSION = 0.15   # Aşama p50/p95 süresinin izin verilen göreli artışı
+BENCHMARK_FPS_REGRESSION = 0.10       # Toplam fps'in izin verilen göreli düşüşü
+BENCHMARK_MIN_DELTA_MS = 0.5          # Bundan küçük mutlak artışlar gerileme sayılmaz (ölçüm gürültüsü)
+
+# Gerçek zamanlı mod (canlı kameralar): kaynak kendi fps'inde okunur, sadece en yeni kare işlenir,
+# işleme geride kalırsa bayat kareler düşürülür. main.py'de --realtime ile de açılabilir.
+REALTIME_MODE = False
+REALTIME_PACE_FILES = True  # Yerel dosyalar kamera gibi duvar saati hızında oynatılır
+
+# Hareket tabanlı uyarlanabilir kare atlama
+# Sayım bölgesindeki küçültülmüş kare farkı eşiğin altındaysa çıkarım atlanır, son tespitler taşınır.
+MOTION_GATE_ENABLED = False
+MOTION_THRESHOLD = 0.02   # Ortalama mutlak piksel farkı (0-1); üstünde hareket var kabul edilir
+MOTION_MIN_STRIDE = 1     # Hareket varken iki çıkarım arasındaki en az kare sayısı
+MOTION_MAX_STRIDE = 10    # Sahne durağan olsa bile en geç bu kadar karede bir çıkarım yapılır
+MOTION_DOWNSCALE = 8      # Hareket skoru için kare bu oranda küçültülür
+
+# Bölgeye kırpılmış (ROI) çıkarım
+# Açıkken model sadece kameranın bölgelerini çevreleyen dikdörtgeni (+ pay) görür.
+# Pay, sayım bölgesinin üst kenarına yakın duran kişilerin baş/gövde kısmını da kapsamalıdır.
+ROI_CROP_ENABLED = False
+ROI_MARGIN = 40  # Piksel cinsinden, dikdörtgenin her kenarına eklenir
+
+# Çizim/kayıt modu: "full" (her kare, tam çözünürlük), "headless" (çizim ve video kaydı yok,
+# sadece sayım/doluluk) veya "preview" (karelerin bir kısmı düşük çözünürlükte kaydedilir).
+# main.py'de --mode ile çalıştırma başına seçilebilir.
+RENDER_MODE = "full"
+PREVIEW_SCALE = 0.5            # Önizleme videosunun çözünürlük oranı
+PREVIEW_FRAME_FRACTION = 0.2   # Önizlemeye yazılacak karelerin oranı (0.2 -> 5 karede bir)
+
+# Paylaşımlı çıkarım sunucusu ayarları
+# Açıkken model tek bir süreçte bir kez yüklenir, tüm vagon süreçleri kareleri ona gönderir.
+INFERENCE_SERVER_ENABLED = False
+INFERENCE_SERVER_MAX_BATCH = 16             # Farklı vagonlardan tek ileri geçişte işlenecek en fazla kare
+INFERENCE_SERVER_BATCH_TIMEOUT_MS = 10      # Batch'i doldurmak için beklenecek en uzun süre
+INFERENCE_SERVER_RING_SLOTS = 8             # Her vagonun paylaşımlı bellek halka tamponundaki kare sayısı
+INFERENCE_SERVER_RESPONSE_TIMEOUT_SECONDS = 120
+# Sunucu süreci bu kadar saniye nabız (heartbeat) yazmazsa öldü sayılır; işçiler yanıt zaman aşımını beklemez
+INFERENCE_SERVER_HEARTBEAT_TIMEOUT_SECONDS = 5
+
+# Süreç havuzu ayarları (main.py)
+MAX_CONCURRENT_WORKERS = None           # None: fiziksel çekirdek sayısı / TORCH_THREADS_PER_WORKER
+TORCH_THREADS_PER_WORKER = 2            # Her video sürecinin kullanacağı PyTorch/OpenCV thread sayısı
+PROGRESS_REPORT_INTERVAL_SECONDS = 5    # İşçilerin ilerleme raporlama sıklığı
+
+# Canlı metrikler: işçiler metriklerini main.py'ye gönderir, main.py bunları
+# http://METRICS_HOST:METRICS_PORT/metrics adresinde Prometheus biçiminde sunar.
+# Varsayılan kapalıdır (her çalıştırmada HTTP portu açılmasın); dağıtımlar METRICS_ENABLED ile ya da
+# main.py'de --metrics-port 9108 ile açar, 0 verilirse uç nokta kapatılır.
+METRICS_ENABLED = False
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+METRICS_REPORT_INTERVAL_SECONDS = 1.0   # İşçilerin metrik gönderme sıklığı
+
 # Minimum detection boyutu (piksel cinsinden)
 MIN_DETECTION_WIDTH = 20   # Çok küçük detection'ları filtrele
 MIN_DETECTION_HEIGHT = 40  # Çok küçük detection'ları filtrele
@@ -42,6 +138,77 @@ MAX_DETECTION_HEIGHT_RATIO = 0.9  # Frame yüksekliğinin %90'ı
 
 INPUT_VIDEO_DIRECTORY = "data/videos"
 
+# Depolama arka ucu: "firestore", "sqlite" veya "memory"
+# sqlite ve memory kimlik bilgisi/ağ gerektirmez (çevrimdışı geliştirme ve benchmark için).
+# memory arka ucu süreçler arasında paylaşılmaz; işçi süreçlerinin yazdıkları ana süreçte görünmez.
+STORAGE_BACKEND = "firestore"
+SQLITE_DATABASE_PATH = "outputs/wagon_storage.sqlite3"
+
+# wagon_fullness_current yazma birleştirme ayarları
+# Doküman sadece doluluk değiştiğinde ya da heartbeat aralığında yazılır,
+# Firestore'un doküman başına yazma limiti için en fazla MIN_INTERVAL'da bir.
+CURRENT_FULLNESS_MIN_INTERVAL_SECONDS = 1.0
+CURRENT_FULLNESS_HEARTBEAT_SECONDS = 10.0
+
+# wagon_fullness_history arka plan yazıcısı
+# Kayıtlar kuyrukta toplanır ve boyut ya da süre dolunca tek WriteBatch ile commit edilir.
+HISTORY_WRITER_BATCH_SIZE = 100            # Firestore sınırı 500
+HISTORY_WRITER_FLUSH_SECONDS = 5.0         # Batch dolmasa bile en geç bu sürede yazılır
+HISTORY_WRITER_QUEUE_SIZE = 1000
+HISTORY_WRITER_OVERFLOW_POLICY = "block"   # "block", "drop_newest" veya "drop_oldest"
+
+# Yerel sütunsal doluluk geçmişi (outputs/history/<run_id>/)
+# Her işlenen kare sabit genişlikli bir kayıt olarak yerel diske eklenir.
+LOCAL_HISTORY_ENABLED = True
+LOCAL_HISTORY_DIRECTORY = "outputs/history"
+LOCAL_HISTORY_BUFFER_ROWS = 4096          # Tampon dolunca diske eklenir
+LOCAL_HISTORY_FLUSH_SECONDS = 1.0         # Tampon dolmasa bile en geç bu sürede eklenir
+# wagon_fullness_history koleksiyonuna bu aralıkta seyreltilmiş kopya yazılır
+HISTORY_MIRROR_ENABLED = True
+HISTORY_MIRROR_INTERVAL_SECONDS = 5.0
+# Streamlit oynatma kaynağı: "local" (en son yerel çalıştırma, yoksa depolama) veya "storage"
+REPLAY_SOURCE = "local"
+# Oynatma zaman çizelgesi: vagon başına tik başına son değer tutulur
+REPLAY_TIMELINE_HZ = 10          # Saniyedeki tik (ve çizim) sayısı
+REPLAY_MAX_TICKS = 500_000       # Uzun kayıtlarda bu sınırı aşmamak için tik hızı düşürülür
+REPLAY_PAGE_SIZE = 500           # Depolamadan imleçli okuma sayfa boyutu
+REPLAY_DEFAULT_SPEED = 10        # features/replay.py REPLAY_SPEEDS seçeneklerinden biri
+
+# Canlı görünüm önbelleği (tüm Streamlit oturumları tek bir önbellekten okur)
+# "auto": Firestore'da on_snapshot dinleyicisi, diğer arka uçlarda yoklama; "listener" veya "poll"
+LIVE_SNAPSHOT_MODE = "auto"
+LIVE_POLL_INTERVAL_SECONDS = 1.0     # Yoklama modunda süreç başına tek okuma aralığı
+LIVE_RERUN_TIMEOUT_SECONDS = 30.0    # Değişiklik olmasa da oturum en geç bu sürede yenilenir
+
+# Çalıştırma (run) saklama politikası
+# Her çalıştırma kendi run_id'si ile yazar; başlangıçta hiçbir şey silinmez. Eski çalıştırmalar
+# (tarihsel kayıtlar ve yerel geçmiş dizinleri) arka planda paralel batch commit'lerle temizlenir.
+# Bir çalıştırma son KEEP_RUNS çalıştırmadan biriyse VEYA KEEP_DAYS günden yeniyse saklanır;
+# None verilen ölçüt devre dışıdır, ikisi de None ise hiçbir şey silinmez.
+# Not: Firestore'da run_id + timestamp sorgusu için bileşik indeks gerekir.
+HISTORY_RETENTION_KEEP_RUNS = 5
+HISTORY_RETENTION_KEEP_DAYS = 7
+PURGE_MAX_WORKERS = 8               # Aynı anda commit edilen silme batch'i sayısı
+
+# Kontrol noktaları (checkpoint) ve kaldığı yerden devam
+# İşçi, video başına kare indeksi, sayılan kişiler, tracker durumu ve yazıcı konumunu periyodik olarak
+# outputs/history/<run_id>/checkpoints/ altına yazar. main.py --resume ile tamamlanmamış son çalıştırmayı
+# sürdürür: tamamlanmış videolar (video içeriği + model/ayar özeti eşleşiyorsa) atlanır, diğerleri son kontrol
+# noktasından devam eder. Gerçek zamanlı modda (canlı kaynakta geri sarılamaz) kontrol noktası alınmaz.
+# Sürdürme isteğe bağlıdır: hep başarısız olan bir video varsa çalıştırma hiç tamamlanmaz ve varsayılan
+# açık olsaydı sonraki her çalıştırma (yeni videolarla birlikte) aynı eski run_id'ye katılırdı.
+CHECKPOINT_ENABLED = True
+CHECKPOINT_INTERVAL_SECONDS = 30.0
+CHECKPOINT_RESUME = False
+
+# Tespit önbelleği
+# process_video kare başına ham takip kutularını outputs/detection_cache/ altına yazar (video + model +
+# YOLO ayarları özetiyle anahtarlanır). Bölge, boyut filtresi, çift tespit eşiği veya vagon kapasitesi
+# değiştiğinde `python recount.py` modeli çalıştırmadan sayımı önbellekten tekrarlar.
+DETECTION_CACHE_ENABLED = True
+DETECTION_CACHE_DIRECTORY = "outputs/detection_cache"
+DETECTION_CACHE_BUFFER_FRAMES = 4096   # Kare kayıtları bu kadar birikince diske eklenir
+
 # Renk ayarları
 TRACKED_COLOR = (0, 255, 255)  # Sarı
 IN_ZONE_COLOR = (0, 255, 0)    # Yeşil
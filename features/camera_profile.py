@@ -0,0 +1,72 @@
+# features/camera_profile.py
+# Kamera başına çalışma zamanı profili (şimdilik çıkarım giriş boyutu, imgsz).
+# Profil, benchmarks/imgsz_calibration.py tarafından her kameranın videosu farklı boyutlarda
+# sayılarak oluşturulur ve process_video tarafından çalışma anında okunur.
+# Profil kalibre edildiği modelin özetini taşır; model değişirse profil yok sayılır.
+import json
+import os
+import time
+
+import config
+from features.hashing import model_hash
+
+
+def load_camera_profiles(path=None):
+    """{camera_id: profil} sözlüğü; dosya yoksa boş sözlük"""
+    path = path or config.CAMERA_PROFILE_PATH
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_camera_profile(camera_id, profile, path=None):
+    """Kameranın profilini diğer kameralarınkini koruyarak (atomik olarak) yazar"""
+    path = path or config.CAMERA_PROFILE_PATH
+    profiles = load_camera_profiles(path)
+    profiles[camera_id] = dict(profile, model_hash=model_hash(config.MODEL_NAME),
+                               calibrated_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def camera_imgsz(camera_id, path=None):
+    """
+    Kamera için kalibre edilmiş imgsz; profil yoksa ya da başka bir model için kalibre
+    edildiyse config.INFERENCE_IMGSZ (None: modelin varsayılanı)
+    """
+    profile = load_camera_profiles(path).get(camera_id)
+    if not profile or not profile.get("imgsz"):
+        return config.INFERENCE_IMGSZ
+    if profile.get("model_hash") != model_hash(config.MODEL_NAME):
+        print(f"UYARI: '{camera_id}' profili başka bir model için kalibre edilmiş, yok sayılıyor.")
+        return config.INFERENCE_IMGSZ
+    return int(profile["imgsz"])
+
+
+def inference_imgsz(camera_id, inference_server=False, path=None):
+    """
+    Kameranın kareleri fiilen hangi imgsz ile çıkarıma girer: paylaşımlı çıkarım sunucusu tüm
+    kameralar için tek boyutla (config.INFERENCE_IMGSZ) çalışır, kamera profilini uygulamaz.
+    Önbellek ve kontrol noktası anahtarları bu değerle hesaplanır.
+    """
+    if inference_server:
+        return config.INFERENCE_IMGSZ
+    return camera_imgsz(camera_id, path)
+
+
+def select_imgsz(results, max_count_error=None, max_frame_error=None):
+    """
+    Kalibrasyon sonuçlarından ({imgsz: {"count_error", "frame_error", ...}}) hata bütçesi
+    içinde kalan en küçük boyutu seçer; hiçbiri kalmıyorsa en büyük boyutu döndürür.
+    """
+    max_count_error = config.IMGSZ_MAX_COUNT_ERROR if max_count_error is None else max_count_error
+    max_frame_error = config.IMGSZ_MAX_FRAME_ERROR if max_frame_error is None else max_frame_error
+    for imgsz in sorted(results):
+        if (results[imgsz]["count_error"] <= max_count_error
+                and results[imgsz]["frame_error"] <= max_frame_error):
+            return imgsz
+    return max(results)
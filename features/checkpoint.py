@@ -0,0 +1,98 @@
+# features/checkpoint.py
+# Uzun videoların kaldığı yerden devam edebilmesi için video başına kontrol noktaları.
+# Kontrol noktası çalıştırmanın yerel geçmiş dizininde (outputs/history/<run_id>/checkpoints/<vagon>.ckpt)
+# tutulur, böylece saklama politikası çalıştırmayı silerken kontrol noktalarını da siler.
+# Her kontrol noktası bir anahtar taşır: video içeriğinin özeti + sayımı etkileyen model/ayarların özeti.
+# Video ya da ayarlar değiştiyse kontrol noktası yok sayılır ve video baştan işlenir.
+import os
+import pickle
+import time
+
+import config
+from features.camera_profile import inference_imgsz
+from features.database.history_store import run_directory
+from features.detection_cache import detection_settings
+from features.hashing import settings_hash, short_file_hash
+from features.zone_lookup import zones_for_camera
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_EXTENSION = ".ckpt"
+
+
+def checkpoint_directory(run_id, root=None):
+    return os.path.join(run_directory(run_id, root), "checkpoints")
+
+
+def counting_settings(camera_id, imgsz=None, motion_gated=None, roi_cropped=None):
+    """Sayım sonucunu değiştirebilecek model ve ayarlar (kontrol noktası anahtarına girer)"""
+    return dict(
+        detection_settings(camera_id, imgsz, motion_gated, roi_cropped),
+        zones=zones_for_camera(camera_id),
+        filter=[config.MIN_DETECTION_WIDTH, config.MIN_DETECTION_HEIGHT, config.MAX_DETECTION_WIDTH_RATIO,
+                config.MAX_DETECTION_HEIGHT_RATIO, config.DETECTION_IOU_THRESHOLD],
+        capacity=config.WAGON_CAPACITY,
+    )
+
+
+def checkpoint_key(video_file, settings):
+    return {"video": short_file_hash(video_file), "settings": settings_hash(settings)}
+
+
+class VideoCheckpoint:
+    """
+    Bir videonun (vagonun) kontrol noktası dosyası.
+    Durum sözlüğü pickle ile yazılır; yazma geçici dosya + os.replace ile atomiktir, böylece
+    kayıt sırasında çöken bir işçi önceki kontrol noktasını bozmaz.
+    """
+
+    def __init__(self, run_id, camera_id, key, root=None):
+        self.directory = checkpoint_directory(run_id, root)
+        self.path = os.path.join(self.directory, camera_id + CHECKPOINT_EXTENSION)
+        self.camera_id = camera_id
+        self.key = key
+
+    def load(self):
+        """Anahtarı eşleşen durum sözlüğünü, yoksa None döndürür"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(f"UYARI: {self.camera_id} kontrol noktası okunamadı ({e}), video baştan işlenecek.")
+            return None
+        if state.get("version") != CHECKPOINT_VERSION or state.get("key") != self.key:
+            print(f"ℹ️ {self.camera_id}: video veya model/ayarlar değişmiş, kontrol noktası yok sayılıyor.")
+            return None
+        return state
+
+    def completed_summary(self):
+        """Video bu anahtarla tamamlanmışsa işlem özetini, aksi halde None döndürür"""
+        state = self.load()
+        return state["summary"] if state and state.get("completed") else None
+
+    def save(self, state):
+        os.makedirs(self.directory, exist_ok=True)
+        state = dict(state, version=CHECKPOINT_VERSION, key=self.key, saved_at=time.time())
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def mark_completed(self, summary):
+        self.save({"completed": True, "summary": summary})
+
+
+def video_checkpoint(run_id, video_file, imgsz=None, motion_gated=None, roi_cropped=None, inference_server=False,
+                     root=None):
+    """
+    Videonun bu çalıştırmadaki kontrol noktası. Ayarlar process_video'daki gibi çözülür
+    (imgsz verilmezse çıkarımın fiilen kullandığı boyut), böylece main.py ile işçi aynı anahtarı hesaplar.
+    """
+    camera_id = os.path.splitext(os.path.basename(video_file))[0]
+    imgsz = imgsz or inference_imgsz(camera_id, inference_server)
+    settings = counting_settings(camera_id, imgsz, motion_gated, roi_cropped)
+    return VideoCheckpoint(run_id, camera_id, checkpoint_key(video_file, settings), root)
+
@@ -0,0 +1,88 @@
+# features/counting.py
+# Sayım adımı: bölgedeki kişilerin track id'leriyle sayılması ve doluluk yüzdesi.
+# process_video ve recount.py (önbellekteki tespitlerden yeniden sayım) aynı fonksiyonları kullanır;
+# modül model ya da depolama yüklemez.
+import numpy as np
+
+import config
+
+# Kutu durum kodları (sayım aşaması üretir, çizim aşaması kullanır)
+STATUS_IGNORED = -1
+STATUS_OUTSIDE = 0
+STATUS_TRACKED = 1
+STATUS_IN_ZONE = 2
+
+
+class TrackedIdSet:
+    """
+    Sayım bölgesinde görülmüş track id'lerinin kümesi (set yerine bit eşlem).
+    Tracker id'leri 1'den başlayıp artan tam sayılar olduğundan id doğrudan indeks olarak kullanılır;
+    ekleme ve sorgulama kare başına Python nesnesi üretmeden dizi işlemleriyle yapılır.
+    """
+
+    def __init__(self, capacity=1024):
+        self._seen = np.zeros(capacity, dtype=bool)
+        self._count = 0
+
+    def _grow(self, max_id):
+        capacity = len(self._seen)
+        while capacity <= max_id:
+            capacity *= 2
+        seen = np.zeros(capacity, dtype=bool)
+        seen[:len(self._seen)] = self._seen
+        self._seen = seen
+
+    def add(self, track_ids):
+        """track_ids: int dizisi (negatif id'ler yok sayılır)"""
+        track_ids = track_ids[track_ids >= 0]
+        if len(track_ids) == 0:
+            return
+        max_id = track_ids.max()
+        if max_id >= len(self._seen):
+            self._grow(max_id)
+        new_ids = np.unique(track_ids[~self._seen[track_ids]])
+        self._seen[new_ids] = True
+        self._count += len(new_ids)
+
+    def contains(self, track_ids):
+        """track_ids ile aynı uzunlukta bool dizi döndürür"""
+        valid = (track_ids >= 0) & (track_ids < len(self._seen))
+        result = np.zeros(len(track_ids), dtype=bool)
+        result[valid] = self._seen[track_ids[valid]]
+        return result
+
+    def __contains__(self, track_id):
+        return 0 <= track_id < len(self._seen) and bool(self._seen[track_id])
+
+    def __len__(self):
+        return self._count
+
+
+def count_people(bboxes, in_counting_zone, people_tracked):
+    """
+    Sayım bölgesindeki kişileri people_tracked (TrackedIdSet) kümesine ekler ve bölgedeki
+    farklı kişi sayısını döndürür.
+    Çizim aşaması bu kümeye erişmeden çalışabilsin diye her kutu için durum kodu döndürür.
+    Kutu dizisinden Python listesi/kümesi üretilmez; tüm adımlar dizi işlemleridir.
+    """
+    if len(bboxes) == 0:
+        return 0, np.empty(0, dtype=np.int8)
+
+    track_ids = bboxes[:, 4].astype(np.int64)
+    is_person = bboxes[:, 6] == config.PERSON_ID
+    in_zone = in_counting_zone & is_person
+
+    in_zone_ids = track_ids[in_zone]
+    people_tracked.add(in_zone_ids)
+
+    statuses = np.full(len(bboxes), STATUS_OUTSIDE, dtype=np.int8)
+    statuses[people_tracked.contains(track_ids)] = STATUS_TRACKED
+    statuses[in_zone] = STATUS_IN_ZONE
+    statuses[~is_person] = STATUS_IGNORED
+    return len(np.unique(in_zone_ids)), statuses
+
+
+def fullness_percentage(people_count, capacity=None):
+    """Kişi sayısını vagon kapasitesine göre 0-100 aralığında doluluk yüzdesine çevirir"""
+    capacity = capacity or config.WAGON_CAPACITY
+    return max(0, min(100, people_count / capacity * 100))
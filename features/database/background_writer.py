@@ -0,0 +1,164 @@
+# features/database/background_writer.py
+# Tarihsel doluluk kayıtlarını kare döngüsünü bekletmeden arka planda yazar.
+# Kayıtlar sınırlı bir kuyrukta toplanır ve boyut ya da süre dolduğunda tek bir
+# toplu yazma ile (Firestore'da WriteBatch commit'i, SQLite'ta tek transaction) yazılır. Kuyruk dolduğunda seçilen politika uygulanır.
+import queue
+import threading
+import time
+
+# Firestore bir WriteBatch'te en fazla 500 işleme izin verir
+FIRESTORE_MAX_BATCH_SIZE = 500
+
+OVERFLOW_BLOCK = "block"              # Yer açılana kadar bekle (block_timeout dolarsa kaydı düşür)
+OVERFLOW_DROP_NEWEST = "drop_newest"  # Yeni kaydı düşür
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Kuyruktaki en eski kaydı düşürüp yeni kaydı ekle
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST)
+
+_STOP = object()
+
+
+class _Flush:
+    """flush() işareti: önündeki kayıtlar yazılınca done ayarlanır"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BackgroundBatchWriter:
+    """
+    Bir koleksiyona otomatik ID'li dokümanlar ekleyen arka plan yazıcısı.
+    submit() kare döngüsünden çağrılır; close() kalan kayıtları yazıp thread'i kapatır.
+    storage olarak herhangi bir StorageBackend (Firestore, SQLite, bellek içi) verilebilir.
+    write_observer verilirse her batch commit'inden sonra yazıcı thread'inde (süre sn, başarılı mı)
+    ile çağrılır.
+    """
+
+    def __init__(self, storage, collection_name, max_batch_size=100, flush_interval_seconds=5.0,
+                 queue_size=1000, overflow_policy=OVERFLOW_BLOCK, block_timeout_seconds=1.0,
+                 write_observer=None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Geçersiz taşma politikası: {overflow_policy} "
+                             f"(seçenekler: {', '.join(OVERFLOW_POLICIES)})")
+        self.storage = storage
+        self.collection_name = collection_name
+        self.max_batch_size = max(1, min(max_batch_size, FIRESTORE_MAX_BATCH_SIZE))
+        self.flush_interval_seconds = flush_interval_seconds
+        self.overflow_policy = overflow_policy
+        self.block_timeout_seconds = block_timeout_seconds
+        self.write_observer = write_observer
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "failed_records": 0
+        }
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"{collection_name}-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """Kaydı kuyruğa ekler; kayıt düşürüldüyse False döndürür"""
+        if self._closed:
+            raise RuntimeError("Kapatılmış yazıcıya kayıt gönderilemez.")
+        self.stats["submitted"] += 1
+
+        if self.overflow_policy == OVERFLOW_BLOCK:
+            try:
+                self.queue.put(record, timeout=self.block_timeout_seconds)
+                return True
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+
+        if self.overflow_policy == OVERFLOW_DROP_NEWEST:
+            try:
+                self.queue.put_nowait(record)
+                return True
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+
+        # OVERFLOW_DROP_OLDEST
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return True
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.stats["dropped"] += 1
+                except queue.Empty:
+                    pass
+
+    def _commit(self, records):
+        if not records:
+            return
+        start = time.perf_counter()
+        try:
+            self.storage.create_documents(self.collection_name, records)
+            self.stats["written"] += len(records)
+            self.stats["batches"] += 1
+            ok = True
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            self.stats["failed_records"] += len(records)
+            ok = False
+            print(f"UYARI: '{self.collection_name}' için {len(records)} kayıtlık batch yazılamadı: {e}")
+        if self.write_observer:
+            self.write_observer(time.perf_counter() - start, ok)
+
+    def _run(self):
+        records = []
+        deadline = None
+        while True:
+            timeout = self.flush_interval_seconds if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._commit(records)
+                return
+            if isinstance(item, _Flush):
+                self._commit(records)
+                records = []
+                deadline = None
+                item.done.set()
+                continue
+            if item is not None:
+                records.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_seconds
+
+            if records and (len(records) >= self.max_batch_size or time.monotonic() >= deadline):
+                self._commit(records)
+                records = []
+                deadline = None
+
+    def depth(self):
+        """Kuyrukta bekleyen kayıt sayısı"""
+        return self.queue.qsize()
+
+    def flush(self, timeout=None):
+        """
+        O ana kadar gönderilen kayıtların commit edilmesini bekler (kontrol noktaları için).
+        Süre dolduysa False döndürür.
+        """
+        if self._closed:
+            return True
+        marker = _Flush()
+        self.queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout=None):
+        """Kalan kayıtları son bir commit ile yazar ve thread'in bitmesini bekler"""
+        if self._closed:
+            return
+        self._closed = True
+        # Kapanış işareti kuyruk dolu olsa bile (taşma politikasından bağımsız) teslim edilmeli
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
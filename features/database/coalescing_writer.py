@@ -0,0 +1,92 @@
+# features/database/coalescing_writer.py
+# Anlık doluluk dokümanlarına her karede yazmak yerine sadece değer değiştiğinde
+# (veya heartbeat aralığında) yazar ve doküman başına yazma hızını sınırlar.
+# Böylece Firestore'un doküman başına yazma limiti aşılmaz, bastırılan yazmalar sayılır.
+import time
+
+
+class CoalescingWriter:
+    """
+    Doküman başına son yayınlanan değeri tutar ve publish() çağrılarını birleştirir:
+    - Değer değişmediyse ve heartbeat süresi dolmadıysa yazılmaz.
+    - Son yazma denemesinden (başarısız olsa da) bu yana min_interval_seconds geçmediyse yazılmaz;
+      en son değer bekletilir ve sonraki uygun çağrıda ya da flush() ile yazılır.
+    - Başarısız yazmanın değeri de bekletilir ve aynı şekilde yeniden denenir.
+    storage olarak herhangi bir StorageBackend (Firestore, SQLite, bellek içi) verilebilir.
+    write_observer verilirse her yazma çağrısından sonra (süre sn, başarılı mı) ile çağrılır.
+    """
+
+    def __init__(self, storage, collection_name, min_interval_seconds=1.0, heartbeat_seconds=10.0,
+                 clock=time.monotonic, write_observer=None):
+        self.storage = storage
+        self.collection_name = collection_name
+        self.min_interval_seconds = min_interval_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.clock = clock
+        self.write_observer = write_observer
+        self.last_published = {}  # document_id -> (değer, yazma zamanı)
+        self.last_attempt = {}    # document_id -> son yazma denemesinin zamanı (başarısızlar dahil)
+        self.pending = {}         # document_id -> (data, değer), hız limiti ya da hata yüzünden bekleyen son değer
+        self.stats = {
+            "published": 0,
+            "heartbeats": 0,
+            "suppressed_unchanged": 0,
+            "suppressed_rate_limited": 0,
+            "failed": 0
+        }
+
+    def _write(self, document_id, data, value, now):
+        # Başarısız denemeler de hız limitine sayılır; aksi halde arızalı arka uca her karede yazılırdı
+        self.last_attempt[document_id] = now
+        start = time.perf_counter()
+        ok = self.storage.create_document(self.collection_name, data, document_id=document_id) is not None
+        if self.write_observer:
+            self.write_observer(time.perf_counter() - start, ok)
+        if not ok:
+            # Değer bekletilir; sonraki uygun publish() ya da flush() yeniden dener
+            self.pending[document_id] = (data, value)
+            self.stats["failed"] += 1
+            return False
+        self.pending.pop(document_id, None)
+        self.last_published[document_id] = (value, now)
+        self.stats["published"] += 1
+        return True
+
+    def publish(self, document_id, data, value):
+        """Gerekliyse dokümanı yazar; yazma yapıldıysa True döndürür"""
+        now = self.clock()
+        last = self.last_published.get(document_id)
+        heartbeat = False
+        if last is not None:
+            last_value, last_time = last
+            changed = value != last_value
+            if not changed and now - last_time < self.heartbeat_seconds:
+                # Değer yayınlanmış olana geri döndüyse bekleyen daha yeni değer artık eskidir
+                self.pending.pop(document_id, None)
+                self.stats["suppressed_unchanged"] += 1
+                return False
+            heartbeat = not changed
+        last_attempt = self.last_attempt.get(document_id)
+        if last_attempt is not None and now - last_attempt < self.min_interval_seconds:
+            self.pending[document_id] = (data, value)
+            self.stats["suppressed_rate_limited"] += 1
+            return False
+        if heartbeat:
+            self.stats["heartbeats"] += 1
+        return self._write(document_id, data, value, now)
+
+    def flush(self):
+        """
+        Bekleyen son değerleri (limite bakmadan) yazar; yazılamayanlar bekletilmeye devam eder
+        ve sonraki flush() ile yeniden denenir.
+        """
+        now = self.clock()
+        for document_id, (data, value) in list(self.pending.items()):
+            last = self.last_published.get(document_id)
+            if last is None or last[0] != value:
+                self._write(document_id, data, value, now)
+            else:
+                self.pending.pop(document_id, None)
+
+    def suppressed_count(self):
+        return self.stats["suppressed_unchanged"] + self.stats["suppressed_rate_limited"]
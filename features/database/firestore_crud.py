@@ -1,8 +1,8 @@
 # features/database/firestore_crud.py
 # --- Genel CRUD Fonksiyonları ---
-from features.database.initialize_firebase import initialize_firebase
-from firebase_admin import firestore # SERVER_TIMESTAMP için gerekli
-import time # <-- Add this line
+# Fonksiyonlar sadece kendilerine verilen istemciyi kullanır; firebase_admin/streamlit import'u
+# gerektirmedikleri için InMemoryFirestoreClient ile de çalışırlar (bkz. storage.py)
+from concurrent.futures import ThreadPoolExecutor
 
 # collection = "trainwagon" # Bu satırı kaldırın, koleksiyon adını fonksiyonlara parametre olarak geçireceğiz.
 
@@ -101,41 +101,50 @@ def delete_document(db, collection_name, document_id):
         return False
 
 
-# --- Yeni Eklenecek Fonksiyon ---
-def delete_all_documents_in_collection(db, collection_name, batch_size=500):
+def delete_query_results(db, query, batch_size=500, max_workers=8):
     """
-    Belirtilen koleksiyondaki tüm dokümanları siler.
-    Firestore'da koleksiyon silme doğrudan bir API değildir, bu yüzden dokümanlar tek tek (batch halinde) silinir.
+    Sorgunun döndürdüğü tüm dokümanları siler. Uzun süre açık kalan tek bir akış Firestore'un
+    akış süre sınırına takılabileceği için dokümanlar batch_size * max_workers'lık sayfalar halinde
+    okunur. Her sayfa batch_size'lık WriteBatch'lerle max_workers thread'de paralel commit edilir,
+    sayfa silinince sorgu yeniden çalıştırılır (silinenler artık dönmez, imleç gerekmez).
     """
-    if db is None:
-        print("❌ Hata: Firebase istemcisi başlatılmamış, koleksiyon temizlenemedi.")
-        return 0
-
-    print(f"⏳ '{collection_name}' koleksiyonundaki eski loglar temizleniyor...")
     deleted_count = 0
+    page_size = batch_size * max_workers
 
-    # Dokümanları parçalar halinde (batch) silmek için döngü
-    while True:
-        # Belirli sayıda dokümanı al
-        docs = db.collection(collection_name).limit(batch_size).stream()
-        documents = list(docs)  # Iterator'ı listeye dönüştürerek üzerinde işlem yapabilmek için
-
-        if not documents:
-            # Daha fazla doküman yoksa döngüyü kır
-            break
-
-        # Batch işlemi başlat
+    def commit(references):
         batch = db.batch()
-        for doc in documents:
-            batch.delete(doc.reference)
-            deleted_count += 1
-
-        # Batch'i commit et (değişiklikleri uygula)
+        for reference in references:
+            batch.delete(reference)
         batch.commit()
+        return len(references)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            references = [doc.reference for doc in query.limit(page_size).stream()]
+            if not references:
+                break
+            futures = [executor.submit(commit, references[start:start + batch_size])
+                       for start in range(0, len(references), batch_size)]
+            # Sonraki sayfa okunmadan önce bu sayfanın tüm silmeleri bitmeli, yoksa aynı dokümanlar tekrar döner
+            for future in futures:
+                deleted_count += future.result()
+            if len(references) < page_size:
+                break
+    return deleted_count
 
-        # API hız limitlerine takılmamak için kısa bir bekleme
-        time.sleep(0.1)
 
+def delete_all_documents_in_collection(db, collection_name, batch_size=500, max_workers=8):
+    """
+    Belirtilen koleksiyondaki tüm dokümanları siler.
+    Firestore'da koleksiyon silme doğrudan bir API değildir, bu yüzden dokümanlar batch halinde,
+    paralel commit'lerle silinir.
+    """
+    if db is None:
+        print("❌ Hata: Firebase istemcisi başlatılmamış, koleksiyon temizlenemedi.")
+        return 0
+
+    print(f"⏳ '{collection_name}' koleksiyonundaki eski loglar temizleniyor...")
+    deleted_count = delete_query_results(db, db.collection(collection_name), batch_size, max_workers)
     print(f"🗑️ '{collection_name}' koleksiyonundan toplam {deleted_count} doküman silindi.")
     return deleted_count
 
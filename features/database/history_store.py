@@ -0,0 +1,220 @@
+# features/database/history_store.py
+# Çalıştırma (run) başına yerel, sadece eklemeli (append-only) sütunsal doluluk geçmişi.
+# Her kayıt sabit genişliklidir: timestamp f8, wagon u2, fullness f4, frame_count u4.
+# Her sütun ayrı bir dosyadır ve okurken np.memmap ile belleğe eşlenir.
+#
+# Dizin yapısı (outputs/history/<run_id>/):
+#   wagons/00000          -> vagon indeksi 0'ın wagon_id'si (O_EXCL ile süreçler arası güvenli kayıt)
+#   segments/00000/*.bin  -> vagon 0'ın sütun dosyaları (timestamp.bin, wagon.bin, ...)
+# Her video ayrı süreçte tek bir vagonu işlediği için her segmentin tek bir yazıcısı olur.
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import config
+
+HISTORY_DTYPE = np.dtype([
+    ("timestamp", "<f8"),     # Unix zamanı (sn)
+    ("wagon", "<u2"),         # Vagon indeksi (wagons/ kaydı)
+    ("fullness", "<f4"),      # Doluluk yüzdesi
+    ("frame_count", "<u4")
+])
+COLUMNS = HISTORY_DTYPE.names
+
+
+def new_run_id():
+    """Sıralanabilir, zamana dayalı çalıştırma kimliği üretir (ör. 20250101-120000-ab12)"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(2).hex()}"
+
+
+def run_directory(run_id, root=None):
+    return os.path.join(root or config.LOCAL_HISTORY_DIRECTORY, run_id)
+
+
+def latest_run_directory(root=None):
+    """En son çalıştırmanın dizinini (run_id'ler zamana göre sıralanır), yoksa None döndürür"""
+    root = root or config.LOCAL_HISTORY_DIRECTORY
+    if not os.path.isdir(root):
+        return None
+    runs = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name, "segments")))
+    return os.path.join(root, runs[-1]) if runs else None
+
+
+def read_wagon_registry(run_dir):
+    """{vagon indeksi: wagon_id} döndürür"""
+    wagons_dir = os.path.join(run_dir, "wagons")
+    registry = {}
+    if not os.path.isdir(wagons_dir):
+        return registry
+    for name in os.listdir(wagons_dir):
+        with open(os.path.join(wagons_dir, name), encoding="utf-8") as f:
+            registry[int(name)] = f.read()
+    return registry
+
+
+def register_wagon(run_dir, wagon_id):
+    """wagon_id'ye çalıştırma içinde sabit bir indeks verir; süreçler arasında çakışmaz"""
+    wagons_dir = os.path.join(run_dir, "wagons")
+    os.makedirs(wagons_dir, exist_ok=True)
+    while True:
+        registry = read_wagon_registry(run_dir)
+        for index, registered_id in registry.items():
+            if registered_id == wagon_id:
+                return index
+        index = max(registry, default=-1) + 1
+        if index > np.iinfo(HISTORY_DTYPE["wagon"]).max:
+            raise ValueError("Bir çalıştırmada en fazla 65536 vagon kaydedilebilir.")
+        try:
+            fd = os.open(os.path.join(wagons_dir, f"{index:05d}"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue  # Aynı indeksi başka bir süreç aldı, kaydı yeniden oku
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(wagon_id)
+        return index
+
+
+class HistoryWriter:
+    """
+    Tek bir vagonun kayıtlarını önceden ayrılmış bir tamponda biriktirir ve tampon dolunca
+    ya da flush_interval_seconds geçince sütun dosyalarının sonuna ekler.
+    resume_rows verilirse (kontrol noktasından devam) sütun dosyaları bu satır sayısına kısaltılır;
+    kontrol noktasından sonra yazılmış ve tekrar işlenecek satırlar böylece iki kez kaydedilmez.
+    """
+
+    def __init__(self, run_dir, wagon_id, buffer_rows=None, flush_interval_seconds=None, resume_rows=None):
+        self.wagon_id = wagon_id
+        self.wagon_index = register_wagon(run_dir, wagon_id)
+        self.flush_interval_seconds = (config.LOCAL_HISTORY_FLUSH_SECONDS
+                                       if flush_interval_seconds is None else flush_interval_seconds)
+        self.buffer = np.empty(buffer_rows or config.LOCAL_HISTORY_BUFFER_ROWS, dtype=HISTORY_DTYPE)
+        self.buffer["wagon"] = self.wagon_index
+        self.count = 0
+        self.rows_written = 0
+        self.last_flush = time.monotonic()
+
+        segment_dir = os.path.join(run_dir, "segments", f"{self.wagon_index:05d}")
+        os.makedirs(segment_dir, exist_ok=True)
+        if resume_rows is not None:
+            for name in COLUMNS:
+                path = os.path.join(segment_dir, f"{name}.bin")
+                if os.path.exists(path):
+                    os.truncate(path, min(os.path.getsize(path), resume_rows * HISTORY_DTYPE[name].itemsize))
+            self.rows_written = resume_rows
+        self.files = {name: open(os.path.join(segment_dir, f"{name}.bin"), "ab") for name in COLUMNS}
+
+    def append(self, timestamp, fullness, frame_count):
+        row = self.buffer[self.count]
+        row["timestamp"] = timestamp
+        row["fullness"] = fullness
+        row["frame_count"] = frame_count
+        self.count += 1
+        if self.count == len(self.buffer) or time.monotonic() - self.last_flush >= self.flush_interval_seconds:
+            self.flush()
+
+    def flush(self):
+        if self.count:
+            for name, f in self.files.items():
+                f.write(self.buffer[name][:self.count].tobytes())
+                f.flush()
+            self.rows_written += self.count
+            self.count = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.files:
+            self.flush()
+            for f in self.files.values():
+                f.close()
+            self.files = {}
+
+
+def _map_segment(segment_dir):
+    """Segmentin sütun dosyalarını memmap ile açar; yarım yazılmış satırlar dışarıda bırakılır"""
+    columns = {}
+    for name in COLUMNS:
+        path = os.path.join(segment_dir, f"{name}.bin")
+        dtype = HISTORY_DTYPE[name]
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        rows = size // dtype.itemsize
+        # Boş dosya memmap ile açılamaz
+        columns[name] = np.memmap(path, dtype=dtype, mode="r", shape=(rows,)) if rows else np.empty(0, dtype)
+    rows = min(len(column) for column in columns.values())
+    return {name: column[:rows] for name, column in columns.items()}
+
+
+class HistoryReader:
+    """
+    Bir çalıştırmanın geçmişini memmap ile okur. Açıldığı andaki dosya boyutlarını görür;
+    yazım sürerken yeni kayıtları görmek için yeniden oluşturulmalıdır.
+    Segment içinde kayıtlar zamana göre sıralı olduğundan aralık sorguları ikili arama ile yapılır.
+    """
+
+    def __init__(self, run_dir):
+        self.run_dir = run_dir
+        self.run_id = os.path.basename(os.path.normpath(run_dir))
+        self.wagons = read_wagon_registry(run_dir)
+        self.segments = {}
+        segments_dir = os.path.join(run_dir, "segments")
+        if os.path.isdir(segments_dir):
+            for name in sorted(os.listdir(segments_dir)):
+                self.segments[int(name)] = _map_segment(os.path.join(segments_dir, name))
+
+    def wagon_ids(self):
+        return [self.wagons[index] for index in sorted(self.segments) if index in self.wagons]
+
+    def __len__(self):
+        return sum(len(segment["timestamp"]) for segment in self.segments.values())
+
+    def time_bounds(self):
+        """(ilk, son) kayıt zamanı; kayıt yoksa None"""
+        firsts = [s["timestamp"][0] for s in self.segments.values() if len(s["timestamp"])]
+        lasts = [s["timestamp"][-1] for s in self.segments.values() if len(s["timestamp"])]
+        return (float(min(firsts)), float(max(lasts))) if firsts else None
+
+    def _slice(self, segment, start, end):
+        timestamps = segment["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return {name: column[lo:hi] for name, column in segment.items()}
+
+    def wagon_range(self, wagon_id, start=None, end=None):
+        """Bir vagonun [start, end) aralığındaki sütunlarını (memmap görünümleri) döndürür"""
+        for index, registered_id in self.wagons.items():
+            if registered_id == wagon_id and index in self.segments:
+                return self._slice(self.segments[index], start, end)
+        return {name: np.empty(0, HISTORY_DTYPE[name]) for name in COLUMNS}
+
+    def records(self, start=None, end=None, interval_seconds=None):
+        """
+        Tüm vagonların [start, end) aralığındaki kayıtlarını zamana göre sıralı tek dizi olarak döndürür.
+        interval_seconds verilirse her vagon için her aralıktaki sadece son kayıt tutulur (seyreltme).
+        """
+        bounds = self.time_bounds()
+        origin = start if start is not None else (bounds[0] if bounds else 0.0)
+        parts = []
+        for segment in self.segments.values():
+            columns = self._slice(segment, start, end)
+            keep = slice(None)
+            if interval_seconds and len(columns["timestamp"]):
+                buckets = np.floor((columns["timestamp"] - origin) / interval_seconds)
+                keep = np.append(buckets[1:] != buckets[:-1], True)
+            part = np.empty(len(columns["timestamp"][keep]), dtype=HISTORY_DTYPE)
+            for name in COLUMNS:
+                part[name] = columns[name][keep]
+            parts.append(part)
+        if not parts:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+        merged = np.concatenate(parts)
+        return merged[np.argsort(merged["timestamp"], kind="stable")]
+
+    def iter_logs(self, start=None, end=None, interval_seconds=None):
+        """Kayıtları wagon_fullness_history dokümanlarıyla aynı biçimde sözlük olarak üretir"""
+        for timestamp, wagon, fullness, frame_count in self.records(start, end, interval_seconds).tolist():
+            yield {
+                "wagon_id": self.wagons.get(wagon, str(wagon)),
+                "fullness_percentage": round(fullness, 2),
+                "timestamp": datetime.fromtimestamp(timestamp, timezone.utc),
+                "frame_count": frame_count
+            }
@@ -0,0 +1,220 @@
+# features/database/memory_client.py
+# Firestore istemcisinin bu projede kullanılan kısmını taklit eden bellek içi istemci.
+# Kimlik bilgisi ve ağ olmadan yazıcıları, silme işlemlerini ve sorguları denemek için kullanılır.
+# Desteklenenler: collection/document/add/set/get/update/delete, where/order_by/limit/start_after,
+# stream, batch (set/update/delete/commit) ve SERVER_TIMESTAMP çözümleme.
+import copy
+import threading
+import uuid
+from datetime import datetime, timezone
+
+try:
+    from firebase_admin import firestore
+    SERVER_TIMESTAMP = firestore.SERVER_TIMESTAMP
+except ImportError:
+    SERVER_TIMESTAMP = object()
+
+DESCENDING = "DESCENDING"
+ASCENDING = "ASCENDING"
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "not-in": lambda a, b: a not in b,
+}
+
+
+def _resolve_sentinels(data):
+    """SERVER_TIMESTAMP değerlerini yazma anındaki UTC zamanla değiştirir"""
+    now = datetime.now(timezone.utc)
+    return {key: (now if value is SERVER_TIMESTAMP else copy.deepcopy(value)) for key, value in data.items()}
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class DocumentReference:
+    def __init__(self, client, collection_name, document_id):
+        self._client = client
+        self._collection_name = collection_name
+        self.id = document_id
+
+    @property
+    def _documents(self):
+        return self._client._collections.setdefault(self._collection_name, {})
+
+    def set(self, data, merge=False):
+        with self._client._lock:
+            resolved = _resolve_sentinels(data)
+            if merge and self.id in self._documents:
+                self._documents[self.id].update(resolved)
+            else:
+                self._documents[self.id] = resolved
+            self._client.write_count += 1
+
+    def update(self, data):
+        with self._client._lock:
+            if self.id not in self._documents:
+                raise KeyError(f"Doküman bulunamadı: {self._collection_name}/{self.id}")
+            self._documents[self.id].update(_resolve_sentinels(data))
+            self._client.write_count += 1
+
+    def delete(self):
+        with self._client._lock:
+            self._documents.pop(self.id, None)
+            self._client.write_count += 1
+
+    def get(self):
+        with self._client._lock:
+            return DocumentSnapshot(self, copy.deepcopy(self._documents.get(self.id)))
+
+
+class Query:
+    def __init__(self, client, collection_name, filters=(), orders=(), limit_count=None, cursor=None):
+        self._client = client
+        self._collection_name = collection_name
+        self._filters = list(filters)
+        self._orders = list(orders)
+        self._limit = limit_count
+        self._cursor = cursor
+
+    def _copy(self, **changes):
+        values = dict(filters=self._filters, orders=self._orders, limit_count=self._limit, cursor=self._cursor)
+        values.update(changes)
+        return Query(self._client, self._collection_name, **values)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            # google-cloud-firestore FieldFilter nesnesi
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + [(field_path, op_string, value)])
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + [(field_path, str(direction).upper().endswith("DESCENDING"))])
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def start_after(self, document_or_values):
+        return self._copy(cursor=document_or_values)
+
+    def _sort_key(self, snapshot):
+        return tuple(snapshot.get(field) for field, _ in self._orders)
+
+    def _after_cursor(self, snapshot):
+        if isinstance(self._cursor, DocumentSnapshot):
+            cursor_values = tuple(self._cursor.get(field) for field, _ in self._orders)
+        elif isinstance(self._cursor, dict):
+            cursor_values = tuple(self._cursor.get(field) for field, _ in self._orders)
+        else:
+            cursor_values = tuple(self._cursor)
+        for (_, descending), value, cursor_value in zip(self._orders, self._sort_key(snapshot), cursor_values):
+            if value == cursor_value:
+                continue
+            return value < cursor_value if descending else value > cursor_value
+        # Eşit sıralama değerlerinde Firestore gibi doküman kimliğine göre ilerle
+        if isinstance(self._cursor, DocumentSnapshot):
+            return snapshot.id > self._cursor.id
+        return False
+
+    def stream(self):
+        with self._client._lock:
+            documents = self._client._collections.get(self._collection_name, {})
+            snapshots = [DocumentSnapshot(DocumentReference(self._client, self._collection_name, doc_id),
+                                          copy.deepcopy(data))
+                         for doc_id, data in documents.items()]
+
+        for field, op_string, value in self._filters:
+            snapshots = [s for s in snapshots if _OPERATORS[op_string](s.get(field), value)]
+        # Çok alanlı sıralama: en önemsiz alandan başlayarak kararlı sıralama
+        snapshots.sort(key=lambda s: s.id)
+        for field, descending in reversed(self._orders):
+            snapshots.sort(key=lambda s: (s.get(field) is None, s.get(field)), reverse=descending)
+        if self._cursor is not None:
+            snapshots = [s for s in snapshots if self._after_cursor(s)]
+        if self._limit is not None:
+            snapshots = snapshots[:self._limit]
+
+        self._client.read_count += len(snapshots)
+        return iter(snapshots)
+
+    def get(self):
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, client, collection_name):
+        super().__init__(client, collection_name)
+        self.id = collection_name
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, self._collection_name, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, data, document_id=None):
+        reference = self.document(document_id)
+        reference.set(data)
+        return datetime.now(timezone.utc), reference
+
+
+class WriteBatch:
+    """Firestore WriteBatch gibi işlemleri biriktirir, commit() ile tek seferde uygular"""
+
+    def __init__(self, client):
+        self._client = client
+        self._operations = []
+
+    def set(self, reference, data, merge=False):
+        self._operations.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference, data):
+        self._operations.append(lambda: reference.update(data))
+
+    def delete(self, reference):
+        self._operations.append(reference.delete)
+
+    def __len__(self):
+        return len(self._operations)
+
+    def commit(self):
+        if len(self._operations) > 500:
+            raise ValueError("Bir batch en fazla 500 işlem içerebilir.")
+        for operation in self._operations:
+            operation()
+        self._client.commit_count += 1
+        self._operations = []
+
+
+class InMemoryFirestoreClient:
+    """Tek süreç içinde yaşayan, thread-safe bellek içi Firestore benzeri istemci"""
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.RLock()
+        self.read_count = 0
+        self.write_count = 0
+        self.commit_count = 0
+
+    def collection(self, collection_name):
+        return CollectionReference(self, collection_name)
+
+    def batch(self):
+        return WriteBatch(self)
@@ -0,0 +1,113 @@
+# features/database/retention.py
+# Çalıştırma (run) bazlı saklama politikası ve eski çalıştırmaların arka planda temizlenmesi.
+# Her çalıştırma processing_runs koleksiyonunda bir dokümanla kaydedilir ve tarihsel kayıtları
+# run_id alanı taşır; bu yüzden yeni bir çalıştırma başlarken hiçbir şey silinmesi gerekmez.
+# Saklama dışında kalan çalıştırmaların dokümanları paralel batch commit'lerle, yerel geçmiş
+# dizinleri ise doğrudan silinir.
+import os
+import shutil
+import threading
+import time
+
+import config
+from features.database.history_store import run_directory
+
+PROCESSING_RUNS_COLLECTION = "processing_runs"
+
+
+def run_started_at(run_id, data=None):
+    """Çalıştırmanın başlangıç zamanı (Unix sn): started_at alanı, yoksa run_id'deki zaman"""
+    started_at = (data or {}).get("started_at")
+    if started_at is not None and hasattr(started_at, "timestamp"):
+        return started_at.timestamp()
+    try:
+        return time.mktime(time.strptime(run_id[:15], "%Y%m%d-%H%M%S"))
+    except ValueError:
+        return 0.0
+
+
+def list_runs(storage, root=None):
+    """Depolamada ve yerel geçmişte bilinen çalıştırmaları en yeniden eskiye [(run_id, başlangıç)] döndürür"""
+    runs = {run_id: run_started_at(run_id, data)
+            for run_id, data in storage.get_all_documents(PROCESSING_RUNS_COLLECTION).items()}
+    root = root or config.LOCAL_HISTORY_DIRECTORY
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            if os.path.isdir(os.path.join(root, name)) and name not in runs:
+                runs[name] = run_started_at(name) or os.path.getmtime(os.path.join(root, name))
+    return sorted(runs.items(), key=lambda item: item[1], reverse=True)
+
+
+def latest_unfinished_run(storage):
+    """
+    processing_runs'taki en son çalıştırma tamamlanmadıysa (çöktü ya da başarısız video kaldıysa)
+    run_id'sini, aksi halde None döndürür; main.py bu çalıştırmayı kaldığı yerden sürdürür.
+    """
+    runs = storage.get_all_documents(PROCESSING_RUNS_COLLECTION)
+    if not runs:
+        return None
+    run_id = max(runs, key=lambda run_id: (run_started_at(run_id, runs[run_id]), run_id))
+    return None if runs[run_id].get("completed") else run_id
+
+
+def expired_runs(runs, current_run_id=None, keep_runs=None, keep_days=None, now=None):
+    """
+    Saklama politikası dışında kalan run_id'leri döndürür. Bir çalıştırma son keep_runs
+    çalıştırmadan biriyse veya keep_days günden yeniyse saklanır; mevcut çalıştırma hiç silinmez.
+    """
+    if keep_runs is None and keep_days is None:
+        return []
+    now = time.time() if now is None else now
+    expired = []
+    for position, (run_id, started_at) in enumerate(runs):
+        if run_id == current_run_id:
+            continue
+        keep_by_count = keep_runs is not None and position < keep_runs
+        keep_by_age = keep_days is not None and now - started_at < keep_days * 86400
+        if not (keep_by_count or keep_by_age):
+            expired.append(run_id)
+    return expired
+
+
+def purge_run(storage, run_id, collections, root=None, max_workers=None):
+    """Bir çalıştırmanın verilen koleksiyonlardaki dokümanlarını ve yerel geçmişini siler"""
+    deleted_count = 0
+    for collection_name in collections:
+        deleted_count += storage.delete_documents_where(collection_name, {"run_id": run_id},
+                                                        max_workers=max_workers)
+    local_dir = run_directory(run_id, root)
+    if os.path.isdir(local_dir):
+        shutil.rmtree(local_dir, ignore_errors=True)
+    # Kayıt en son silinir ki yarıda kalan temizlik bir sonraki çalıştırmada tekrar denensin
+    storage.delete_document(PROCESSING_RUNS_COLLECTION, run_id)
+    return deleted_count
+
+
+def purge_old_runs(storage, current_run_id, collections, keep_runs=None, keep_days=None, root=None,
+                   max_workers=None):
+    """Saklama politikası dışındaki tüm çalıştırmaları temizler; özet sözlüğü döndürür"""
+    expired = expired_runs(list_runs(storage, root), current_run_id, keep_runs, keep_days)
+    summary = {"runs": 0, "documents": 0, "failed_runs": 0}
+    for run_id in expired:
+        try:
+            summary["documents"] += purge_run(storage, run_id, collections, root, max_workers)
+            summary["runs"] += 1
+        except Exception as e:
+            summary["failed_runs"] += 1
+            print(f"UYARI: '{run_id}' çalıştırması temizlenirken hata oluştu: {e}")
+    if expired:
+        print(f"🧹 {summary['runs']} eski çalıştırma temizlendi ({summary['documents']} doküman silindi)")
+    return summary
+
+
+def start_background_purge(storage, current_run_id, collections, keep_runs=None, keep_days=None,
+                           root=None, max_workers=None):
+    """purge_old_runs'ı arka plan thread'inde başlatır; thread'in result özniteliğine özet yazılır"""
+    def run():
+        thread.result = purge_old_runs(storage, current_run_id, collections, keep_runs, keep_days,
+                                       root, max_workers)
+
+    thread = threading.Thread(target=run, name="run-retention-purge", daemon=True)
+    thread.result = None
+    thread.start()
+    return thread
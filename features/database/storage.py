@@ -0,0 +1,354 @@
+# features/database/storage.py
+# Depolama arayüzü ve arka uçları.
+# firestore_crud.py'deki fonksiyonların (create/get/get_all/update/delete/delete_all) hepsini
+# kapsayan ortak bir arayüz tanımlar; Firestore, SQLite ve bellek içi arka uçlar bu arayüzü uygular.
+# Arka uç config.STORAGE_BACKEND ile seçilir; SQLite ve bellek içi arka uçlar kimlik bilgisi
+# ve ağ olmadan çalışır.
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+import config
+from features.database import firestore_crud
+from features.database.memory_client import SERVER_TIMESTAMP, InMemoryFirestoreClient
+
+STORAGE_FIRESTORE = "firestore"
+STORAGE_SQLITE = "sqlite"
+STORAGE_MEMORY = "memory"
+STORAGE_BACKENDS = (STORAGE_FIRESTORE, STORAGE_SQLITE, STORAGE_MEMORY)
+
+
+class StorageBackend(ABC):
+    """Doküman tabanlı depolama arayüzü (koleksiyon -> doküman kimliği -> sözlük)"""
+
+    name = None
+
+    @abstractmethod
+    def create_document(self, collection_name, data, document_id=None):
+        """Dokümanı ekler/üzerine yazar; doküman kimliğini, hata olursa None döndürür"""
+
+    @abstractmethod
+    def create_documents(self, collection_name, records):
+        """Otomatik kimlikli dokümanları tek seferde (batch) ekler; eklenen sayıyı döndürür"""
+
+    @abstractmethod
+    def get_document(self, collection_name, document_id):
+        """Dokümanı sözlük olarak, yoksa None döndürür"""
+
+    @abstractmethod
+    def get_all_documents(self, collection_name):
+        """Koleksiyondaki tüm dokümanları {kimlik: sözlük} olarak döndürür"""
+
+    @abstractmethod
+    def query_documents(self, collection_name, filters=None, order_by=None, descending=False,
+                        limit=None, start_after=None):
+        """
+        Eşitlik filtreleri (alan -> değer) ve tek alanlı sıralama ile sorgu yapar.
+        start_after, önceki sayfanın son (kimlik, sözlük) öğesidir (imleçli sayfalama için); aynı sıralama
+        değerini taşıyan dokümanlar sayfa sınırında atlanmasın diye imleç kimliği de içerir.
+        [(kimlik, sözlük), ...] döndürür.
+        """
+
+    @abstractmethod
+    def update_document(self, collection_name, document_id, data):
+        """Dokümanın verilen alanlarını günceller; başarılıysa True döndürür"""
+
+    @abstractmethod
+    def delete_document(self, collection_name, document_id):
+        """Dokümanı siler; başarılıysa True döndürür"""
+
+    @abstractmethod
+    def delete_documents_where(self, collection_name, filters, batch_size=500, max_workers=None):
+        """Eşitlik filtrelerine (alan -> değer) uyan dokümanları siler; silinen sayıyı döndürür"""
+
+    @abstractmethod
+    def delete_all_documents_in_collection(self, collection_name, batch_size=500):
+        """Koleksiyondaki tüm dokümanları siler; silinen sayıyı döndürür"""
+
+    def close(self):
+        pass
+
+
+class FirestoreStorage(StorageBackend):
+    """firestore_crud fonksiyonlarını Firestore (veya uyumlu) istemci üzerinde çağırır"""
+
+    name = STORAGE_FIRESTORE
+
+    def __init__(self, client):
+        self.client = client
+
+    def create_document(self, collection_name, data, document_id=None):
+        return firestore_crud.create_document(self.client, collection_name, data, document_id=document_id)
+
+    def create_documents(self, collection_name, records):
+        collection = self.client.collection(collection_name)
+        written = 0
+        # Firestore bir WriteBatch'te en fazla 500 işleme izin verir
+        for start in range(0, len(records), 500):
+            batch = self.client.batch()
+            chunk = records[start:start + 500]
+            for record in chunk:
+                batch.set(collection.document(), record)
+            batch.commit()
+            written += len(chunk)
+        return written
+
+    def get_document(self, collection_name, document_id):
+        return firestore_crud.get_document(self.client, collection_name, document_id)
+
+    def get_all_documents(self, collection_name):
+        return firestore_crud.get_all_documents(self.client, collection_name)
+
+    def query_documents(self, collection_name, filters=None, order_by=None, descending=False,
+                        limit=None, start_after=None):
+        query = self.client.collection(collection_name)
+        for field, value in (filters or {}).items():
+            query = query.where(field, "==", value)
+        if order_by:
+            query = query.order_by(order_by, direction="DESCENDING" if descending else "ASCENDING")
+            if start_after is not None:
+                # Doküman anlık görüntüsü imlece sıralama alanıyla birlikte doküman kimliğini de katar
+                document_id, _ = start_after
+                query = query.start_after(self.client.collection(collection_name).document(document_id).get())
+        if limit:
+            query = query.limit(limit)
+        return [(doc.id, doc.to_dict()) for doc in query.stream()]
+
+    def update_document(self, collection_name, document_id, data):
+        return firestore_crud.update_document(self.client, collection_name, document_id, data)
+
+    def delete_document(self, collection_name, document_id):
+        return firestore_crud.delete_document(self.client, collection_name, document_id)
+
+    def delete_documents_where(self, collection_name, filters, batch_size=500, max_workers=None):
+        query = self.client.collection(collection_name)
+        for field, value in filters.items():
+            query = query.where(field, "==", value)
+        return firestore_crud.delete_query_results(self.client, query, batch_size,
+                                                   max_workers or config.PURGE_MAX_WORKERS)
+
+    def delete_all_documents_in_collection(self, collection_name, batch_size=500):
+        return firestore_crud.delete_all_documents_in_collection(self.client, collection_name, batch_size,
+                                                                 config.PURGE_MAX_WORKERS)
+
+
+class MemoryStorage(FirestoreStorage):
+    """
+    Bellek içi arka uç. Aynı kod yolunu InMemoryFirestoreClient üzerinde çalıştırır.
+    Veri sadece oluşturulduğu süreçte yaşar (test ve benchmark içindir).
+    """
+
+    name = STORAGE_MEMORY
+
+    def __init__(self):
+        super().__init__(InMemoryFirestoreClient())
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"JSON'a çevrilemeyen değer: {type(value).__name__}")
+
+
+def _decode_object(obj):
+    if set(obj) == {"__datetime__"}:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _epoch(value):
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    SQLite arka ucu (WAL modunda). Dokümanlar JSON olarak saklanır; wagon_id ve timestamp
+    alanları sorgular için ayrı, indeksli sütunlara da yazılır.
+    Bağlantı süreç başına açılır, böylece fork edilen işçiler bağlantıyı paylaşmaz.
+    """
+
+    name = STORAGE_SQLITE
+    # Ayrı sütunda tutulan, indeksli alanlar
+    INDEXED_FIELDS = ("wagon_id", "timestamp")
+    # JSON içinden ifade indeksiyle (json_extract) indekslenen alanlar
+    EXPRESSION_INDEXED_FIELDS = ("run_id",)
+
+    def __init__(self, path=None):
+        self.path = path or config.SQLITE_DATABASE_PATH
+        self._lock = threading.RLock()
+        self._connection = None
+        self._connection_pid = None
+
+    @property
+    def connection(self):
+        if self._connection is None or self._connection_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    collection TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    wagon_id TEXT,
+                    timestamp REAL,
+                    PRIMARY KEY (collection, id)
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_documents_wagon_time "
+                               "ON documents (collection, wagon_id, timestamp)")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_documents_time "
+                               "ON documents (collection, timestamp)")
+            for field in self.EXPRESSION_INDEXED_FIELDS:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS idx_documents_{field} "
+                                   f"ON documents (collection, {self._field_expression(field)}, timestamp)")
+            connection.commit()
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def _row(collection_name, document_id, data):
+        now = datetime.now(timezone.utc)
+        resolved = {key: (now if value is SERVER_TIMESTAMP else value) for key, value in data.items()}
+        return (collection_name, document_id, json.dumps(resolved, default=_encode_value),
+                resolved.get("wagon_id"), _epoch(resolved.get("timestamp")))
+
+    @staticmethod
+    def _load(data):
+        return json.loads(data, object_hook=_decode_object)
+
+    @staticmethod
+    def _field_expression(field):
+        if field in SQLiteStorage.INDEXED_FIELDS:
+            return field
+        # Yol parametre olarak değil sabit olarak yazılır ki ifade indeksleri kullanılabilsin
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", field):
+            raise ValueError(f"Geçersiz alan adı: {field}")
+        return f"json_extract(data, '$.{field}')"
+
+    def _where(self, collection_name, filters):
+        sql = "collection = ?"
+        params = [collection_name]
+        for field, value in (filters or {}).items():
+            sql += f" AND {self._field_expression(field)} = ?"
+            params.append(_epoch(value))
+        return sql, params
+
+    def _upsert(self, rows):
+        with self._lock:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO documents (collection, id, data, wagon_id, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def create_document(self, collection_name, data, document_id=None):
+        try:
+            document_id = document_id or uuid.uuid4().hex[:20]
+            self._upsert([self._row(collection_name, document_id, data)])
+            return document_id
+        except Exception as e:
+            print(f"❌ Hata: Doküman oluşturulamadı. Detay: {e}")
+            return None
+
+    def create_documents(self, collection_name, records):
+        rows = [self._row(collection_name, uuid.uuid4().hex[:20], record) for record in records]
+        self._upsert(rows)
+        return len(rows)
+
+    def get_document(self, collection_name, document_id):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT data FROM documents WHERE collection = ? AND id = ?",
+                (collection_name, document_id)).fetchone()
+        return self._load(row[0]) if row else None
+
+    def get_all_documents(self, collection_name):
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT id, data FROM documents WHERE collection = ?", (collection_name,)).fetchall()
+        return {document_id: self._load(data) for document_id, data in rows}
+
+    def query_documents(self, collection_name, filters=None, order_by=None, descending=False,
+                        limit=None, start_after=None):
+        where, params = self._where(collection_name, filters)
+        sql = f"SELECT id, data FROM documents WHERE {where}"
+        if order_by:
+            expression = self._field_expression(order_by)
+            if start_after is not None:
+                # (değer, kimlik) imleci: ORDER BY ile aynı sırada, eşit değerlerde kimliğe göre ilerler
+                document_id, data = start_after
+                sql += f" AND ({expression} {'<' if descending else '>'} ? OR ({expression} = ? AND id > ?))"
+                value = _epoch(data[order_by])
+                params.extend([value, value, document_id])
+            sql += f" ORDER BY {expression} {'DESC' if descending else 'ASC'}, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [(document_id, self._load(data)) for document_id, data in rows]
+
+    def update_document(self, collection_name, document_id, data):
+        with self._lock:
+            current = self.get_document(collection_name, document_id)
+            if current is None:
+                print(f"❌ Hata: Doküman güncellenemedi. Detay: '{document_id}' bulunamadı")
+                return False
+            current.update(data)
+            self._upsert([self._row(collection_name, document_id, current)])
+        return True
+
+    def delete_document(self, collection_name, document_id):
+        with self._lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM documents WHERE collection = ? AND id = ?",
+                                        (collection_name, document_id))
+        return True
+
+    def delete_documents_where(self, collection_name, filters, batch_size=500, max_workers=None):
+        # SQLite'ta tek yazıcı olduğu için paralellik yerine tek bir DELETE ifadesi kullanılır
+        where, params = self._where(collection_name, filters)
+        with self._lock:
+            with self.connection:
+                cursor = self.connection.execute(f"DELETE FROM documents WHERE {where}", params)
+        return cursor.rowcount
+
+    def delete_all_documents_in_collection(self, collection_name, batch_size=500):
+        with self._lock:
+            with self.connection:
+                cursor = self.connection.execute("DELETE FROM documents WHERE collection = ?",
+                                                 (collection_name,))
+        print(f"🗑️ '{collection_name}' koleksiyonundan toplam {cursor.rowcount} doküman silindi.")
+        return cursor.rowcount
+
+    def close(self):
+        if self._connection is not None and self._connection_pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+
+def create_storage(backend=None):
+    """
+    config.STORAGE_BACKEND'e (veya verilen ada) göre depolama arka ucunu oluşturur.
+    Firestore istemcisi başlatılamazsa None döndürür.
+    """
+    backend = backend or config.STORAGE_BACKEND
+    if backend == STORAGE_SQLITE:
+        return SQLiteStorage()
+    if backend == STORAGE_MEMORY:
+        return MemoryStorage()
+    if backend == STORAGE_FIRESTORE:
+        # Firestore istemcisi st.secrets gerektirdiği için sadece bu arka uçta import edilir
+        from features.database.initialize_firebase import initialize_firebase
+        client = initialize_firebase()
+        return FirestoreStorage(client) if client else None
+    raise ValueError(f"Geçersiz depolama arka ucu: {backend} (seçenekler: {', '.join(STORAGE_BACKENDS)})")
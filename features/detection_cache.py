@@ -0,0 +1,198 @@
+# features/detection_cache.py
+# process_video'nun kare başına ham takip kutularını (filtre öncesi) diske yazan önbellek.
+# Sayım bölgesi, boyut filtresi, çift tespit eşiği ya da vagon kapasitesi değiştiğinde model
+# yeniden çalıştırılmadan recount.py ile sadece filtre + bölge + sayım adımları tekrarlanır.
+#
+# Önbellek anahtarı: video içeriğinin özeti + model özeti + tespiti/takibi etkileyen ayarlar
+# (arka uç, imgsz, YOLO eşikleri, tracker, kare boyutu). Hareket kapısı ya da ROI kırpma açıksa
+# hangi karelerin/bölgenin modele gittiği bölgelere bağlı olduğundan bölgeler de anahtara girer.
+#
+# Dizin yapısı (outputs/detection_cache/<vagon>.<anahtar>/), history_store gibi sütun dosyaları:
+#   frames.bin  -> kare başına (satır sayısı u4, çıkarım yapıldı mı u1)
+#   tracks.bin  -> tüm karelerin (M, 7) float32 takip kutuları art arda
+#   meta.json   -> video bitince yazılır; yoksa önbellek eksiktir ve kullanılmaz
+import json
+import os
+import time
+
+import numpy as np
+
+import config
+from features.camera_profile import inference_imgsz
+from features.hashing import model_hash, settings_hash, short_file_hash
+from features.zone_lookup import zones_for_camera
+
+# Takip edilmiş kutu: x1, y1, x2, y2, track_id, score, class_id (features/inference.py ile aynı);
+# recount model kütüphanelerini yüklemesin diye inference modülü import edilmez
+TRACK_COLUMNS = 7
+FRAME_DTYPE = np.dtype([("rows", "<u4"), ("inferred", "u1")])
+TRACK_DTYPE = np.dtype("<f4")
+FRAMES_FILE = "frames.bin"
+TRACKS_FILE = "tracks.bin"
+META_FILE = "meta.json"
+
+
+def detection_settings(camera_id, imgsz=None, motion_gated=None, roi_cropped=None):
+    """Ham takip kutularını değiştirebilecek model ve ayarlar (önbellek anahtarına girer)"""
+    motion_gated = config.MOTION_GATE_ENABLED if motion_gated is None else motion_gated
+    roi_cropped = config.ROI_CROP_ENABLED if roi_cropped is None else roi_cropped
+    return {
+        "model": model_hash(config.MODEL_NAME),
+        "backend": [config.INFERENCE_BACKEND, config.INFERENCE_IMGSZ],
+        "imgsz": imgsz,
+        "yolo": [config.YOLO_CONF_THRESHOLD, config.YOLO_IOU_THRESHOLD, config.YOLO_MAX_DETECTIONS,
+                 config.PERSON_ID],
+        "tracker": config.YOLO_TRACKER,
+        "frame_size": [config.VIDEO_WIDTH, config.VIDEO_HEIGHT],
+        "motion_gate": ([config.MOTION_THRESHOLD, config.MOTION_MIN_STRIDE, config.MOTION_MAX_STRIDE,
+                         config.MOTION_DOWNSCALE] if motion_gated else None),
+        "roi_margin": config.ROI_MARGIN if roi_cropped else None,
+        # Hareket maskesi ve kırpma dikdörtgeni bölgelerden hesaplanır
+        "zones": zones_for_camera(camera_id) if motion_gated or roi_cropped else None,
+    }
+
+
+def cache_directory(video_file, imgsz=None, motion_gated=None, roi_cropped=None, inference_server=False,
+                    root=None):
+    """
+    Videonun verilen ayarlardaki önbellek dizini. imgsz verilmezse çıkarımın fiilen kullandığı boyut
+    (sunucu modunda config.INFERENCE_IMGSZ, aksi halde kamera profili) anahtara girer.
+    """
+    camera_id = os.path.splitext(os.path.basename(video_file))[0]
+    imgsz = imgsz or inference_imgsz(camera_id, inference_server)
+    settings = detection_settings(camera_id, imgsz, motion_gated, roi_cropped)
+    key = settings_hash(dict(settings, video=short_file_hash(video_file)))
+    return os.path.join(root or config.DETECTION_CACHE_DIRECTORY, f"{camera_id}.{key}")
+
+
+def is_complete(directory):
+    return os.path.exists(os.path.join(directory, META_FILE))
+
+
+class DetectionCacheWriter:
+    """
+    Bir videonun kare başına takip kutularını önbelleğe ekler.
+    start_frame verilirse (kontrol noktasından devam) dosyalar o kareye kadar kısaltılır;
+    dosyada o kadar kare yoksa önbellek bu video için kapatılır (enabled False).
+    Kare kayıtları önceden ayrılmış tamponda biriktirilir, kutular doğrudan tamponlu dosyaya yazılır.
+    """
+
+    def __init__(self, directory, start_frame=0, buffer_frames=None):
+        self.directory = directory
+        self.enabled = True
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        frames_path = os.path.join(directory, FRAMES_FILE)
+        tracks_path = os.path.join(directory, TRACKS_FILE)
+        rows_before = 0
+        if start_frame:
+            frames = (np.fromfile(frames_path, dtype=FRAME_DTYPE, count=start_frame)
+                      if os.path.exists(frames_path) else np.empty(0, FRAME_DTYPE))
+            if len(frames) < start_frame:
+                print(f"UYARI: {os.path.basename(directory)} önbelleğinde {start_frame} kare yok, "
+                      f"bu video için tespit önbelleği yazılmayacak.")
+                self.enabled = False
+                return
+            rows_before = int(frames["rows"].sum(dtype=np.int64))
+        for path, size in ((frames_path, start_frame * FRAME_DTYPE.itemsize),
+                           (tracks_path, rows_before * TRACK_COLUMNS * TRACK_DTYPE.itemsize)):
+            with open(path, "ab"):
+                pass
+            os.truncate(path, size)
+
+        self.frames_written = start_frame
+        self.buffer = np.empty(buffer_frames or config.DETECTION_CACHE_BUFFER_FRAMES, dtype=FRAME_DTYPE)
+        self.count = 0
+        self.frames_file = open(frames_path, "ab")
+        self.tracks_file = open(tracks_path, "ab", buffering=1 << 20)
+
+    def append(self, tracks):
+        """Çıkarım yapılan karenin filtre öncesi (M, 7) takip kutuları"""
+        if not self.enabled:
+            return
+        if len(tracks):
+            self.tracks_file.write(np.ascontiguousarray(tracks, dtype=TRACK_DTYPE).tobytes())
+        record = self.buffer[self.count]
+        record["rows"] = len(tracks)
+        record["inferred"] = True
+        self.count += 1
+        if self.count == len(self.buffer):
+            self.flush()
+
+    def append_skipped(self):
+        """Hareket kapısının atladığı kare: kutu yok, sayım önceki kareden taşınır"""
+        if not self.enabled:
+            return
+        record = self.buffer[self.count]
+        record["rows"] = 0
+        record["inferred"] = False
+        self.count += 1
+        if self.count == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if not self.enabled:
+            return
+        # Kutular kare kayıtlarından önce diske gider; okuyucu kare kayıtlarına göre keser
+        self.tracks_file.flush()
+        if self.count:
+            self.frames_file.write(self.buffer[:self.count].tobytes())
+            self.frames_file.flush()
+            self.frames_written += self.count
+            self.count = 0
+
+    def complete(self, meta):
+        """Son kayıtları yazar ve meta.json ile önbelleği tamamlanmış olarak işaretler"""
+        if not self.enabled:
+            return
+        self.close()
+        meta = dict(meta, frames=self.frames_written, created_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+        meta_path = os.path.join(self.directory, META_FILE)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def close(self):
+        if self.enabled and not self.frames_file.closed:
+            self.flush()
+            self.frames_file.close()
+            self.tracks_file.close()
+
+
+class DetectionCacheReader:
+    """
+    Tamamlanmış bir önbelleği memmap ile okur. frame(i) kopya yapmadan (M, 7) görünüm döndürür.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        # Meta'daki kare sayısından sonrası (yarım kalmış ekleme) okunmaz
+        self.frames = self._map(FRAMES_FILE, FRAME_DTYPE)[:self.meta["frames"]]
+        tracks = self._map(TRACKS_FILE, TRACK_DTYPE)
+        self.tracks = tracks[:len(tracks) // TRACK_COLUMNS * TRACK_COLUMNS].reshape(-1, TRACK_COLUMNS)
+        self.offsets = np.zeros(len(self.frames) + 1, dtype=np.int64)
+        np.cumsum(self.frames["rows"], out=self.offsets[1:])
+
+    def _map(self, name, dtype):
+        path = os.path.join(self.directory, name)
+        size = os.path.getsize(path)
+        if size < dtype.itemsize:
+            return np.empty(0, dtype)  # Boş dosya memmap ile açılamaz
+        return np.memmap(path, dtype=dtype, mode="r", shape=(size // dtype.itemsize,))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, index):
+        """(takip kutuları, çıkarım yapıldı mı)"""
+        return self.tracks[self.offsets[index]:self.offsets[index + 1]], bool(self.frames["inferred"][index])
+
+    def __iter__(self):
+        inferred = self.frames["inferred"]
+        for index in range(len(self.frames)):
+            yield self.tracks[self.offsets[index]:self.offsets[index + 1]], inferred[index]
@@ -0,0 +1,81 @@
+# features/detection_filter.py
+# Tespit sonrası filtreleme adımlarının vektörize (NumPy) sürümleri.
+# Kutular tensörden doğrudan alınan float dizilerdir; skorlar int'e çevrilmediği için
+# "skora göre sırala" adımı gerçekten güven skoruna göre çalışır.
+import numpy as np
+
+import config
+
+# Takip edilmiş kutu: x1, y1, x2, y2, track_id, score, class_id
+TRACKED_SCORE_COLUMN = 5
+# Ham tespit: x1, y1, x2, y2, score, class_id
+DETECTION_SCORE_COLUMN = 4
+
+
+def score_column(boxes):
+    """Kutu dizisinin sütun sayısına göre skor sütununun indeksini döndürür"""
+    return TRACKED_SCORE_COLUMN if boxes.shape[1] >= 7 else DETECTION_SCORE_COLUMN
+
+
+def size_mask(boxes, frame_width, frame_height):
+    """
+    Boyutu geçerli aralıkta olan kutular için True içeren maske döndürür.
+    Çok küçük (MIN_DETECTION_*) ve kareye göre çok büyük (MAX_DETECTION_*_RATIO) kutular elenir.
+    """
+    widths = boxes[:, 2] - boxes[:, 0]
+    heights = boxes[:, 3] - boxes[:, 1]
+    max_width = frame_width * config.MAX_DETECTION_WIDTH_RATIO
+    max_height = frame_height * config.MAX_DETECTION_HEIGHT_RATIO
+    return ((widths >= config.MIN_DETECTION_WIDTH) & (heights >= config.MIN_DETECTION_HEIGHT) &
+            (widths <= max_width) & (heights <= max_height))
+
+
+def pairwise_iou(boxes):
+    """(N, 4+) kutular için (N, N) boyutlu IoU matrisini döndürür"""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+
+    inter_w = np.clip(np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]), 0, None)
+    inter_h = np.clip(np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]), 0, None)
+    inter = inter_w * inter_h
+    union = areas[:, None] + areas[None, :] - inter
+
+    iou = np.zeros_like(inter, dtype=np.float32)
+    np.divide(inter, union, out=iou, where=union > 0)
+    return iou
+
+
+def greedy_suppression(boxes, scores, iou_threshold):
+    """
+    Skoru yüksek kutudan başlayarak, tutulan bir kutuyla IoU'su eşiği aşan kutuları bastırır.
+    Tutulan kutuların indekslerini skor sırasına göre döndürür.
+    """
+    order = np.argsort(-scores, kind="stable")
+    iou = pairwise_iou(boxes[order])
+    n = len(order)
+    suppressed = np.zeros(n, dtype=bool)
+    keep = np.zeros(n, dtype=bool)
+    for i in range(n):
+        if suppressed[i]:
+            continue
+        keep[i] = True
+        suppressed[i + 1:] |= iou[i, i + 1:] > iou_threshold
+    return order[keep]
+
+
+def filter_detections(boxes, frame_width, frame_height, iou_threshold=None):
+    """
+    Boyut filtresi ve çift tespit bastırmasını uygular.
+    Girdi ve çıktı float dizilerdir; çıktı satırları skora göre azalan sıradadır.
+    """
+    if iou_threshold is None:
+        iou_threshold = config.DETECTION_IOU_THRESHOLD
+    if len(boxes) == 0:
+        return boxes
+
+    boxes = boxes[size_mask(boxes, frame_width, frame_height)]
+    if len(boxes) == 0:
+        return boxes
+
+    keep = greedy_suppression(boxes, boxes[:, score_column(boxes)], iou_threshold)
+    return boxes[keep]
@@ -0,0 +1,247 @@
+# features/exported_model.py
+# PyTorch dışındaki CPU çıkarım arka uçları (ONNX Runtime ve OpenVINO).
+# config.MODEL_NAME bir kez dışa aktarılır ve ağırlık dosyasının özetiyle (hash) adlandırılarak
+# ağırlıkların yanına önbelleklenir; ağırlık değişmedikçe tekrar dışa aktarılmaz.
+# Ön işleme (letterbox) ve son işleme (eşik, sınıf filtresi, NMS) burada yapılır ve
+# UltralyticsDetector ile aynı (N, 6) [x1, y1, x2, y2, conf, cls] çıktısını üretir.
+import ast
+import glob
+import os
+import shutil
+
+import cv2
+import numpy as np
+import yaml
+
+import config
+from features.detection_filter import greedy_suppression
+from features.hashing import short_file_hash
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    import openvino as ov
+except ImportError:
+    ov = None
+
+BACKEND_PYTORCH = "pytorch"
+BACKEND_ONNX = "onnx"
+BACKEND_OPENVINO = "openvino"
+BACKEND_ONNX_INT8 = "onnx_int8"  # Kendi görüntülerimizle kalibre edilmiş INT8 (features/quantization.py)
+INFERENCE_BACKENDS = (BACKEND_PYTORCH, BACKEND_ONNX, BACKEND_OPENVINO, BACKEND_ONNX_INT8)
+
+LETTERBOX_COLOR = (114, 114, 114)  # Ultralytics ile aynı dolgu rengi
+MAX_NMS_CANDIDATES = 30000         # NMS'e girecek en fazla aday kutu (Ultralytics max_nms)
+
+
+def default_intra_op_threads():
+    """Ayar yoksa işçi sürecin (worker_pool'un sınırladığı) PyTorch thread sayısını kullanır"""
+    if config.INFERENCE_INTRA_OP_THREADS:
+        return config.INFERENCE_INTRA_OP_THREADS
+    try:
+        import torch
+        return torch.get_num_threads()
+    except ImportError:
+        return os.cpu_count() or 1
+
+
+def exported_model_path(weights, backend, imgsz=None):
+    """
+    Dışa aktarılmış modelin önbellek yolu: models/best.<hash>.<imgsz>.onnx,
+    models/best.<hash>.<imgsz>.int8.onnx veya models/best.<hash>.<imgsz>_openvino_model/
+    (ağırlık özeti değişince yol da değişir)
+    """
+    stem = os.path.splitext(weights)[0]
+    tag = f"{stem}.{short_file_hash(weights)}.{imgsz or 'auto'}"
+    if backend == BACKEND_ONNX:
+        return f"{tag}.onnx"
+    if backend == BACKEND_ONNX_INT8:
+        return f"{tag}.int8.onnx"
+    if backend == BACKEND_OPENVINO:
+        return f"{tag}_openvino_model"
+    raise ValueError(f"Dışa aktarılamayan arka uç: {backend}")
+
+
+def export_model(weights=None, backend=None, imgsz=None, force=False):
+    """
+    Ağırlıkları verilen arka uç biçimine dışa aktarır ve önbellek yolunu döndürür.
+    Önbellekte varsa (force değilse) dışa aktarma yapılmaz. Batch ve giriş boyutu değişken (dynamic) aktarılır.
+    onnx_int8 için FP32 ONNX modeli data/videos'tan örneklenen karelerle nicemlenir.
+    """
+    weights = weights or config.MODEL_NAME
+    backend = backend or config.INFERENCE_BACKEND
+    imgsz = imgsz or config.INFERENCE_IMGSZ
+    if backend == BACKEND_ONNX_INT8:
+        from features.quantization import quantize_model
+        return quantize_model(weights, imgsz=imgsz, force=force)
+    target = exported_model_path(weights, backend, imgsz)
+    if os.path.exists(target) and not force:
+        return target
+
+    from ultralytics import YOLO
+    print(f"📦 {weights} {backend} biçimine dışa aktarılıyor...")
+    export_args = {"format": backend, "dynamic": True, "half": False}
+    if imgsz:
+        export_args["imgsz"] = imgsz
+    exported = YOLO(weights).export(**export_args)
+
+    # Ultralytics çıktıyı ağırlıkların yanına sabit adla yazar; özetli ada taşınır
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    shutil.move(str(exported), target)
+    print(f"✅ Dışa aktarılan model önbelleklendi: {target}")
+    return target
+
+
+def read_export_imgsz(model_path):
+    """Ultralytics'in dışa aktarılan modele yazdığı imgsz'yi (h, w) olarak okur"""
+    if os.path.isdir(model_path):
+        with open(os.path.join(model_path, "metadata.yaml"), encoding="utf-8") as f:
+            imgsz = yaml.safe_load(f)["imgsz"]
+    else:
+        session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        imgsz = ast.literal_eval(session.get_modelmeta().custom_metadata_map["imgsz"])
+    if isinstance(imgsz, int):
+        return imgsz, imgsz
+    return int(imgsz[0]), int(imgsz[1])
+
+
+def letterbox(frame, size):
+    """
+    Kareyi en-boy oranını koruyarak size=(h, w) boyutuna sığdırır ve kenarları doldurur.
+    (dolgulu kare, (ölçek, sol dolgu, üst dolgu)) döndürür.
+    """
+    height, width = frame.shape[:2]
+    target_h, target_w = size
+    ratio = min(target_h / height, target_w / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    pad_w, pad_h = (target_w - new_w) / 2, (target_h - new_h) / 2
+    if (new_w, new_h) != (width, height):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    padded = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return padded, (ratio, left, top)
+
+
+def preprocess(frames, size):
+    """BGR kareleri (B, 3, h, w) float32 RGB [0, 1] tensörüne çevirir"""
+    batch = np.empty((len(frames), 3, size[0], size[1]), dtype=np.float32)
+    letterbox_params = []
+    for i, frame in enumerate(frames):
+        padded, params = letterbox(frame, size)
+        batch[i] = padded[..., ::-1].transpose(2, 0, 1)
+        letterbox_params.append(params)
+    batch *= 1.0 / 255.0
+    return batch, letterbox_params
+
+
+def postprocess(prediction, letterbox_params, frame_shape):
+    """
+    Tek karenin ham çıktısını ((4 + sınıf, N) veya (N, 4 + sınıf), xywh) UltralyticsDetector ile
+    aynı ayarlarla (conf, sadece kişi sınıfı, sınıftan bağımsız NMS, max_det) (N, 6) diziye çevirir.
+    """
+    if prediction.shape[0] < prediction.shape[1]:
+        prediction = prediction.T
+    scores = prediction[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    mask = (confidences > config.YOLO_CONF_THRESHOLD) & (class_ids == config.PERSON_ID)
+    if not mask.any():
+        return np.empty((0, 6), dtype=np.float32)
+
+    xywh = prediction[mask, :4]
+    confidences = confidences[mask]
+    class_ids = class_ids[mask]
+    if len(confidences) > MAX_NMS_CANDIDATES:
+        top = np.argsort(-confidences)[:MAX_NMS_CANDIDATES]
+        xywh, confidences, class_ids = xywh[top], confidences[top], class_ids[top]
+
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+    keep = greedy_suppression(boxes, confidences, config.YOLO_IOU_THRESHOLD)[:config.YOLO_MAX_DETECTIONS]
+
+    ratio, left, top = letterbox_params
+    boxes = (boxes[keep] - [left, top, left, top]) / ratio
+    height, width = frame_shape[:2]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    return np.column_stack([boxes, confidences[keep], class_ids[keep]]).astype(np.float32)
+
+
+class OnnxRunner:
+    """ONNX Runtime CPU oturumu; intra-op thread sayısı ayarlanabilir"""
+
+    def __init__(self, model_path, intra_op_threads=None):
+        if ort is None:
+            raise ImportError("onnx arka ucu için onnxruntime kurulmalı: pip install onnxruntime")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads or default_intra_op_threads()
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoRunner:
+    """OpenVINO CPU derlenmiş modeli; çıkarım thread sayısı ayarlanabilir"""
+
+    def __init__(self, model_dir, intra_op_threads=None):
+        if ov is None:
+            raise ImportError("openvino arka ucu için openvino kurulmalı: pip install openvino")
+        core = ov.Core()
+        model = core.read_model(glob.glob(os.path.join(model_dir, "*.xml"))[0])
+        self.compiled = core.compile_model(model, "CPU", {
+            "INFERENCE_NUM_THREADS": intra_op_threads or default_intra_op_threads(),
+            "PERFORMANCE_HINT": "LATENCY"
+        })
+        self.output = self.compiled.output(0)
+
+    def __call__(self, batch):
+        return self.compiled(batch)[self.output]
+
+
+class ExportedDetector:
+    """UltralyticsDetector ile aynı arayüz: letterbox -> ONNX/OpenVINO -> eşik + NMS"""
+
+    RUNNERS = {BACKEND_ONNX: OnnxRunner, BACKEND_ONNX_INT8: OnnxRunner, BACKEND_OPENVINO: OpenVinoRunner}
+
+    def __init__(self, model_path, backend, imgsz=None, intra_op_threads=None):
+        self.runner = self.RUNNERS[backend](model_path, intra_op_threads)
+        if imgsz is None:
+            imgsz = read_export_imgsz(model_path)
+        self.size = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+
+    def detect(self, frames):
+        if not frames:
+            return []
+        batch, letterbox_params = preprocess(frames, self.size)
+        predictions = self.runner(batch)
+        return [postprocess(prediction, params, frame.shape)
+                for prediction, params, frame in zip(predictions, letterbox_params, frames)]
+
+
+def load_detector(backend=None, weights=None, intra_op_threads=None, imgsz=None):
+    """
+    config.INFERENCE_BACKEND'e göre detector oluşturur (gerekirse modeli dışa aktarır).
+    imgsz verilirse dışa aktarılan modelin boyutu yerine bu giriş boyutu kullanılır
+    (modeller değişken boyutlu dışa aktarıldığı için aynı dosya her boyutta çalışır).
+    """
+    backend = backend or config.INFERENCE_BACKEND
+    weights = weights or config.MODEL_NAME
+    if backend == BACKEND_PYTORCH:
+        from ultralytics import YOLO
+        from features.inference import UltralyticsDetector
+        return UltralyticsDetector(YOLO(weights), imgsz=imgsz)
+    if backend not in ExportedDetector.RUNNERS:
+        raise ValueError(f"Geçersiz çıkarım arka ucu: {backend} (seçenekler: {', '.join(INFERENCE_BACKENDS)})")
+    return ExportedDetector(export_model(weights, backend), backend, imgsz=imgsz,
+                            intra_op_threads=intra_op_threads)
@@ -0,0 +1,49 @@
+# features/frame_buffers.py
+# Kare döngüsünün önceden ayrılmış tamponları.
+# Boyutlandırılmış kareler her seferinde yeni dizi ayırmak yerine sabit boyutlu bir halkadaki
+# yuvalara yazılır (cv2.resize(..., dst=yuva)). Halka, bir karenin yuvası yeniden kullanılmadan
+# önce o kareyi tutabilecek tüm kuyruk ve aşamalardan (ön-okuma, işleme, çizim) çıkmış olacağı
+# kadar büyük seçilir.
+import numpy as np
+
+import config
+
+
+def prefetch_batches_for(batch_size, prefetch_frames=None):
+    """Ön-okuma kuyruğunun batch cinsinden sınırı: en fazla prefetch_frames kare, en az bir batch"""
+    prefetch_frames = config.PIPELINE_PREFETCH_FRAMES if prefetch_frames is None else prefetch_frames
+    return max(1, -(-prefetch_frames // batch_size))
+
+
+def ring_slots_for(batch_size, queue_size, prefetch=True, rendering=True, render_stride=1, prefetch_frames=None):
+    """
+    Aynı anda yaşayabilecek en fazla kare sayısı:
+    ön-okuma açıksa kuyruktaki batch'ler (prefetch_batches_for) + kuyruğa konmayı bekleyen batch,
+    döngüde işlenen batch, çizim açıksa çizim kuyruğu (queue_size kare) + çizilmekte olan kare.
+    Önizlemede her render_stride karede bir kare çizime gittiğinden, çizim kuyruğundaki en eski
+    kare ile okuyucunun yazdığı yuva arasında render_stride katı kadar yuva bulunur.
+    """
+    slots = (prefetch_batches_for(batch_size, prefetch_frames) + 2) * batch_size if prefetch else batch_size
+    if rendering:
+        slots += (queue_size + 1) * max(1, render_stride)
+    return slots
+
+
+class FrameRing:
+    """(slots, height, width, 3) uint8 tek blok; next() sıradaki yuvayı (görünüm) döndürür"""
+
+    def __init__(self, slots, width, height, channels=3):
+        self.buffer = np.empty((max(1, slots), height, width, channels), dtype=np.uint8)
+        self.size = (width, height)
+        self._position = 0
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def next(self):
+        slot = self.buffer[self._position]
+        self._position = (self._position + 1) % len(self.buffer)
+        return slot
+
+    def nbytes(self):
+        return self.buffer.nbytes
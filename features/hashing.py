@@ -0,0 +1,41 @@
+# features/hashing.py
+# Dosya içeriği ve ayar sözlükleri için kararlı özet (hash) yardımcıları.
+# Dışa aktarılmış model, önbellek ve kontrol noktası dosyalarını kaynağına bağlamak için kullanılır.
+import hashlib
+import json
+import os
+
+HASH_CHUNK_BYTES = 1 << 20
+
+# Aynı süreçte aynı dosya tekrar tekrar okunmasın: (yol, boyut, mtime) -> özet
+_file_hash_cache = {}
+
+
+def file_sha256(path):
+    """Dosya içeriğinin SHA-256 özetini (hex) döndürür; değişmeyen dosyalar için sonuç önbelleklenir"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _file_hash_cache.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        _file_hash_cache[key] = digest
+    return digest
+
+
+def short_file_hash(path, length=12):
+    return file_sha256(path)[:length]
+
+
+def model_hash(weights):
+    """Ağırlık dosyasının özeti; dosya yoksa (ör. hub'dan inecek model adı) adın kendisi"""
+    return short_file_hash(weights) if os.path.exists(weights) else weights
+
+
+def settings_hash(settings, length=12):
+    """JSON'a çevrilebilir ayar sözlüğünün sıra bağımsız özetini döndürür"""
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:length]
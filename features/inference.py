@@ -0,0 +1,123 @@
+# features/inference.py
+# Tespit (detection) ve takip (tracking) adımlarını birbirinden ayırır.
+# Böylece kareler toplu (batch) halinde tek bir ileri geçişte modele verilebilir,
+# takip ise her kare için sırayla uygulanır.
+import pickle
+
+import numpy as np
+import yaml
+from ultralytics.engine.results import Boxes
+from ultralytics.trackers.basetrack import BaseTrack
+from ultralytics.trackers.bot_sort import BOTSORT
+from ultralytics.trackers.byte_tracker import BYTETracker
+from ultralytics.utils import IterableSimpleNamespace
+from ultralytics.utils.checks import check_yaml
+
+import config
+
+TRACKER_MAP = {"bytetrack": BYTETracker, "botsort": BOTSORT}
+
+# model.track() tracker'ı her zaman 30 fps varsayımıyla kurar; aynı davranışı koruyoruz
+TRACKER_FRAME_RATE = 30
+
+# Takip edilmiş bir kutunun sütunları: x1, y1, x2, y2, track_id, score, class_id
+TRACK_COLUMNS = 7
+# Ham tespit sütunları: x1, y1, x2, y2, score, class_id
+DETECTION_COLUMNS = 6
+
+
+class UltralyticsDetector:
+    """
+    Ultralytics YOLO modeliyle kareleri toplu halinde tespit eder (takip yapmaz).
+    imgsz verilirse kareler modelin varsayılanı yerine bu giriş boyutuna letterbox'lanır.
+    """
+
+    def __init__(self, model, imgsz=None):
+        self.model = model
+        self.imgsz = imgsz
+
+    def detect(self, frames):
+        """
+        Karelerin tamamını tek bir predict çağrısında modele verir.
+        Her kare için (N, 6) boyutlu float bir dizi döndürür.
+        """
+        options = {"imgsz": self.imgsz} if self.imgsz else {}
+        results = self.model.predict(
+            frames,
+            verbose=False,
+            conf=config.YOLO_CONF_THRESHOLD,
+            iou=config.YOLO_IOU_THRESHOLD,
+            max_det=config.YOLO_MAX_DETECTIONS,
+            classes=[config.PERSON_ID],
+            agnostic_nms=True,
+            **options
+        )
+        return [result.boxes.data.cpu().numpy() for result in results]
+
+
+class FrameTracker:
+    """
+    Ultralytics tracker'ını (ByteTrack / BoT-SORT) doğrudan sürer.
+    model.track() içindeki callback ile aynı şekilde her kare için bir kez update edilir.
+    """
+
+    def __init__(self, tracker_config=config.YOLO_TRACKER, frame_rate=TRACKER_FRAME_RATE):
+        with open(check_yaml(tracker_config), encoding="utf-8") as f:
+            cfg = IterableSimpleNamespace(**yaml.safe_load(f))
+        if cfg.tracker_type not in TRACKER_MAP:
+            raise ValueError(f"Desteklenmeyen tracker türü: {cfg.tracker_type}")
+        self.tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)
+
+    def update(self, detections, frame):
+        """
+        Bir karenin ham tespitlerini tracker'a verir.
+        (M, 7) boyutlu dizi döndürür: x1, y1, x2, y2, track_id, score, class_id
+        """
+        if len(detections) == 0:
+            # model.track() da boş karelerde tracker'ı güncellemez
+            return np.empty((0, TRACK_COLUMNS), dtype=np.float32)
+
+        boxes = Boxes(np.asarray(detections, dtype=np.float32), frame.shape[:2])
+        tracks = self.tracker.update(boxes, frame)
+        if len(tracks) == 0:
+            return np.empty((0, TRACK_COLUMNS), dtype=np.float32)
+        # Son sütun tespit indeksi, sayım için gerekmiyor
+        return np.asarray(tracks[:, :TRACK_COLUMNS], dtype=np.float32)
+
+    def get_state(self):
+        """
+        Kontrol noktası için tracker durumu. Yeni track id'leri sınıf düzeyindeki sayaçtan
+        (BaseTrack._count) verildiği için sayaç ayrıca saklanır. Tracker pickle edilemezse
+        (ör. BoT-SORT'un OpenCV nesneleri) sadece sayaç saklanır.
+        """
+        try:
+            tracker = pickle.dumps(self.tracker, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            tracker = None
+        return {"tracker": tracker, "next_track_id": BaseTrack._count}
+
+    def set_state(self, state):
+        """
+        get_state() çıktısını geri yükler; tracker geri yüklenemediyse False döndürür.
+        Sayaç her durumda geri yüklenir ki yeni kişiler daha önce sayılmış id'leri almasın.
+        """
+        BaseTrack._count = max(BaseTrack._count, state.get("next_track_id", 0))
+        if state.get("tracker") is None:
+            return False
+        self.tracker = pickle.loads(state["tracker"])
+        return True
+
+
+class BatchedTracker:
+    """Kareleri toplu tespit eder, ardından takibi kare kare uygular"""
+
+    def __init__(self, detector, tracker):
+        self.detector = detector
+        self.tracker = tracker
+
+    def track(self, frames):
+        """Her kare için takip edilmiş kutuları (M, 7) içeren bir liste döndürür"""
+        detections_batch = self.detector.detect(frames)
+        return [self.tracker.update(detections, frame)
+                for frame, detections in zip(frames, detections_batch)]
+
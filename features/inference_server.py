@@ -0,0 +1,245 @@
+# features/inference_server.py
+# Tüm vagon süreçleri için tek bir model yükleyen paylaşımlı çıkarım sunucusu.
+# Her vagon işçisi (lane) kendi paylaşımlı bellek halka tamponuna kare yazar ve
+# sunucuya yalnızca (lane, slot, yükseklik, genişlik) bilgisini gönderir.
+# Sunucu farklı vagonlardan gelen kareleri tek ileri geçişte işler ve
+# tespitleri her vagonun kendi yanıt kuyruğuna geri gönderir.
+# Takip (tracking) durumu vagona özel olduğu için işçi süreçlerde kalır.
+import ctypes
+import queue
+import threading
+import time
+from multiprocessing import Process, Queue, RawArray, RawValue
+
+import numpy as np
+
+import config
+
+HEARTBEAT_INTERVAL_SECONDS = 0.5
+RESPONSE_POLL_SECONDS = 0.5    # İşçi yanıt beklerken sunucunun nabzını bu aralıkla kontrol eder
+# Nabız değerinin özel durumları (aksi halde son nabzın time.monotonic() zamanı)
+HEARTBEAT_NOT_STARTED = 0.0
+HEARTBEAT_STOPPED = -1.0
+
+
+class InferenceLane:
+    """Bir vagon işçisinin sunucuyla konuştuğu kanal (halka tampon + kuyruklar + sunucu nabzı)"""
+
+    def __init__(self, index, buffer, slots, height, width, request_queue, response_queue, heartbeat=None):
+        self.index = index
+        self.buffer = buffer
+        self.slots = slots
+        self.height = height
+        self.width = width
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.heartbeat = heartbeat
+
+    def server_alive(self, heartbeat_timeout=None):
+        """
+        Sunucu süreci çalışıyor mu: kapandıysa ya da nabzı heartbeat_timeout saniyeden eskiyse
+        (ör. süreç öldürüldü) False. İşçi sunucuyu başlatan süreç olmadığından is_alive() kullanılamaz.
+        """
+        if self.heartbeat is None or self.heartbeat.value == HEARTBEAT_NOT_STARTED:
+            return True
+        if self.heartbeat.value == HEARTBEAT_STOPPED:
+            return False
+        heartbeat_timeout = (config.INFERENCE_SERVER_HEARTBEAT_TIMEOUT_SECONDS
+                             if heartbeat_timeout is None else heartbeat_timeout)
+        return time.monotonic() - self.heartbeat.value < heartbeat_timeout
+
+    def frames_view(self):
+        """Paylaşımlı belleği (slots, yükseklik, genişlik, 3) boyutlu bir numpy görünümü olarak döndürür"""
+        return np.frombuffer(self.buffer, dtype=np.uint8).reshape(
+            self.slots, self.height, self.width, 3)
+
+
+class ServerDetector:
+    """
+    UltralyticsDetector ile aynı arayüze sahip, tespiti çıkarım sunucusuna yaptıran sınıf.
+    Kareler halka tampona kopyalanır; sunucuya sadece slot bilgisi gider.
+    """
+
+    def __init__(self, lane, response_timeout=None):
+        self.lane = lane
+        self.frames = lane.frames_view()
+        self.response_timeout = (config.INFERENCE_SERVER_RESPONSE_TIMEOUT_SECONDS
+                                 if response_timeout is None else response_timeout)
+
+    def detect(self, frames):
+        results = []
+        # Halka tampondaki slot sayısından büyük batch'ler parça parça gönderilir
+        for start in range(0, len(frames), self.lane.slots):
+            chunk = frames[start:start + self.lane.slots]
+            for slot, frame in enumerate(chunk):
+                height, width = frame.shape[:2]
+                if height > self.lane.height or width > self.lane.width:
+                    raise ValueError(
+                        f"Kare boyutu ({width}x{height}) halka tampondan büyük "
+                        f"({self.lane.width}x{self.lane.height}).")
+                self.frames[slot, :height, :width] = frame
+                self.lane.request_queue.put((self.lane.index, slot, height, width))
+
+            chunk_results = [None] * len(chunk)
+            error = None
+            for _ in chunk:
+                slot, detections, slot_error = self._next_response()
+                # Hatalı yanıttan sonra da parçanın kalan yanıtları toplanır ki kuyrukta eski yanıt kalmasın
+                error = error or slot_error
+                chunk_results[slot] = detections
+            if error:
+                raise RuntimeError(f"Çıkarım sunucusu batch'i işleyemedi (lane={self.lane.index}): {error}")
+            results.extend(chunk_results)
+        return results
+
+    def _next_response(self):
+        """Sıradaki yanıtı bekler; sunucu süreci ölürse zaman aşımını beklemeden hata verir"""
+        deadline = time.monotonic() + self.response_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                return self.lane.response_queue.get(timeout=max(0.0, min(RESPONSE_POLL_SECONDS, remaining)))
+            except queue.Empty:
+                pass
+            if not self.lane.server_alive():
+                raise RuntimeError(f"Çıkarım sunucusu süreci çalışmıyor (lane={self.lane.index}).")
+            if remaining <= 0:
+                raise RuntimeError(
+                    f"Çıkarım sunucusu {self.response_timeout} sn içinde yanıt vermedi "
+                    f"(lane={self.lane.index}).")
+
+
+def _collect_requests(request_queue, max_batch, batch_timeout):
+    """
+    İlk isteği bekler, ardından batch dolana veya süre bitene kadar diğer istekleri toplar.
+    Durdurma sinyali (None) geldiyse ikinci değer True olur.
+    """
+    first = request_queue.get()
+    if first is None:
+        return [], True
+
+    pending = [first]
+    deadline = time.monotonic() + batch_timeout
+    while len(pending) < max_batch:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            request = request_queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if request is None:
+            return pending, True
+        pending.append(request)
+    return pending, False
+
+
+def _beat(heartbeat, stop):
+    """Sunucu süreci yaşadığı sürece paylaşımlı nabız değerini günceller (ayrı thread)"""
+    while not stop.is_set():
+        heartbeat.value = time.monotonic()
+        stop.wait(HEARTBEAT_INTERVAL_SECONDS)
+
+
+def _serve(model_name, lanes, request_queue, max_batch, batch_timeout, heartbeat):
+    """Sunucu sürecinin ana döngüsü: nabzı başlatır, modeli bir kez yükler ve istekleri toplu işler"""
+    # Nabız ayrı thread'de atar ki uzun bir ileri geçiş ya da model yükleme sunucuyu ölü göstermesin
+    stop_heartbeat = threading.Event()
+    threading.Thread(target=_beat, args=(heartbeat, stop_heartbeat), name="inference-heartbeat",
+                     daemon=True).start()
+    try:
+        _serve_requests(model_name, lanes, request_queue, max_batch, batch_timeout)
+    finally:
+        stop_heartbeat.set()
+        heartbeat.value = HEARTBEAT_STOPPED
+
+
+def _serve_requests(model_name, lanes, request_queue, max_batch, batch_timeout):
+    # Ağır import'lar sadece sunucu sürecinde yapılır
+    from features.exported_model import load_detector
+
+    detector = load_detector(weights=model_name)
+    views = [lane.frames_view() for lane in lanes]
+    print(f"🧠 Çıkarım sunucusu hazır: {len(lanes)} vagon, en fazla {max_batch} kare/batch")
+
+    batches = 0
+    frames_served = 0
+    stop = False
+    while not stop:
+        pending, stop = _collect_requests(request_queue, max_batch, batch_timeout)
+        if not pending:
+            continue
+
+        try:
+            frames = [np.ascontiguousarray(views[lane_index][slot, :height, :width])
+                      for lane_index, slot, height, width in pending]
+            detections_batch = detector.detect(frames)
+        except Exception as e:
+            # Tek bir hatalı batch (ör. CUDA OOM) sunucuyu düşürmez; bekleyen her kanala hata yanıtı gider
+            # ve işçiler zaman aşımını beklemeden hata verir
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ Hata: Çıkarım sunucusu {len(pending)} karelik batch'i işleyemedi. Detay: {error}")
+            for lane_index, slot, _, _ in pending:
+                lanes[lane_index].response_queue.put((slot, None, error))
+            continue
+
+        for (lane_index, slot, _, _), detections in zip(pending, detections_batch):
+            lanes[lane_index].response_queue.put((slot, detections, None))
+
+        batches += 1
+        frames_served += len(pending)
+
+    if batches:
+        print(f"🧠 Çıkarım sunucusu kapandı: {frames_served} kare, "
+              f"ortalama batch {frames_served / batches:.1f}")
+
+
+class InferenceServer:
+    """
+    Çıkarım sunucusu sürecini ve vagon kanallarını yönetir.
+    Kanallar sunucu başlamadan önce oluşturulur ve işçi süreçlere argüman olarak verilir.
+    """
+
+    def __init__(self, num_lanes, model_name=None, slots=None, height=None, width=None,
+                 max_batch=None, batch_timeout_ms=None):
+        self.model_name = model_name or config.MODEL_NAME
+        self.slots = slots or config.INFERENCE_SERVER_RING_SLOTS
+        self.height = height or config.VIDEO_HEIGHT
+        self.width = width or config.VIDEO_WIDTH
+        self.max_batch = max_batch or config.INFERENCE_SERVER_MAX_BATCH
+        batch_timeout_ms = (config.INFERENCE_SERVER_BATCH_TIMEOUT_MS
+                            if batch_timeout_ms is None else batch_timeout_ms)
+        self.batch_timeout = batch_timeout_ms / 1000.0
+
+        self.request_queue = Queue()
+        self.heartbeat = RawValue(ctypes.c_double, HEARTBEAT_NOT_STARTED)
+        frame_bytes = self.height * self.width * 3
+        self.lanes = [
+            InferenceLane(index, RawArray(ctypes.c_uint8, self.slots * frame_bytes),
+                          self.slots, self.height, self.width, self.request_queue, Queue(), self.heartbeat)
+            for index in range(num_lanes)
+        ]
+        self.process = None
+
+    def lane(self, index):
+        return self.lanes[index]
+
+    def start(self):
+        self.process = Process(
+            target=_serve,
+            args=(self.model_name, self.lanes, self.request_queue, self.max_batch, self.batch_timeout,
+                  self.heartbeat),
+            daemon=True
+        )
+        self.process.start()
+        return self
+
+    def stop(self, timeout=30):
+        if self.process is None:
+            return
+        self.request_queue.put(None)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            print("UYARI: Çıkarım sunucusu zamanında kapanmadı, sonlandırılıyor.")
+            self.process.terminate()
+        self.process = None
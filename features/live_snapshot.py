@@ -0,0 +1,120 @@
+# features/live_snapshot.py
+# Canlı görünüm için süreç genelinde paylaşılan anlık görüntü (snapshot) önbelleği.
+# Tek bir Firestore on_snapshot dinleyicisi (ya da desteklenmiyorsa tek bir yoklayıcı thread)
+# anlık doluluk koleksiyonunu ve işlem durumu dokümanını günceller; tüm Streamlit oturumları
+# depolamaya gitmeden bu önbellekten okur. Veri her değiştiğinde sürüm numarası artar ve
+# bekleyen oturumlar uyandırılır, böylece okumalar izleyici sayısıyla değil değişikliklerle ölçeklenir.
+import threading
+
+import config
+from features.database.storage import FirestoreStorage
+
+SNAPSHOT_MODE_AUTO = "auto"
+SNAPSHOT_MODE_LISTENER = "listener"
+SNAPSHOT_MODE_POLL = "poll"
+
+
+class SnapshotCache:
+    """
+    snapshot: {"current": {doc_id: veri}, "status": veri veya None}
+    version: snapshot her değiştiğinde bir artar (0 = henüz veri yok)
+    """
+
+    def __init__(self, storage, current_collection, status_collection, status_document_id,
+                 mode=None, poll_interval_seconds=None):
+        self.storage = storage
+        self.current_collection = current_collection
+        self.status_collection = status_collection
+        self.status_document_id = status_document_id
+        self.mode = mode or config.LIVE_SNAPSHOT_MODE
+        self.poll_interval_seconds = (config.LIVE_POLL_INTERVAL_SECONDS
+                                      if poll_interval_seconds is None else poll_interval_seconds)
+        self.snapshot = {"current": {}, "status": None}
+        self.version = 0
+        self.stats = {"reads": 0, "updates": 0}
+        self.active_mode = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._watches = []
+        self._thread = None
+
+    def _apply(self, key, value):
+        with self._condition:
+            if self.snapshot[key] == value:
+                return
+            self.snapshot = dict(self.snapshot, **{key: value})
+            self.version += 1
+            self.stats["updates"] += 1
+            self._condition.notify_all()
+
+    # --- Firestore dinleyicileri ---
+    def _on_current(self, collection_snapshot, changes, read_time):
+        self.stats["reads"] += len(changes)
+        self._apply("current", {doc.id: doc.to_dict() for doc in collection_snapshot})
+
+    def _on_status(self, document_snapshots, changes, read_time):
+        self.stats["reads"] += len(changes)
+        document = document_snapshots[0] if document_snapshots else None
+        self._apply("status", document.to_dict() if document is not None and document.exists else None)
+
+    def _start_listeners(self):
+        client = self.storage.client
+        current_ref = client.collection(self.current_collection)
+        status_ref = client.collection(self.status_collection).document(self.status_document_id)
+        self._watches = [current_ref.on_snapshot(self._on_current), status_ref.on_snapshot(self._on_status)]
+
+    # --- Yoklayıcı ---
+    def _poll_once(self):
+        current = self.storage.get_all_documents(self.current_collection)
+        status = self.storage.get_document(self.status_collection, self.status_document_id)
+        self.stats["reads"] += len(current) + 1
+        self._apply("current", current)
+        self._apply("status", status)
+
+    def _poll(self):
+        while not self._stop_event.is_set():
+            try:
+                self._poll_once()
+            except Exception as e:
+                print(f"UYARI: Canlı önbellek güncellenirken hata oluştu: {e}")
+            self._stop_event.wait(self.poll_interval_seconds)
+
+    def _supports_listener(self):
+        client = getattr(self.storage, "client", None) if isinstance(self.storage, FirestoreStorage) else None
+        return client is not None and hasattr(client.collection(self.current_collection), "on_snapshot")
+
+    def start(self):
+        if self.active_mode:
+            return self
+        if self.mode != SNAPSHOT_MODE_POLL and self._supports_listener():
+            try:
+                self._start_listeners()
+                self.active_mode = SNAPSHOT_MODE_LISTENER
+                return self
+            except Exception as e:
+                print(f"UYARI: Firestore dinleyicisi başlatılamadı, yoklamaya geçiliyor: {e}")
+        elif self.mode == SNAPSHOT_MODE_LISTENER:
+            print("UYARI: Depolama arka ucu dinleyici desteklemiyor, yoklamaya geçiliyor.")
+        self._thread = threading.Thread(target=self._poll, name="live-snapshot-poller", daemon=True)
+        self._thread.start()
+        self.active_mode = SNAPSHOT_MODE_POLL
+        return self
+
+    def get(self):
+        """(sürüm, snapshot) döndürür; snapshot değiştirilmemelidir"""
+        with self._condition:
+            return self.version, self.snapshot
+
+    def wait_for_change(self, version, timeout=None):
+        """Sürüm verilen sürümden farklı olana (veya timeout dolana) kadar bekler; (sürüm, snapshot) döndürür"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version, self.snapshot
+
+    def stop(self):
+        self._stop_event.set()
+        for watch in self._watches:
+            watch.unsubscribe()
+        self._watches = []
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,254 @@
+# features/metrics.py
+# İşçi süreçlerinin canlı metrikleri ve main.py'deki Prometheus uç noktası.
+# Her işçi kendi WorkerMetrics nesnesini tutar ve anlık görüntüsünü (snapshot) süreç havuzunun
+# olay kuyruğuyla ana sürece gönderir; MetricsAggregator bunları kamera bazında birleştirir ve
+# MetricsServer /metrics adresinde Prometheus metin biçiminde sunar.
+# Böylece yavaş bir kamera ya da takılan bir yazıcı profiler bağlamadan görülebilir.
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DETECTION_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Sabit kovalı histogram; kova sayıları kümülatif değildir (son kova +Inf)"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"buckets": list(self.buckets), "counts": list(self.counts), "sum": self.sum,
+                    "count": self.count}
+
+
+class WorkerMetrics:
+    """
+    Bir process_video çağrısının metrikleri (işçi sürecinde yaşar).
+    Sayaçlar ve histogramlar birikimlidir; fps iki snapshot arasındaki kare farkından hesaplanır.
+    Kuyruk derinlikleri snapshot anında watch_queue ile kaydedilen fonksiyonlardan okunur.
+    """
+
+    def __init__(self, camera_id):
+        self.camera_id = camera_id
+        self.frames = 0
+        self.total_frames = 0
+        self.db_writes = 0
+        self.db_write_failures = 0
+        self.inference_seconds = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.detections_per_frame = Histogram(DETECTION_BUCKETS)
+        self.db_write_seconds = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.capture_to_publish_seconds = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.dropped_frames = 0
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._last_frames = 0
+        self._last_time = time.monotonic()
+
+    def observe_inference(self, seconds):
+        self.inference_seconds.observe(seconds)
+
+    def observe_detections(self, count):
+        self.detections_per_frame.observe(count)
+
+    def observe_db_write(self, seconds, ok=True):
+        """CoalescingWriter / BackgroundBatchWriter yazma gözlemcisi (farklı thread'lerden çağrılır)"""
+        self.db_write_seconds.observe(seconds)
+        with self._lock:
+            if ok:
+                self.db_writes += 1
+            else:
+                self.db_write_failures += 1
+
+    def observe_capture_latency(self, seconds, dropped_frames):
+        """Gerçek zamanlı modda yakalamadan yayına gecikme ve o ana kadar düşürülen kare sayısı"""
+        self.capture_to_publish_seconds.observe(seconds)
+        self.dropped_frames = dropped_frames
+
+    def set_progress(self, frames, total_frames):
+        self.frames = frames
+        self.total_frames = total_frames
+
+    def watch_queue(self, name, depth_function):
+        self._queues[name] = depth_function
+
+    def snapshot(self):
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        fps = (self.frames - self._last_frames) / elapsed if elapsed > 0 else 0.0
+        self._last_frames, self._last_time = self.frames, now
+
+        queue_depths = {}
+        for name, depth_function in self._queues.items():
+            try:
+                queue_depths[name] = depth_function()
+            except Exception:
+                continue
+        with self._lock:
+            db_writes, db_write_failures = self.db_writes, self.db_write_failures
+        return {
+            "frames": self.frames,
+            "total_frames": self.total_frames,
+            "fps": fps,
+            "db_writes": db_writes,
+            "db_write_failures": db_write_failures,
+            "dropped_frames": self.dropped_frames,
+            "inference_seconds": self.inference_seconds.snapshot(),
+            "detections_per_frame": self.detections_per_frame.snapshot(),
+            "db_write_seconds": self.db_write_seconds.snapshot(),
+            "capture_to_publish_seconds": self.capture_to_publish_seconds.snapshot(),
+            "queue_depths": queue_depths,
+        }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsAggregator:
+    """Ana süreçte kamera başına son snapshot'ı ve işçi durumunu tutar, Prometheus metni üretir"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cameras = {}  # camera_id -> {"snapshot", "state", "updated"}
+
+    def update(self, camera_id, snapshot):
+        with self._lock:
+            entry = self.cameras.setdefault(camera_id, {"state": "running"})
+            entry["snapshot"] = snapshot
+            entry["updated"] = time.time()
+
+    def set_state(self, camera_id, state):
+        """state: running, done veya failed"""
+        with self._lock:
+            entry = self.cameras.setdefault(camera_id, {"snapshot": None, "updated": time.time()})
+            entry["state"] = state
+            if state != "running" and entry.get("snapshot"):
+                entry["snapshot"] = dict(entry["snapshot"], fps=0.0, queue_depths={})
+
+    def render(self):
+        """Tüm metrikleri Prometheus metin biçiminde döndürür"""
+        with self._lock:
+            cameras = {camera_id: dict(entry) for camera_id, entry in self.cameras.items()}
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def per_camera(key, metric_name):
+            return [f"{metric_name}{_labels({'camera': camera_id})} {entry['snapshot'][key]}"
+                    for camera_id, entry in cameras.items() if entry.get("snapshot")]
+
+        family("wagon_worker_up", "gauge", "Kameranın işçisi çalışıyorsa 1",
+               [f"wagon_worker_up{_labels({'camera': camera_id})} {int(entry['state'] == 'running')}"
+                for camera_id, entry in cameras.items()])
+        family("wagon_worker_failed", "gauge", "Kameranın işçisi hata ile bittiyse 1",
+               [f"wagon_worker_failed{_labels({'camera': camera_id})} {int(entry['state'] == 'failed')}"
+                for camera_id, entry in cameras.items()])
+        family("wagon_last_report_timestamp_seconds", "gauge", "Son metrik raporunun Unix zamanı",
+               [f"wagon_last_report_timestamp_seconds{_labels({'camera': camera_id})} {entry['updated']:.3f}"
+                for camera_id, entry in cameras.items()])
+        family("wagon_frames_processed_total", "counter", "İşlenen kare sayısı",
+               per_camera("frames", "wagon_frames_processed_total"))
+        family("wagon_frames_expected", "gauge", "Videonun toplam kare sayısı",
+               per_camera("total_frames", "wagon_frames_expected"))
+        family("wagon_fps", "gauge", "Önceki rapordan bu yana kare/sn",
+               per_camera("fps", "wagon_fps"))
+        family("wagon_db_writes_total", "counter", "Başarılı veritabanı yazma çağrıları",
+               per_camera("db_writes", "wagon_db_writes_total"))
+        family("wagon_db_write_failures_total", "counter", "Başarısız veritabanı yazma çağrıları",
+               per_camera("db_write_failures", "wagon_db_write_failures_total"))
+        family("wagon_dropped_frames_total", "counter", "Gerçek zamanlı modda düşürülen bayat kareler",
+               per_camera("dropped_frames", "wagon_dropped_frames_total"))
+
+        for key, name, help_text in (
+                ("inference_seconds", "wagon_inference_latency_seconds", "Batch başına tespit + takip süresi"),
+                ("detections_per_frame", "wagon_detections_per_frame", "Çıkarım yapılan kare başına filtrelenmiş tespit"),
+                ("db_write_seconds", "wagon_db_write_latency_seconds", "Veritabanı yazma çağrısı süresi"),
+                ("capture_to_publish_seconds", "wagon_capture_to_publish_seconds",
+                 "Gerçek zamanlı modda kare yakalamadan doluluk yayınına gecikme")):
+            samples = []
+            for camera_id, entry in cameras.items():
+                if not entry.get("snapshot"):
+                    continue
+                histogram = entry["snapshot"][key]
+                cumulative = 0
+                for bound, count in zip(histogram["buckets"] + ["+Inf"], histogram["counts"]):
+                    cumulative += count
+                    samples.append(f"{name}_bucket{_labels({'camera': camera_id, 'le': bound})} {cumulative}")
+                samples.append(f"{name}_sum{_labels({'camera': camera_id})} {histogram['sum']}")
+                samples.append(f"{name}_count{_labels({'camera': camera_id})} {histogram['count']}")
+            family(name, "histogram", help_text, samples)
+
+        family("wagon_queue_depth", "gauge", "İşçinin kuyruklarında bekleyen öğe sayısı",
+               [f"wagon_queue_depth{_labels({'camera': camera_id, 'queue': queue_name})} {depth}"
+                for camera_id, entry in cameras.items() if entry.get("snapshot")
+                for queue_name, depth in entry["snapshot"]["queue_depths"].items()])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """MetricsAggregator'ı http://host:port/metrics adresinde sunan arka plan HTTP sunucusu"""
+
+    def __init__(self, aggregator, host="127.0.0.1", port=9108):
+        self.aggregator = aggregator
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        aggregator = self.aggregator
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = aggregator.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Her istek için konsola log basılmasın
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,96 @@
+# features/motion_gate.py
+# Sabit vagon kamerasında ardışık kareler çoğunlukla aynıdır. Bu modül sayım bölgesi
+# içinde küçültülmüş kare farkından ucuz bir hareket skoru hesaplar ve sahne
+# durağanken modeli atlamaya karar verir.
+import cv2
+import numpy as np
+
+import config
+
+
+class MotionGate:
+    """
+    Bir karede çıkarım yapılıp yapılmayacağına karar verir.
+    - Son çıkarım yapılan kareden bu yana en az max_stride kare geçtiyse her zaman çıkarım yapılır.
+    - Hareket skoru eşiği aştıysa ve en az min_stride kare geçtiyse çıkarım yapılır.
+    - Aksi halde kare atlanır, önceki tespitler ve sayım aynen taşınır.
+    """
+
+    def __init__(self, polygon, width, height, threshold=None, min_stride=None, max_stride=None,
+                 downscale=None):
+        self.threshold = config.MOTION_THRESHOLD if threshold is None else threshold
+        self.min_stride = max(1, min_stride or config.MOTION_MIN_STRIDE)
+        self.max_stride = max(self.min_stride, max_stride or config.MOTION_MAX_STRIDE)
+        downscale = max(1, downscale or config.MOTION_DOWNSCALE)
+
+        self.small_size = (max(1, width // downscale), max(1, height // downscale))
+        mask = np.zeros((self.small_size[1], self.small_size[0]), dtype=np.uint8)
+        small_polygon = (np.array(polygon, np.float32) / downscale).astype(np.int32)
+        cv2.fillPoly(mask, [small_polygon], 1)
+        self.mask = mask.astype(bool)
+        if not self.mask.any():
+            self.mask[:] = True
+        self._mask_u8 = self.mask.astype(np.uint8)
+
+        # Kare başına dizi ayırmamak için küçültme, gri ve fark tamponları bir kez ayrılır;
+        # iki gri tampon sırayla referans ve güncel kare olarak kullanılır
+        small_height, small_width = self.small_size[1], self.small_size[0]
+        self._small = np.empty((small_height, small_width, 3), dtype=np.uint8)
+        self._grays = [np.empty((small_height, small_width), dtype=np.uint8) for _ in range(2)]
+        self._diff = np.empty((small_height, small_width), dtype=np.uint8)
+
+        self.reference = None
+        self.frames_since_inference = 0
+        self.inferred = 0
+        self.skipped = 0
+        self.last_score = 0.0
+
+    def _prepare(self, frame):
+        # Referans olmayan gri tampona yazılır
+        gray = self._grays[1] if self.reference is self._grays[0] else self._grays[0]
+        cv2.resize(frame, self.small_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=gray)
+
+    def motion_score(self, small_gray):
+        """Son çıkarım karesine göre bölge içindeki ortalama mutlak fark (0-1 aralığında)"""
+        diff = cv2.absdiff(small_gray, self.reference, dst=self._diff)
+        # cv2.mean maskeli ortalamayı ara dizi (diff[mask]) oluşturmadan hesaplar
+        return cv2.mean(diff, mask=self._mask_u8)[0] / 255.0
+
+    def should_infer(self, frame):
+        small_gray = self._prepare(frame)
+        self.frames_since_inference += 1
+
+        if self.reference is None or self.frames_since_inference >= self.max_stride:
+            infer = True
+        else:
+            self.last_score = self.motion_score(small_gray)
+            infer = self.last_score > self.threshold and self.frames_since_inference >= self.min_stride
+
+        if infer:
+            self.reference = small_gray
+            self.frames_since_inference = 0
+            self.inferred += 1
+        else:
+            self.skipped += 1
+        return infer
+
+    def stats(self):
+        total = self.inferred + self.skipped
+        return {
+            "inferred_frames": self.inferred,
+            "skipped_frames": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0
+        }
+
+
+def gate_batches(batches, motion_gate=None):
+    """
+    Kare batch'lerine çıkarım maskesi ekler: (kareler, [bool, ...]).
+    motion_gate verilmezse tüm kareler çıkarıma gider.
+    """
+    for frames in batches:
+        if motion_gate is None:
+            yield frames, [True] * len(frames)
+        else:
+            yield frames, [motion_gate.should_infer(frame) for frame in frames]
@@ -0,0 +1,297 @@
+# features/pipeline.py
+# Video işleme döngüsünü aşamalara ayırır:
+#   decode (ayrı thread) -> [ön-okuma kuyruğu] -> çıkarım + sayım (çağıran thread)
+#   -> [çizim kuyruğu] -> çizim + VideoWriter (ayrı thread)
+# Kuyruklar sınırlıdır; yavaş aşama öncekini bekletir (backpressure).
+# Her aşamanın gecikmesi ve kuyruk doluluğu ölçülür, darboğaz buradan görülür.
+import queue
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+# Kuyruğun bittiğini bildiren işaret
+_END = object()
+
+
+class _StageError:
+    """Yan thread'de oluşan hatayı ana thread'e taşır"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class StageStats:
+    """
+    Bir aşamanın işlediği öğe sayısını ve gecikmelerini tutar.
+    max_samples > 0 ise öğe başına süreler de (en fazla max_samples adet) saklanır ve
+    yüzdelikler (p50/p95/p99) hesaplanabilir; varsayılan olarak sadece toplamlar tutulur.
+    """
+
+    def __init__(self, name, max_samples=0):
+        self.name = name
+        self.items = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.max_samples = max_samples
+        self.samples = array("d")  # Öğe başına saniye
+
+    def record(self, seconds, items=1):
+        self.items += items
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if self.max_samples and items and len(self.samples) < self.max_samples:
+            # Toplu ölçümler (örn. batch çıkarımı) öğe başına süreye bölünür
+            per_item = seconds / items
+            self.samples.extend([per_item] * min(items, self.max_samples - len(self.samples)))
+
+    def percentile(self, fraction):
+        """Saklanan öğe sürelerinin en yakın sıra yüzdeliği (saniye); örnek yoksa None"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+    def as_dict(self):
+        average = self.total_seconds / self.items if self.items else 0.0
+        values = {
+            "items": self.items,
+            "avg_ms": average * 1000,
+            "max_ms": self.max_seconds * 1000,
+            "busy_seconds": self.total_seconds
+        }
+        if self.samples:
+            for label, fraction in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                values[label] = self.percentile(fraction) * 1000
+        return values
+
+
+class StageTimings:
+    """
+    Aşama adından StageStats'a sözlük. İşlem hattı ve onu besleyen/tüketen fonksiyonlar
+    (kare okuma, çizim) aynı nesneye yazar; her aşamaya tek bir thread yazmalıdır.
+    """
+
+    def __init__(self, max_samples=0):
+        self.max_samples = max_samples
+        self.stages = {}
+
+    def stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = StageStats(name, self.max_samples)
+        return self.stages[name]
+
+    @contextmanager
+    def timed(self, name, items=1):
+        """with bloğunun süresini verilen aşamaya kaydeder"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage(name).record(time.perf_counter() - start, items)
+
+    def as_dict(self):
+        return {name: stats.as_dict() for name, stats in self.stages.items()}
+
+
+class QueueStats:
+    """Bir kuyruğun doluluğunu her ekleme anında örnekler"""
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.samples = 0
+        self.total_depth = 0
+        self.max_depth = 0
+        self.current_depth = 0
+
+    def sample(self, depth):
+        self.samples += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+        self.current_depth = depth
+
+    def as_dict(self):
+        return {
+            "capacity": self.maxsize,
+            "current_depth": self.current_depth,
+            "avg_depth": self.total_depth / self.samples if self.samples else 0.0,
+            "max_depth": self.max_depth
+        }
+
+
+class StagePipeline:
+    """
+    Kaynak iteratörünü ayrı bir thread'de önden okur ve submit() ile verilen öğeleri
+    ayrı bir thread'de sink fonksiyonuna iletir. threaded=False iken her şey çağıran
+    thread'de sırayla çalışır (eski davranış), ölçümler yine tutulur.
+    sink None ise (örn. çizim/kayıt yapılmayan modlarda) sink aşaması hiç kurulmaz.
+    timings verilirse ölçümler bu ortak StageTimings nesnesine yazılır.
+    prefetch False ise kaynak önden okunmaz (sadece sink thread'de çalışır); kaynağın kendisi
+    en yeni kareyi tutan canlı bir kaynak olduğunda kuyrukta bayat kare birikmesini önler.
+    source_queue_size verilirse ön-okuma kuyruğu queue_size yerine bu sınırla kurulur.
+    """
+
+    def __init__(self, source, sink, queue_size=8, threaded=True,
+                 source_stage="decode", sink_stage="render", timings=None, prefetch=True,
+                 source_queue_size=None):
+        self.source = iter(source)
+        self.sink = sink
+        self.threaded = threaded
+        self.prefetch = threaded and prefetch
+        self.source_stage = source_stage
+        self.sink_stage = sink_stage
+        self.timings = timings or StageTimings()
+        self.stages = self.timings.stages
+        self.timings.stage(source_stage)
+        if sink is not None:
+            self.timings.stage(sink_stage)
+        self.queues = {}
+        self._stop = threading.Event()
+        self._sink_error = None
+
+        if threaded:
+            self._source_thread = None
+            if self.prefetch:
+                source_queue_size = source_queue_size or queue_size
+                self._source_queue = queue.Queue(maxsize=source_queue_size)
+                self.queues[source_stage] = QueueStats(source_stage, source_queue_size)
+                self._source_thread = threading.Thread(target=self._source_loop, name=f"{source_stage}-stage",
+                                                       daemon=True)
+            self._sink_thread = None
+            if sink is not None:
+                self._sink_queue = queue.Queue(maxsize=queue_size)
+                self.queues[sink_stage] = QueueStats(sink_stage, queue_size)
+                self._sink_thread = threading.Thread(target=self._sink_loop, name=f"{sink_stage}-stage",
+                                                     daemon=True)
+                self._sink_thread.start()
+            if self._source_thread is not None:
+                self._source_thread.start()
+
+    def stage(self, name):
+        """Çağıran tarafın ölçtüğü ara aşamalar (örn. inference) için istatistik nesnesi"""
+        return self.timings.stage(name)
+
+    def timed(self, name, items=1):
+        """with bloğunun süresini verilen aşamaya kaydeder"""
+        return self.timings.timed(name, items)
+
+    def _put(self, target_queue, item):
+        """Durdurma istenene kadar kuyruğa koymayı dener; kuyruk doluysa bekler"""
+        while not self._stop.is_set():
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_source_item(self):
+        start = time.perf_counter()
+        try:
+            item = next(self.source)
+        except StopIteration:
+            return _END
+        self.stages[self.source_stage].record(time.perf_counter() - start)
+        return item
+
+    def _source_loop(self):
+        try:
+            while not self._stop.is_set():
+                item = self._next_source_item()
+                if not self._put(self._source_queue, item) or item is _END:
+                    return
+                self.queues[self.source_stage].sample(self._source_queue.qsize())
+        except Exception as e:
+            self._put(self._source_queue, _StageError(e))
+
+    def _sink_loop(self):
+        while True:
+            item = self._sink_queue.get()
+            if item is _END:
+                return
+            if self._sink_error is not None:
+                # Hata sonrası kuyruğu boşalt ki üretici bloklanmasın
+                continue
+            start = time.perf_counter()
+            try:
+                self.sink(item)
+            except Exception as e:
+                self._sink_error = e
+                continue
+            self.stages[self.sink_stage].record(time.perf_counter() - start)
+
+    def __iter__(self):
+        if not self.prefetch:
+            while True:
+                item = self._next_source_item()
+                if item is _END:
+                    return
+                yield item
+
+        while True:
+            item = self._source_queue.get()
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+
+    def submit(self, item):
+        """Öğeyi sink aşamasına iletir; kuyruk doluysa yer açılana kadar bekler"""
+        if self._sink_error is not None:
+            raise self._sink_error
+        if self.sink is None:
+            return
+        if not self.threaded:
+            start = time.perf_counter()
+            self.sink(item)
+            self.stages[self.sink_stage].record(time.perf_counter() - start)
+            return
+        self._put(self._sink_queue, item)
+        self.queues[self.sink_stage].sample(self._sink_queue.qsize())
+
+    def close(self):
+        """Kalan öğelerin sink'e yazılmasını bekler ve thread'leri kapatır"""
+        if not self.threaded:
+            return
+        if self._sink_thread is not None:
+            self._put(self._sink_queue, _END)
+            self._sink_thread.join()
+        self._stop.set()
+        if self._source_thread is not None:
+            self._source_thread.join(timeout=5)
+        if self._sink_error is not None:
+            raise self._sink_error
+
+    def abort(self):
+        """Hata durumunda thread'leri beklemeden durdurur"""
+        self._stop.set()
+        if self.threaded and self._sink_thread is not None:
+            try:
+                self._sink_queue.put_nowait(_END)
+            except queue.Full:
+                pass
+
+    def depths(self):
+        """Kuyrukların anlık doluluğu (threaded=False iken boş sözlük)"""
+        if not self.threaded:
+            return {}
+        depths = {self.source_stage: self._source_queue.qsize()} if self.prefetch else {}
+        if self.sink is not None:
+            depths[self.sink_stage] = self._sink_queue.qsize()
+        return depths
+
+    def stats(self):
+        return {
+            "stages": self.timings.as_dict(),
+            "queues": {name: stats.as_dict() for name, stats in self.queues.items()}
+        }
+
+
+def format_stats(stats):
+    """stats() çıktısını tek satırlık okunabilir bir özete çevirir"""
+    parts = [f"{name}: {values['avg_ms']:.1f} ms ort." for name, values in stats["stages"].items()]
+    parts += [f"kuyruk[{name}] ort. {values['avg_depth']:.1f}/{values['capacity']}"
+              for name, values in stats["queues"].items()]
+    return " | ".join(parts)
@@ -0,0 +1,128 @@
+# features/quantization.py
+# Kişi dedektörünün kendi görüntülerimizle kalibre edilmiş INT8 (statik, eğitim sonrası) nicemlemesi.
+# Kalibrasyon kareleri data/videos altındaki videolardan eşit aralıklarla örneklenir ve
+# process_video'daki gibi hazırlanır (VIDEO_WIDTH x VIDEO_HEIGHT'e küçültme, ROI açıksa kırpma).
+# Sadece Conv/MatMul ağırlıkları nicemlenir; kutu çözme başlığı (Mul/Add/Concat) FP32 kalır ki
+# koordinat hassasiyeti korunsun.
+import glob
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+import config
+from features.exported_model import (BACKEND_ONNX, BACKEND_ONNX_INT8, export_model, exported_model_path,
+                                     preprocess, read_export_imgsz)
+from features.roi_crop import zone_roi
+from features.zone_lookup import ZoneLookup, zones_for_camera
+
+try:
+    import onnx
+    from onnxruntime.quantization import (CalibrationMethod, QuantFormat, QuantType, quant_pre_process,
+                                          quantize_static)
+except ImportError:
+    onnx = None
+
+QUANTIZED_OP_TYPES = ["Conv", "MatMul"]
+
+
+def sample_calibration_frames(video_files, frames_per_video=None, roi_cropped=None):
+    """
+    Her videodan eşit aralıklı frames_per_video kare okur ve process_video'nun modele verdiği
+    biçime getirir. roi_cropped verilmezse config.ROI_CROP_ENABLED kullanılır.
+    """
+    frames_per_video = frames_per_video or config.QUANTIZATION_CALIBRATION_FRAMES_PER_VIDEO
+    if roi_cropped is None:
+        roi_cropped = config.ROI_CROP_ENABLED
+    width, height = config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+
+    frames = []
+    for video_file in video_files:
+        roi = None
+        if roi_cropped:
+            camera_id = os.path.splitext(os.path.basename(video_file))[0]
+            zone_lookup = ZoneLookup(zones_for_camera(camera_id), width, height)
+            roi = zone_roi(zone_lookup.polygons.values(), width, height)
+
+        cap = cv2.VideoCapture(video_file)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        for index in np.linspace(0, max(0, total_frames - 1), frames_per_video).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            frame = cv2.resize(frame, (width, height))
+            if roi is not None:
+                x1, y1, x2, y2 = roi
+                frame = np.ascontiguousarray(frame[y1:y2, x1:x2])
+            frames.append(frame)
+        cap.release()
+    return frames
+
+
+class FrameCalibrationReader:
+    """onnxruntime'ın CalibrationDataReader arayüzü: kareleri tek tek letterbox'lanmış girdi olarak verir"""
+
+    def __init__(self, input_name, frames, size):
+        self.input_name = input_name
+        self.frames = frames
+        self.size = size
+        self.position = 0
+
+    def get_next(self):
+        if self.position >= len(self.frames):
+            return None
+        batch, _ = preprocess([self.frames[self.position]], self.size)
+        self.position += 1
+        return {self.input_name: batch}
+
+    def rewind(self):
+        self.position = 0
+
+
+def quantize_model(weights=None, frames=None, imgsz=None, force=False):
+    """
+    FP32 ONNX modelini (gerekirse dışa aktararak) kalibrasyon kareleriyle INT8'e nicemler ve
+    önbellek yolunu döndürür. frames verilmezse config.INPUT_VIDEO_DIRECTORY'den örneklenir.
+    """
+    if onnx is None:
+        raise ImportError("INT8 nicemleme için onnx ve onnxruntime kurulmalı: pip install onnx onnxruntime")
+    weights = weights or config.MODEL_NAME
+    imgsz = imgsz or config.INFERENCE_IMGSZ
+    target = exported_model_path(weights, BACKEND_ONNX_INT8, imgsz)
+    if os.path.exists(target) and not force:
+        return target
+
+    fp32_path = export_model(weights, BACKEND_ONNX, imgsz)
+    if frames is None:
+        video_files = sorted(glob.glob(os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4")))
+        frames = sample_calibration_frames(video_files)
+    if not frames:
+        raise ValueError("Kalibrasyon için kare bulunamadı")
+
+    fp32_model = onnx.load(fp32_path)
+    input_name = fp32_model.graph.input[0].name
+    reader = FrameCalibrationReader(input_name, frames, read_export_imgsz(fp32_path))
+    print(f"🧮 {len(frames)} kalibrasyon karesiyle INT8 nicemleme yapılıyor...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Şekil çıkarımı ve graf sadeleştirme nicemleme kalitesini artırır
+        prepared_path = os.path.join(tmp_dir, "prepared.onnx")
+        quant_pre_process(fp32_path, prepared_path, skip_symbolic_shape=True)
+        quantize_static(prepared_path, target, reader,
+                        quant_format=QuantFormat.QDQ,
+                        op_types_to_quantize=QUANTIZED_OP_TYPES,
+                        per_channel=True,
+                        activation_type=QuantType.QUInt8,
+                        weight_type=QuantType.QInt8,
+                        calibrate_method=CalibrationMethod.MinMax)
+
+    # Ultralytics metadata'sı (imgsz, sınıflar) nicemlenmiş modele taşınır
+    quantized_model = onnx.load(target)
+    del quantized_model.metadata_props[:]
+    quantized_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(quantized_model, target)
+    print(f"✅ INT8 model önbelleklendi: {target}")
+    return target
+
@@ -0,0 +1,124 @@
+# features/realtime_source.py
+# Canlı kaynaklar için gerçek zamanlı kare okuma.
+# Okuma thread'i kaynağı kendi hızında (CAP_PROP_FPS) okur ve sadece en yeni kareyi tutar;
+# işleme geride kalırsa henüz işlenmemiş eski kare yenisiyle ezilir (bayat kare düşürülür).
+# Yerel bir dosya duvar saati hızında oynatılarak kamera yerine kullanılabilir.
+import threading
+import time
+
+import cv2
+
+from features.pipeline import StageTimings
+
+DEFAULT_SOURCE_FPS = 30.0  # Kaynak fps bildirmiyorsa
+
+
+class LatestFrameGrabber:
+    """
+    Kaynağı arka plan thread'inde okuyan tek yuvalı tampon.
+    paced True ise kareler yerel dosyadaki zamanlarına göre (duvar saati) okunur;
+    canlı kamerada okuma zaten kaynağın hızında bloklandığından paced False olmalıdır.
+    read() her çağrıda son okunan ve daha önce verilmemiş kareyi (indeks, yakalama anı, kare) döndürür.
+    Okuma tamponları yeniden kullanılır: tüketici kareyle işini bitirince release() ile geri verir,
+    ezilen bayat karenin tamponu da doğrudan sonraki okumaya gider (en fazla üç tampon).
+    """
+
+    def __init__(self, cap, fps=None, paced=True, timings=None):
+        self.cap = cap
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or DEFAULT_SOURCE_FPS
+        self.frame_interval = 1.0 / fps
+        self.paced = paced
+        self.timings = timings or StageTimings()
+        self.stats = {"captured": 0, "delivered": 0, "dropped": 0}
+        self._latest = None
+        self._free_buffers = []
+        self._finished = False
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.monotonic()
+        index = 0
+        try:
+            while not self._stop.is_set():
+                if self.paced:
+                    delay = start + index * self.frame_interval - time.monotonic()
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+                with self._condition:
+                    buffer = self._free_buffers.pop() if self._free_buffers else None
+                with self.timings.timed("decode"):
+                    ret, frame = self.cap.read(buffer)
+                if not ret:
+                    break
+                capture_time = time.monotonic()
+                with self._condition:
+                    if self._latest is not None:
+                        self.stats["dropped"] += 1
+                        self._free_buffers.append(self._latest[2])
+                    self._latest = (index, capture_time, frame)
+                    self.stats["captured"] += 1
+                    self._condition.notify()
+                index += 1
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def read(self):
+        """Yeni kare gelene kadar bekler; kaynak bittiyse None döndürür"""
+        with self._condition:
+            while self._latest is None and not self._finished:
+                self._condition.wait(0.1)
+            if self._latest is None:
+                return None
+            item, self._latest = self._latest, None
+            self.stats["delivered"] += 1
+            return item
+
+    def release(self, frame):
+        """read() ile alınan karenin tamponunu sonraki okumalar için geri verir"""
+        with self._condition:
+            self._free_buffers.append(frame)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def drop_ratio(self):
+        return self.stats["dropped"] / self.stats["captured"] if self.stats["captured"] else 0.0
+
+
+class RealtimeFrameSource:
+    """
+    En yeni kareyi boyutlandırıp tek karelik batch olarak veren kaynak (iter_frame_batches yerine).
+    Her batch'in yakalama anları batch_capture_times'ta tutulur; kaynak önden okunmadığı için
+    (prefetch=False) döngüdeki batch ile her zaman eşleşir.
+    ring (FrameRing) verilirse boyutlandırılmış kareler halkanın yuvalarına yazılır.
+    """
+
+    def __init__(self, grabber, width, height, timings=None, ring=None):
+        self.grabber = grabber
+        self.ring = ring
+        self.width = width
+        self.height = height
+        self.timings = timings or StageTimings()
+        self.batch_capture_times = []
+
+    def __iter__(self):
+        while True:
+            item = self.grabber.read()
+            if item is None:
+                return
+            _, capture_time, frame = item
+            with self.timings.timed("resize"):
+                resized = cv2.resize(frame, (self.width, self.height),
+                                     dst=self.ring.next() if self.ring is not None else None)
+            self.grabber.release(frame)
+            self.batch_capture_times = [capture_time]
+            yield [resized]
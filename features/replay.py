@@ -0,0 +1,134 @@
+# features/replay.py
+# Tarihsel doluluk kayıtlarından sabit hızlı (ör. 10 Hz) bir oynatma zaman çizelgesi hazırlar.
+# Kayıtlar depolamadan imleçli sayfalar halinde ya da yerel geçmişten pencere pencere okunur;
+# ham kayıtlar bellekte tutulmaz, sadece vagon başına tik başına son değer saklanır.
+# Oynatma sırasında her tikte tek bir değer kümesi çizilir; ileri/geri sarma tik indeksidir.
+import numpy as np
+
+import config
+
+REPLAY_SPEEDS = (0.5, 1, 2, 5, 10, 30, 60)
+
+
+def _epoch(timestamp):
+    return timestamp.timestamp() if hasattr(timestamp, "timestamp") else float(timestamp)
+
+
+def iter_history_pages(storage, collection_name, filters=None, page_size=None):
+    """Koleksiyonu zamana göre sıralı, imleçli sayfalar halinde okur (her sayfa bir liste)"""
+    page_size = page_size or config.REPLAY_PAGE_SIZE
+    last = None
+    while True:
+        page = storage.query_documents(collection_name, filters=filters, order_by="timestamp",
+                                       limit=page_size, start_after=last)
+        if not page:
+            return
+        yield [data for _, data in page]
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+def storage_time_bounds(storage, collection_name, filters=None):
+    """Koleksiyondaki (ilk, son) kayıt zamanı; kayıt yoksa None"""
+    first = storage.query_documents(collection_name, filters=filters, order_by="timestamp", limit=1)
+    last = storage.query_documents(collection_name, filters=filters, order_by="timestamp",
+                                   descending=True, limit=1)
+    if not first or not last:
+        return None
+    return _epoch(first[0][1]["timestamp"]), _epoch(last[0][1]["timestamp"])
+
+
+class ReplayTimeline:
+    """
+    [start, end] aralığını rate_hz hızında tiklere böler ve her vagon için her tikteki son
+    doluluk değerini tutar. Tik sayısı max_ticks'i aşarsa hız düşürülür, böylece bellek
+    kullanımı kaydın uzunluğundan bağımsız olarak sınırlı kalır.
+    """
+
+    def __init__(self, start, end, rate_hz=None, max_ticks=None):
+        rate_hz = rate_hz or config.REPLAY_TIMELINE_HZ
+        max_ticks = max_ticks or config.REPLAY_MAX_TICKS
+        self.start = float(start)
+        self.duration = max(0.0, float(end) - self.start)
+        self.rate_hz = min(float(rate_hz), (max_ticks - 1) / self.duration) if self.duration > 0 else float(rate_hz)
+        self.num_ticks = int(self.duration * self.rate_hz) + 1
+        self.values = {}  # wagon_id -> (num_ticks,) float32, güncelleme olmayan tikler NaN
+        self._finalized = False
+
+    def _column(self, wagon_id):
+        column = self.values.get(wagon_id)
+        if column is None:
+            column = np.full(self.num_ticks, np.nan, dtype=np.float32)
+            self.values[wagon_id] = column
+        return column
+
+    def tick_for_time(self, timestamp):
+        return int(np.clip((timestamp - self.start) * self.rate_hz, 0, self.num_ticks - 1))
+
+    def seconds_for_tick(self, tick):
+        return tick / self.rate_hz
+
+    def add(self, wagon_id, timestamp, fullness):
+        """Zamana göre sıralı gelen tek kayıt; aynı tikteki sonraki kayıt öncekinin üzerine yazar"""
+        self._column(wagon_id)[self.tick_for_time(_epoch(timestamp))] = fullness
+
+    def add_many(self, wagon_id, timestamps, fullness):
+        """Bir vagonun zamana göre sıralı kayıt dizilerini vektörize ekler (tik başına son değer)"""
+        if len(timestamps) == 0:
+            return
+        ticks = np.clip(((np.asarray(timestamps) - self.start) * self.rate_hz).astype(np.int64),
+                        0, self.num_ticks - 1)
+        last_in_tick = np.append(ticks[1:] != ticks[:-1], True)
+        self._column(wagon_id)[ticks[last_in_tick]] = np.asarray(fullness)[last_in_tick]
+
+    def finalize(self):
+        """Güncelleme olmayan tikleri son bilinen değerle doldurur (ilk değerden önce 0.0)"""
+        if self._finalized:
+            return self
+        for wagon_id, column in self.values.items():
+            known = ~np.isnan(column)
+            last_known = np.maximum.accumulate(np.where(known, np.arange(self.num_ticks), -1))
+            filled = np.where(last_known >= 0, column[np.maximum(last_known, 0)], 0.0)
+            self.values[wagon_id] = filled.astype(np.float32)
+        self._finalized = True
+        return self
+
+    def values_at(self, tick):
+        """{wagon_id: doluluk} (finalize() sonrası)"""
+        tick = int(np.clip(tick, 0, self.num_ticks - 1))
+        return {wagon_id: float(column[tick]) for wagon_id, column in self.values.items()}
+
+    @classmethod
+    def from_storage(cls, storage, collection_name, run_id=None, rate_hz=None, page_size=None):
+        """
+        Depolamadaki tarihsel koleksiyondan imleçli sayfalama ile zaman çizelgesi oluşturur.
+        run_id verilirse sadece o çalıştırmanın kayıtları okunur.
+        """
+        filters = {"run_id": run_id} if run_id else None
+        bounds = storage_time_bounds(storage, collection_name, filters)
+        if bounds is None:
+            return None
+        timeline = cls(*bounds, rate_hz=rate_hz)
+        for page in iter_history_pages(storage, collection_name, filters, page_size):
+            for log_entry in page:
+                wagon_id = log_entry.get("wagon_id")
+                fullness = log_entry.get("fullness_percentage")
+                timestamp = log_entry.get("timestamp")
+                if wagon_id and fullness is not None and timestamp is not None:
+                    timeline.add(wagon_id, timestamp, fullness)
+        return timeline.finalize()
+
+    @classmethod
+    def from_history_reader(cls, reader, rate_hz=None, chunk_rows=1_000_000):
+        """Yerel geçmişten (memmap) parça parça okuyarak zaman çizelgesi oluşturur"""
+        bounds = reader.time_bounds()
+        if bounds is None:
+            return None
+        timeline = cls(*bounds, rate_hz=rate_hz)
+        for wagon_id in reader.wagon_ids():
+            columns = reader.wagon_range(wagon_id)
+            for start in range(0, len(columns["timestamp"]), chunk_rows):
+                timeline.add_many(wagon_id, columns["timestamp"][start:start + chunk_rows],
+                                  columns["fullness"][start:start + chunk_rows])
+        return timeline.finalize()
@@ -0,0 +1,56 @@
+# features/roi_crop.py
+# Modelin tüm kare yerine sadece sayım bölgesini çevreleyen dikdörtgeni görmesini sağlar.
+# Kırpma dikdörtgeni kamera başına bir kez hesaplanır; tespitler kare koordinatlarına geri taşınır.
+import cv2
+import numpy as np
+
+import config
+
+
+def zone_roi(polygons, width, height, margin=None):
+    """
+    Bölgelerin ortak sınır dikdörtgenine margin piksel pay ekler ve kare sınırlarına kırpar.
+    (x1, y1, x2, y2) döndürür.
+    """
+    margin = config.ROI_MARGIN if margin is None else margin
+    points = np.concatenate([np.asarray(polygon, np.int32).reshape(-1, 2) for polygon in polygons])
+    x, y, w, h = cv2.boundingRect(points)
+    x1 = max(0, x - margin)
+    y1 = max(0, y - margin)
+    x2 = min(width, x + w + margin)
+    y2 = min(height, y + h + margin)
+    return x1, y1, x2, y2
+
+
+def roi_pixel_ratio(roi, width, height):
+    """Kırpılmış alanın tüm kareye oranı"""
+    x1, y1, x2, y2 = roi
+    return (x2 - x1) * (y2 - y1) / float(width * height)
+
+
+class RoiDetector:
+    """Başka bir detector'ı sarar: kareleri ROI'ye kırpar, kutuları kare koordinatlarına kaydırır"""
+
+    def __init__(self, detector, roi):
+        self.detector = detector
+        self.roi = roi
+        self._crop_buffer = None  # (batch, h, w, 3); detect() dönene kadar kullanılır, sonra yeniden yazılır
+
+    def _crops(self, frames):
+        x1, y1, x2, y2 = self.roi
+        if self._crop_buffer is None or len(self._crop_buffer) < len(frames):
+            self._crop_buffer = np.empty((len(frames), y2 - y1, x2 - x1, 3), dtype=np.uint8)
+        crops = self._crop_buffer[:len(frames)]
+        for crop, frame in zip(crops, frames):
+            np.copyto(crop, frame[y1:y2, x1:x2])
+        return crops
+
+    def detect(self, frames):
+        x1, y1 = self.roi[:2]
+        crops = list(self._crops(frames))
+        detections_batch = self.detector.detect(crops)
+        for detections in detections_batch:
+            if len(detections):
+                detections[:, [0, 2]] += x1
+                detections[:, [1, 3]] += y1
+        return detections_batch
@@ -9,10 +9,13 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-# Firebase ve Firestore import'ları
-from features.database.initialize_firebase import initialize_firebase
-from features.database.firestore_crud import get_all_documents, get_document
-from firebase_admin import firestore
+# Depolama arka ucu (config.STORAGE_BACKEND: firestore, sqlite veya memory)
+import config
+from features.database.storage import create_storage
+from features.database.history_store import HistoryReader, latest_run_directory, run_directory
+from features.database.retention import PROCESSING_RUNS_COLLECTION
+from features.replay import REPLAY_SPEEDS, ReplayTimeline
+from features.live_snapshot import SnapshotCache
 
 # Hava durumu için gerekli import'lar
 # Eski importları kaldırıyoruz, çünkü get_langchain_weather_response'u doğrudan import edeceğiz
@@ -26,22 +29,23 @@ from firebase_admin import firestore
 # Yeni import: langchain.weather.py dosyasındaki fonksiyonu içe aktar
 from features.langchain_weather import get_langchain_weather_response as get_weather_report_from_llm # Fonksiyon adını çakışmaması için değiştirdim
 
-# --- Firebase Bağlantısı ---
+# --- Depolama Bağlantısı ---
 @st.cache_resource
-def get_firestore_client_wrapper():
-    client = initialize_firebase()
-    if client:
+def get_storage_wrapper():
+    storage = create_storage()
+    if storage:
         pass
     else:
-        st.error("🚨 HATA: Firebase'e bağlanılamadı. Lütfen Firebase yapılandırmanızı kontrol edin.")
-    return client
+        st.error(f"🚨 HATA: Depolama arka ucuna ({config.STORAGE_BACKEND}) bağlanılamadı. "
+                 f"Lütfen yapılandırmanızı kontrol edin.")
+    return storage
 
 
-db = get_firestore_client_wrapper()
+db = get_storage_wrapper()
 
 if db is None:
-    st.error("Uygulama başlatılamadı: Firebase bağlantısı kurulamadı.")
-    st.stop()  # Firebase bağlantısı yoksa uygulamayı durdur
+    st.error("Uygulama başlatılamadı: Depolama bağlantısı kurulamadı.")
+    st.stop()  # Depolama bağlantısı yoksa uygulamayı durdur
 
 # Firestore Koleksiyon Adları
 WAGON_CURRENT_FULLNESS_COLLECTION = "wagon_fullness_current"
@@ -50,6 +54,17 @@ PROCESSING_STATUS_COLLECTION = "processing_status"
 PROCESSING_COMPLETE_DOC_ID = "video_analysis_status"
 
 
+# --- Paylaşımlı Canlı Önbellek ---
+# st.cache_resource sayesinde süreçteki tüm oturumlar aynı önbelleği (tek dinleyici/yoklayıcı) kullanır
+@st.cache_resource
+def get_snapshot_cache():
+    return SnapshotCache(db, WAGON_CURRENT_FULLNESS_COLLECTION, PROCESSING_STATUS_COLLECTION,
+                         PROCESSING_COMPLETE_DOC_ID).start()
+
+
+snapshot_cache = get_snapshot_cache()
+
+
 # --- Hava Durumu Bilgisini Alan Fonksiyon (Bu fonksiyonu kaldırıyoruz veya içe aktardığımızı çağırıyoruz) ---
 # @st.cache_data(ttl=3600) # Bu dekoratör artık langchain.weather.py'deki fonksiyonda olacak
 # def get_langchain_weather_response():
@@ -296,46 +311,114 @@ def update_train_display(fullness_data, placeholder):
     placeholder.markdown(full_train_html, unsafe_allow_html=True)
 
 
-# Yeniden oynatma fonksiyonu
-def replay_historical_logs(db_client, wagon_map, display_placeholder, status_placeholder):
-    # Bu fonksiyondaki tüm mesajları `status_placeholder` aracılığıyla göster
-    status_placeholder.info("Loglar yeniden oynatılıyor... Lütfen bekleyin.")
-    try:
-        docs = db_client.collection(WAGON_HISTORICAL_LOGS_COLLECTION).order_by("timestamp").stream()
-        historical_logs = [doc.to_dict() for doc in docs]
+# Oynatılacak (en son) çalıştırmanın kimliği: durum dokümanındaki run_id, yoksa en yeni çalıştırma kaydı
+def latest_run_id(storage):
+    status_doc = snapshot_cache.get()[1]["status"]
+    if status_doc and status_doc.get("run_id"):
+        return status_doc["run_id"]
+    runs = storage.query_documents(PROCESSING_RUNS_COLLECTION, order_by="started_at", descending=True, limit=1)
+    return runs[0][0] if runs else None
 
-        if not historical_logs:
-            status_placeholder.warning("Oynatmak için tarihsel log bulunamadı.")
-            return
 
-        current_replay_fullness = {name: 0.0 for name in wagon_map.keys()}
-        last_timestamp = None
+# Oynatma zaman çizelgesini config.REPLAY_SOURCE'a göre hazırlayan fonksiyon (sadece en son çalıştırma)
+def build_replay_timeline(storage):
+    run_id = latest_run_id(storage)
+    if config.REPLAY_SOURCE == "local":
+        run_dir = run_directory(run_id) if run_id else latest_run_directory()
+        if run_dir and os.path.isdir(run_dir):
+            timeline = ReplayTimeline.from_history_reader(HistoryReader(run_dir))
+            if timeline:
+                return timeline
+    # Depolamadaki koleksiyon imleçli sayfalar halinde okunur, tamamı belleğe alınmaz
+    return ReplayTimeline.from_storage(storage, WAGON_HISTORICAL_LOGS_COLLECTION, run_id=run_id)
 
-        for log_entry in historical_logs:
-            wagon_id = log_entry.get("wagon_id")
-            fullness = log_entry.get("fullness_percentage")
-            timestamp = log_entry.get("timestamp")
 
-            if wagon_id and fullness is not None:
-                display_name = next((key for key, value in wagon_map.items() if value == wagon_id), wagon_id)
-                current_replay_fullness[display_name] = fullness
+# Oynatma kontrollerinin callback'leri (yeniden çalıştırmadan önce çağrılır)
+def toggle_replay_playing():
+    timeline = st.session_state.replay_timeline
+    if not st.session_state.replay_playing and st.session_state.replay_position >= timeline.num_ticks - 1:
+        st.session_state.replay_position = 0.0  # Sona gelindiyse baştan oynat
+    st.session_state.replay_playing = not st.session_state.replay_playing
 
-                update_train_display(current_replay_fullness, display_placeholder)
 
-                if last_timestamp and timestamp:
-                    current_dt = timestamp
-                    last_dt = last_timestamp
-                    time_diff = (current_dt - last_dt).total_seconds()
-                    sleep_time = max(0.02, min(0.5, time_diff * 0.1))
-                    time.sleep(sleep_time)
-                else:
-                    time.sleep(0.05)
-                last_timestamp = timestamp
+def seek_replay():
+    timeline = st.session_state.replay_timeline
+    st.session_state.replay_position = float(timeline.tick_for_time(timeline.start + st.session_state.replay_seek))
 
-        status_placeholder.success("Log oynatma tamamlandı!")
 
-    except Exception as e:
-        status_placeholder.error(f"Tarihsel loglar oynatılırken hata: {e}")
+def close_replay():
+    st.session_state.replay_active = False
+    st.session_state.replay_playing = False
+    st.session_state.replay_timeline = None
+    st.session_state.show_replay_ui = True
+
+
+# Yeniden oynatma fonksiyonu
+def replay_historical_logs(storage, wagon_map, display_placeholder, status_placeholder, controls_placeholder):
+    # Zaman çizelgesi oynatma başına bir kez hazırlanır; kontroller değiştikçe yeniden okunmaz
+    if st.session_state.replay_timeline is None:
+        status_placeholder.info("Loglar hazırlanıyor... Lütfen bekleyin.")
+        try:
+            timeline = build_replay_timeline(storage)
+        except Exception as e:
+            status_placeholder.error(f"Tarihsel loglar okunurken hata: {e}")
+            return
+        if timeline is None:
+            status_placeholder.warning("Oynatmak için tarihsel log bulunamadı.")
+            return
+        st.session_state.replay_timeline = timeline
+        st.session_state.replay_position = 0.0
+        st.session_state.replay_playing = True
+
+    timeline = st.session_state.replay_timeline
+    last_tick = timeline.num_ticks - 1
+    display_names = {doc_id: name for name, doc_id in wagon_map.items()}  # wagon_id -> görünen ad
+
+    with controls_placeholder.container():
+        col_play, col_speed, col_seek, col_close = st.columns([1, 2, 5, 1])
+        with col_play:
+            st.button("⏸️ Duraklat" if st.session_state.replay_playing else "▶️ Oynat",
+                      on_click=toggle_replay_playing, use_container_width=True)
+        with col_speed:
+            st.select_slider("Hız", options=REPLAY_SPEEDS, key="replay_speed", format_func=lambda v: f"{v}x")
+        with col_seek:
+            # Kaydırıcı her çalıştırmada güncel konumdan başlar; kullanıcı değiştirirse seek_replay çağrılır
+            st.session_state.replay_seek = round(timeline.seconds_for_tick(int(st.session_state.replay_position)), 1)
+            st.slider("Konum (sn)", 0.0, max(round(timeline.duration, 1), 0.1), step=0.1,
+                      key="replay_seek", on_change=seek_replay)
+        with col_close:
+            st.button("Kapat", on_click=close_replay, use_container_width=True)
+
+    def render(tick, force=False):
+        values = timeline.values_at(tick)
+        if force or values != render.last_values:
+            update_train_display({display_names.get(wagon_id, wagon_id): value for wagon_id, value in values.items()},
+                                 display_placeholder)
+            render.last_values = values
+        seconds = int(timeline.seconds_for_tick(tick))
+        if force or seconds != render.last_seconds:
+            status_placeholder.info(f"⏱️ {seconds} / {int(timeline.duration)} sn · {st.session_state.replay_speed}x")
+            render.last_seconds = seconds
+
+    render.last_values = None
+    render.last_seconds = None
+    render(int(st.session_state.replay_position), force=True)
+    if not st.session_state.replay_playing:
+        return
+
+    # Her tikte en fazla bir çizim yapılır; hız arttıkça tik başına daha fazla zaman ilerlenir.
+    # Kontrollerle etkileşim bu döngüyü keser ve konum session_state'ten devam eder.
+    interval = 1.0 / config.REPLAY_TIMELINE_HZ
+    step = st.session_state.replay_speed * timeline.rate_hz * interval
+    deadline = time.monotonic()
+    while st.session_state.replay_position < last_tick:
+        deadline += interval
+        time.sleep(max(0.0, deadline - time.monotonic()))
+        st.session_state.replay_position = min(float(last_tick), st.session_state.replay_position + step)
+        render(int(st.session_state.replay_position))
+
+    st.session_state.replay_playing = False
+    status_placeholder.success("Log oynatma tamamlandı!")
 
 
 # --- Streamlit Uygulamasının Ana Akışı ---
@@ -351,13 +434,19 @@ if 'show_replay_ui' not in st.session_state:
     st.session_state.show_replay_ui = False
 if 'replay_active' not in st.session_state:
     st.session_state.replay_active = False
+if 'replay_timeline' not in st.session_state:
+    st.session_state.replay_timeline = None
+    st.session_state.replay_position = 0.0
+    st.session_state.replay_playing = False
+if 'replay_speed' not in st.session_state:
+    st.session_state.replay_speed = config.REPLAY_DEFAULT_SPEED
 
 
 # Canlı doluluk verilerini çeken ve ekranı güncelleyen yardımcı fonksiyon
-def update_current_fullness_and_display_live():
+def update_current_fullness_and_display_live(snapshot):
     current_fullness = {}
     try:
-        all_wagon_data = get_all_documents(db, WAGON_CURRENT_FULLNESS_COLLECTION)
+        all_wagon_data = snapshot["current"]  # Depolamaya değil paylaşımlı önbelleğe bakılır
         for display_name, doc_id in video_names.items():
             if doc_id in all_wagon_data:
                 fullness_data = all_wagon_data[doc_id]
@@ -381,31 +470,20 @@ def update_current_fullness_and_display_live():
 
 # 1. Durum: Logları yeniden oynatma modu aktif
 if st.session_state.replay_active:
-    # Bu modda diğer tüm mesajları ve butonları temizle
+    # Bu modda tamamlanma mesajını temizle; buton alanı oynatma kontrollerine ayrılır
     completion_message_placeholder.empty()
-    button_container_placeholder.empty()
     # loading_status_placeholder mesajları replay_historical_logs fonksiyonu tarafından yönetilecek
+    # Oynatma "Kapat" ile bitirilir; oynatma bitse de kontroller (seek/tekrar oynat) ekranda kalır
 
-    replay_historical_logs(db, video_names, train_display_placeholder, loading_status_placeholder)
-
-    st.session_state.replay_active = False
-    st.session_state.show_replay_ui = True
-    st.rerun()  # Oynatma bittikten sonra 'tamamlandı' arayüzüne geçiş için yeniden çalıştır
+    replay_historical_logs(db, video_names, train_display_placeholder, loading_status_placeholder,
+                           button_container_placeholder)
 
 # 2. Durum: Başlangıç yüklemesi veya video işleme devam ediyor (tamamlanma kontrolü)
 elif not st.session_state.show_replay_ui:
-    # Firebase'den genel işlem tamamlanma durumunu kontrol et
-    is_processing_complete_from_firebase = False
-    try:
-        if db:
-            status_doc = get_document(db, PROCESSING_STATUS_COLLECTION, PROCESSING_COMPLETE_DOC_ID)
-            if status_doc and status_doc.get("completed", False):
-                is_processing_complete_from_firebase = True
-    except Exception as e:
-        # Hata durumunda da `loading_status_placeholder`'ı kullan
-        loading_status_placeholder.warning(
-            f"Firestore'dan işlem durumu okunurken hata: {e}. Varsayılan olarak 'tamamlandı' durumu ele alınıyor.")
-        is_processing_complete_from_firebase = True
+    # Genel işlem tamamlanma durumunu paylaşımlı önbellekten kontrol et
+    snapshot_version, snapshot = snapshot_cache.get()
+    status_doc = snapshot["status"]
+    is_processing_complete_from_firebase = bool(status_doc and status_doc.get("completed", False))
 
     if is_processing_complete_from_firebase:
         # İşlem tamamlandıysa, oturum durumunu ayarla ve 'tamamlandı' arayüzüne geçmek için yeniden çalıştır
@@ -414,15 +492,16 @@ elif not st.session_state.show_replay_ui:
     else:
         # İşlem hala devam ediyorsa: Yükleme mesajını göster ve anlık verileri güncelle
         loading_status_placeholder.info("Veriler yükleniyor ve durum kontrol ediliyor... Lütfen bekleyin.")
-        update_current_fullness_and_display_live()  # Canlı tren verilerini çek ve göster
+        update_current_fullness_and_display_live(snapshot)  # Canlı tren verilerini göster
 
-        time.sleep(1)  # Bir sonraki yeniden çalıştırmadan önce 1 saniye bekle
-        st.rerun()  # Streamlit'i yeniden çalıştırarak yeni veriyi çekmesini sağla
+        # Sabit aralıkla yeniden çalıştırmak yerine önbellek sürümü değişene kadar bekle
+        snapshot_cache.wait_for_change(snapshot_version, timeout=config.LIVE_RERUN_TIMEOUT_SECONDS)
+        st.rerun()  # Streamlit'i yeni snapshot ile yeniden çalıştır
 
 # 3. Durum: İşleme tamamlandı, nihai durumu ve yeniden oynatma butonunu göster
 elif st.session_state.show_replay_ui:
     loading_status_placeholder.empty()  # Tüm yükleme/durum mesajlarını temizle
-    update_current_fullness_and_display_live()  # Trenin son canlı durumunu göster (görüntüyü sabitlemek için)
+    update_current_fullness_and_display_live(snapshot_cache.get()[1])  # Trenin son canlı durumunu göster (görüntüyü sabitlemek için)
 
     completion_message_placeholder.markdown(
         "<br><h3 style='text-align: center; color: #A0EEFF; padding: 10px; background-color: #282828; border-radius: 8px;'>✨ Tüm Vagon Görüntüleri Başarıyla Analiz Edildi! ✨</h3>",
@@ -433,4 +512,5 @@ elif st.session_state.show_replay_ui:
         with col2:
             if st.button("Logları Yeniden Oynat", key="replay_button_centered", use_container_width=True):
                 st.session_state.replay_active = True
+                st.session_state.replay_timeline = None  # Zaman çizelgesi en güncel loglardan hazırlanır
                 st.rerun()  # Yeniden oynatma moduna geç
\ No newline at end of file
@@ -1,28 +1,42 @@
 # video_processor.py
 import cv2
-import numpy as np
-from ultralytics import YOLO
 import os
 import time
+from datetime import datetime, timezone
 import config
-# Sadece create_document kullanacağız, update_document'ı ihtiyacımız yoksa kaldırabiliriz
-from features.database.firestore_crud import create_document
-from features.database.initialize_firebase import initialize_firebase
-from firebase_admin import firestore # Firestore'un SERVER_TIMESTAMP'ını kullanmak için
-
-# Firebase istemcisini bir kez başlat
-db = None
+from features.camera_profile import inference_imgsz
+from features.checkpoint import video_checkpoint
+from features.counting import (STATUS_IGNORED, STATUS_IN_ZONE, STATUS_OUTSIDE, STATUS_TRACKED, TrackedIdSet,
+                               count_people, fullness_percentage)
+from features.database.coalescing_writer import CoalescingWriter
+from features.database.background_writer import BackgroundBatchWriter
+from features.database.history_store import HistoryWriter, new_run_id, run_directory
+from features.database.storage import SERVER_TIMESTAMP, create_storage
+from features.detection_cache import DetectionCacheWriter, cache_directory, detection_settings, is_complete
+from features.detection_filter import filter_detections
+from features.exported_model import load_detector
+from features.frame_buffers import FrameRing, prefetch_batches_for, ring_slots_for
+from features.inference import BatchedTracker, FrameTracker
+from features.inference_server import ServerDetector
+from features.motion_gate import MotionGate, gate_batches
+from features.roi_crop import RoiDetector, roi_pixel_ratio, zone_roi
+from features.pipeline import StagePipeline, StageTimings, format_stats
+from features.realtime_source import LatestFrameGrabber, RealtimeFrameSource
+from features.zone_lookup import COUNTING_ZONE_NAME, ZoneLookup, anchor_points, zones_for_camera
+
+# Depolama arka ucunu (config.STORAGE_BACKEND) bir kez başlat
+storage = None
 try:
-    db = initialize_firebase()
-    if db:
-        print("Firebase istemcisi video_processor için başarıyla başlatıldı.")
+    storage = create_storage()
+    if storage:
+        print(f"Depolama arka ucu ({storage.name}) video_processor için başarıyla başlatıldı.")
     else:
-        print("UYARI: Firebase istemcisi başlatılamadı. Doluluk oranları Firestore'a yazılmayacak.")
+        print("UYARI: Depolama arka ucu başlatılamadı. Doluluk oranları yazılmayacak.")
 except Exception as e:
-    print(f"HATA: video_processor içinde Firebase başlatılırken hata oluştu: {e}")
-    db = None
+    print(f"HATA: video_processor içinde depolama başlatılırken hata oluştu: {e}")
+    storage = None
 
-# Firestore koleksiyon adları
+# Koleksiyon adları
 WAGON_CURRENT_FULLNESS_COLLECTION = "wagon_fullness_current" # Vagonların anlık doluluk durumları
 WAGON_HISTORICAL_LOGS_COLLECTION = "wagon_fullness_history"   # Vagonların geçmiş doluluk kayıtları
 
@@ -36,242 +50,576 @@ model_name = config.MODEL_NAME
 person_id = config.PERSON_ID
 wagon_capacity = config.WAGON_CAPACITY
 
-# Sayım bölgesi
-counting_zone_polygon = np.array(config.COUNTING_ZONE_POLYGON, np.int32)
-
-
-def is_valid_detection(box, frame_width, frame_height):
-    """Detection'ın geçerli boyutta olup olmadığını kontrol eder"""
-    if len(box) < 4:
-        return False
-
-    x1, y1, x2, y2 = box[:4]
-    width = x2 - x1
-    height = y2 - y1
-
-    # Minimum boyut kontrolü
-    if width < config.MIN_DETECTION_WIDTH or height < config.MIN_DETECTION_HEIGHT:
-        return False
-
-    # Maksimum boyut kontrolü
-    max_width = frame_width * config.MAX_DETECTION_WIDTH_RATIO
-    max_height = frame_height * config.MAX_DETECTION_HEIGHT_RATIO
+# Çizim/kayıt modları
+RENDER_MODE_FULL = "full"
+RENDER_MODE_HEADLESS = "headless"
+RENDER_MODE_PREVIEW = "preview"
+RENDER_MODES = (RENDER_MODE_FULL, RENDER_MODE_HEADLESS, RENDER_MODE_PREVIEW)
+
+# Kutu durumlarının çizim stili (durum kodları features/counting.py'de)
+STATUS_STYLES = {
+    STATUS_OUTSIDE: (config.OUTSIDE_COLOR, "OUTSIDE"),
+    STATUS_TRACKED: (config.TRACKED_COLOR, "TRACKED"),
+    STATUS_IN_ZONE: (config.IN_ZONE_COLOR, "IN_ZONE")
+}
+
+
+def iter_frame_batches(cap, batch_size, width, height, timings=None, ring=None):
+    """
+    Videodan okunan kareleri yeniden boyutlandırıp batch_size'lık gruplar halinde döndürür.
+    timings verilirse kare başına okuma (decode) ve boyutlandırma (resize) süreleri kaydedilir.
+    Okuma her karede aynı tampona yapılır; ring (FrameRing) verilirse boyutlandırılmış kareler
+    yeni dizi ayrılmadan halkanın yuvalarına yazılır.
+    """
+    timings = timings or StageTimings()
+    batch = []
+    decoded = None
+    while True:
+        with timings.timed("decode"):
+            ret, decoded = cap.read(decoded)
+        if not ret:
+            break
+        with timings.timed("resize"):
+            if ring is None:
+                batch.append(cv2.resize(decoded, (width, height)))
+            else:
+                batch.append(cv2.resize(decoded, (width, height), dst=ring.next()))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def create_detector(inference_lane=None, imgsz=None):
+    """
+    Çıkarım sunucusu kanalı verildiyse sunucuyu, verilmediyse süreç içi modeli
+    (config.INFERENCE_BACKEND: PyTorch, ONNX Runtime veya OpenVINO) imgsz giriş boyutuyla kullanır.
+    Sunucu tüm kameralar için tek boyutla çalıştığından imgsz sunucuda uygulanmaz.
+    """
+    if inference_lane is not None:
+        return ServerDetector(inference_lane)
+    return load_detector(weights=model_name, imgsz=imgsz)
+
+
+def annotate_frame(frame, frame_result, zone_polygons):
+    """Bölgeleri, kutuları ve sayım bilgisini kareye çizer"""
+    cv2.polylines(frame, zone_polygons, isClosed=True,
+                  color=config.ZONE_POLYGON_COLOR, thickness=config.POLYGON_THICKNESS)
+
+    for box, anchor, status in zip(frame_result["boxes"], frame_result["anchors"], frame_result["statuses"]):
+        if status == STATUS_IGNORED:
+            continue
+        x1, y1, x2, y2 = (int(v) for v in box[:4])
+        color, status_text = STATUS_STYLES[status]
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, config.BBOX_THICKNESS)
+        text = f"ID:{int(box[4])} {status_text} ({float(box[5]):.2f})"
+        text_size = cv2.getTextSize(text, config.FONT_HERSHEY_SIMPLEX,
+                                    config.FONT_SCALE_SMALL, config.FONT_THICKNESS_SMALL)[0]
+        cv2.rectangle(frame, (x1, y1 - 25), (x1 + text_size[0], y1), color, -1)
+        cv2.putText(frame, text, (x1, y1 - 5), config.FONT_HERSHEY_SIMPLEX,
+                    config.FONT_SCALE_SMALL, (0, 0, 0), config.FONT_THICKNESS_SMALL)
+        cv2.circle(frame, (int(anchor[0]), int(anchor[1])), 5, color, -1)
+
+    current_count = frame_result["tracked_count"]
+    count_text = f"Wagon Count: {current_count}/{wagon_capacity}"
+    cv2.putText(frame, count_text, config.COUNT_TEXT_POSITION,
+                config.FONT_HERSHEY_SIMPLEX, config.FONT_SCALE_LARGE,
+                config.IN_ZONE_COLOR, config.FONT_THICKNESS_LARGE)
+
+    debug_text = (f"In Zone: {frame_result['in_zone_count']} | Tracked: {current_count} | "
+                  f"Detections: {len(frame_result['boxes'])}")
+    cv2.putText(frame, debug_text, config.DEBUG_TEXT_POSITION,
+                config.FONT_HERSHEY_SIMPLEX, config.FONT_SCALE_MEDIUM,
+                (255, 255, 255), config.FONT_THICKNESS_MEDIUM)
+
+    percent_Full = frame_result["fullness"]
+    fullness_text = f"Fullness: {percent_Full:.1f}%"
+    fullness_color = (0, 255, 0) if percent_Full < 80 else (0, 165, 255) if percent_Full < 95 else (0, 0, 255)
+    cv2.putText(frame, fullness_text, (50, 150),
+                config.FONT_HERSHEY_SIMPLEX, config.FONT_SCALE_MEDIUM,
+                fullness_color, config.FONT_THICKNESS_MEDIUM)
+
+
+def publish_fullness(wagon_document_id, percent_Full, frame_count, log_state, current_writer,
+                     history_writer, local_history=None):
+    """
+    Anlık doluluğu ve (log aralığı dolduysa) tarihsel kaydı depolama arka ucuna yazar.
+    Anlık doluluk current_writer üzerinden yazılır; değer değişmedikçe yazma yapılmaz.
+    local_history verildiyse her kare yerel sütunsal geçmişe eklenir; history_writer kuyruğuna
+    sadece log aralığında bir kayıt (seyreltilmiş kopya) bırakılır ve arka planda batch halinde yazılır.
+    """
+    current_time = time.time()
+    if local_history is not None:
+        local_history.append(current_time, percent_Full, frame_count)
+
+    if not storage:
+        return
 
-    if width > max_width or height > max_height:
-        return False
+    # Firestore'a anlık doluluk oranını yazma (canlı Streamlit görünümü için)
+    try:
+        fullness_value = float(f"{percent_Full:.2f}")
+        data_to_save_current = {
+            "fullness_percentage": fullness_value,
+            "run_id": log_state["run_id"],
+            "last_updated": SERVER_TIMESTAMP
+        }
+        current_writer.publish(wagon_document_id, data_to_save_current, fullness_value)
+    except Exception as e:
+        print(f"UYARI: Firestore'a anlık doluluk oranı yazılırken hata oluştu: {e}")
+
+    # Firestore'a tarihsel log kaydını yazma (oynatma özelliği için)
+    if history_writer and current_time - log_state["last_log_time"] >= log_state["interval_seconds"]:
+        try:
+            data_to_save_history = {
+                "wagon_id": wagon_document_id, # Hangi vagona ait olduğunu belirt
+                "run_id": log_state["run_id"],  # Hangi çalıştırmaya ait olduğunu belirt (saklama/oynatma için)
+                "fullness_percentage": float(f"{percent_Full:.2f}"),
+                # Kayıtlar batch halinde commit edildiği için SERVER_TIMESTAMP aynı batch'teki
+                # tüm kayıtlara aynı zamanı verir; oynatma sırası için ölçüm anı kullanılır
+                "timestamp": datetime.fromtimestamp(current_time, timezone.utc),
+                "frame_count": frame_count,
+                # Devam ederken son kontrol noktasından sonra yazılmış kayıtları bulmak için
+                "checkpoint_epoch": log_state.get("checkpoint_epoch", 0)
+            }
+            history_writer.submit(data_to_save_history)
+            log_state["last_log_time"] = current_time
+        except Exception as e:
+            print(f"UYARI: Firestore'a tarihsel log yazılırken hata oluştu: {e}")
+
+
+def create_video_output(output_path, fps, width, height, render_mode, preview_scale=None,
+                        preview_fraction=None):
+    """
+    Çizim moduna göre VideoWriter'ı hazırlar.
+    (writer, kaç karede bir yazılacağı, çıktı boyutu) döndürür; headless modda writer None'dır.
+    """
+    if render_mode == RENDER_MODE_HEADLESS:
+        return None, 1, (width, height)
+
+    stride = 1
+    output_size = (width, height)
+    if render_mode == RENDER_MODE_PREVIEW:
+        scale = config.PREVIEW_SCALE if preview_scale is None else preview_scale
+        fraction = config.PREVIEW_FRAME_FRACTION if preview_fraction is None else preview_fraction
+        stride = max(1, round(1 / max(fraction, 1e-6)))
+        output_size = (max(2, int(width * scale)), max(2, int(height * scale)))
+        # Atlanan kareler yüzünden önizleme videosu hızlanmasın diye fps de orantılı düşürülür
+        fps = max(1, round(fps / stride))
 
+    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+    return cv2.VideoWriter(output_path, fourcc, fps, output_size), stride, output_size
+
+
+def seek_to_frame(cap, frame_index):
+    """
+    Videoyu frame_index'inci kareye konumlandırır. Konteyner doğrudan konumlandırmayı
+    desteklemiyorsa kareler çözülmeden (grab) atlanır.
+    """
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_index:
+        return True
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(frame_index):
+        if not cap.grab():
+            return False
     return True
 
 
-def process_video(video_file):
-    people_in_zone = set()
-    people_tracked = set()
+def discard_uncheckpointed_history(run_id, wagon_document_id, checkpoint_epoch=None):
+    """
+    Kaldığı yerden devam ederken tekrar işlenecek karelerin önceki denemede yazılmış tarihsel
+    kayıtlarını siler: kontrol noktası varsa sadece ondan sonra yazılanları (aynı checkpoint_epoch),
+    yoksa vagonun bu çalıştırmadaki tüm kayıtlarını.
+    """
+    filters = {"run_id": run_id, "wagon_id": wagon_document_id}
+    if checkpoint_epoch is not None:
+        filters["checkpoint_epoch"] = checkpoint_epoch
+    try:
+        deleted = storage.delete_documents_where(WAGON_HISTORICAL_LOGS_COLLECTION, filters)
+        if deleted:
+            print(f"🧹 {wagon_document_id}: kontrol noktasından sonra yazılmış {deleted} tarihsel kayıt silindi")
+    except Exception as e:
+        print(f"UYARI: {wagon_document_id} için yarım kalan tarihsel kayıtlar silinemedi: {e}")
+
+
+def process_video(video_file, batch_size=None, inference_lane=None, progress_callback=None,
+                  pipelined=None, motion_gated=None, roi_cropped=None, render_mode=None,
+                  preview_scale=None, preview_fraction=None, run_id=None, imgsz=None, stage_timings=None,
+                  metrics=None, realtime=None, checkpointed=None, resume=False, cached=None):
+    """
+    Videoyu işler, sayım bölgesindeki kişileri sayar ve doluluk oranını Firestore'a yazar.
+    batch_size verilmezse config.INFERENCE_BATCH_SIZE kullanılır; kareler bu boyuttaki
+    gruplar halinde tek bir ileri geçişte modele verilir, takip ise kare kare uygulanır.
+    inference_lane verilirse model bu süreçte yüklenmez, tespit paylaşımlı çıkarım
+    sunucusunda yapılır.
+    progress_callback verilirse her batch sonunda (işlenen kare, toplam kare) ile çağrılır.
+    pipelined True ise (varsayılan config.PIPELINE_ENABLED) decode ve çizim/kayıt aşamaları
+    ayrı thread'lerde, sınırlı kuyruklarla çalışır.
+    motion_gated True ise (varsayılan config.MOTION_GATE_ENABLED) sahne durağanken çıkarım
+    atlanır ve son tespitler taşınır.
+    roi_cropped True ise (varsayılan config.ROI_CROP_ENABLED) model sadece bölgeleri çevreleyen
+    dikdörtgeni görür.
+    render_mode (varsayılan config.RENDER_MODE):
+      "full"     -> her kare çizilir ve tam çözünürlükte kaydedilir,
+      "headless" -> çizim ve VideoWriter tamamen kapalıdır, sadece sayım/doluluk üretilir,
+      "preview"  -> karelerin preview_fraction kadarı preview_scale çözünürlükte kaydedilir.
+    run_id, kayıtların ait olduğu çalıştırmadır: tarihsel kayıtlar bu alanı taşır ve yerel geçmiş
+    outputs/history/<run_id>/ dizinine yazılır; verilmezse yeni bir çalıştırma oluşturulur.
+    imgsz verilmezse kameranın profilindeki (config.CAMERA_PROFILE_PATH) çıkarım boyutu kullanılır;
+    çıkarım sunucusu kanalıyla imgsz yok sayılır, sunucu config.INFERENCE_IMGSZ ile çalışır.
+    stage_timings (StageTimings) verilirse aşama süreleri bu nesneye yazılır; benchmark'lar
+    örnek saklayan bir nesne vererek yüzdelikleri hesaplar.
+    metrics (features.metrics.WorkerMetrics) verilirse kare sayısı, çıkarım süresi, kare başına
+    tespit, veritabanı yazma süresi/hataları ve kuyruk derinlikleri bu nesneye kaydedilir.
+    realtime True ise (varsayılan config.REALTIME_MODE) kaynak kendi fps'inde okunur ve sadece en
+    yeni kare işlenir; işleme geride kalırsa bayat kareler düşürülür (batch boyutu 1'dir).
+    Yerel dosyalar config.REALTIME_PACE_FILES açıkken duvar saati hızında oynatılır.
+    Her kare için yakalamadan yayına (capture_to_publish) gecikme ölçülür.
+    checkpointed True ise (varsayılan config.CHECKPOINT_ENABLED, gerçek zamanlı modda kapalı)
+    config.CHECKPOINT_INTERVAL_SECONDS aralığıyla kontrol noktası yazılır. resume True ise video bu
+    çalıştırmadaki son kontrol noktasından devam eder; video zaten tamamlanmışsa kayıtlı özet döndürülür.
+    cached True ise (varsayılan config.DETECTION_CACHE_ENABLED, gerçek zamanlı modda kapalı) kare başına
+    ham takip kutuları tespit önbelleğine yazılır; recount.py sayımı buradan modelsiz tekrarlar.
+    """
+    if batch_size is None:
+        batch_size = config.INFERENCE_BATCH_SIZE
+    batch_size = max(1, int(batch_size))
+    if pipelined is None:
+        pipelined = config.PIPELINE_ENABLED
+    if motion_gated is None:
+        motion_gated = config.MOTION_GATE_ENABLED
+    if roi_cropped is None:
+        roi_cropped = config.ROI_CROP_ENABLED
+    if realtime is None:
+        realtime = config.REALTIME_MODE
+    if checkpointed is None:
+        checkpointed = config.CHECKPOINT_ENABLED
+    if cached is None:
+        cached = config.DETECTION_CACHE_ENABLED
+    if realtime:
+        # Tek yuvalı kaynakta batch beklemek gecikmeyi artırır
+        batch_size = 1
+    render_mode = render_mode or config.RENDER_MODE
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Geçersiz render_mode: {render_mode} (seçenekler: {', '.join(RENDER_MODES)})")
+
+    run_id = run_id or new_run_id()
 
     video_name = os.path.basename(video_file)
     wagon_document_id = os.path.splitext(video_name)[0]
-
-    output_video_name = "ov_" + video_name
+    # Sunucu kamera profilini (ve verilen imgsz'yi) uygulamaz; anahtarlar fiili boyutla hesaplanır
+    inference_server = inference_lane is not None
+    imgsz = None if inference_server else imgsz
+    imgsz = imgsz or inference_imgsz(wagon_document_id, inference_server)
+
+    # Canlı kaynakta geri sarılamayacağı için gerçek zamanlı modda kontrol noktası alınmaz
+    checkpoint = None
+    resume_state = None
+    if checkpointed and not realtime:
+        checkpoint = video_checkpoint(run_id, video_file, imgsz, motion_gated, roi_cropped, inference_server)
+        if resume:
+            resume_state = checkpoint.load()
+            if resume_state and resume_state.get("completed"):
+                print(f"⏭️ {video_name} bu çalıştırmada zaten tamamlanmış, atlanıyor.")
+                return dict(resume_state["summary"], skipped=True)
+    resuming = checkpoint is not None and resume
+    start_frame = resume_state["frame_index"] if resume_state else 0
+    checkpoint_epoch = resume_state["epoch"] if resume_state else 0
+    people_tracked = resume_state["people_tracked"] if resume_state else TrackedIdSet()
+
+    # Devam edilen videonun çıktısı ayrı dosyaya yazılır (VideoWriter mevcut dosyaya ekleyemez)
+    output_stem, output_extension = os.path.splitext("ov_" + video_name)
+    output_video_name = (f"{output_stem}.from{start_frame:06d}{output_extension}" if start_frame
+                         else output_stem + output_extension)
     output_path = os.path.join("outputs", "videos", output_video_name)
 
     cap = cv2.VideoCapture(video_file)
     if not cap.isOpened():
         print(f"Error: Could not open video file {video_file}")
         return
+    if start_frame:
+        if not seek_to_frame(cap, start_frame):
+            print(f"Error: {video_name} için {start_frame}. kareye gidilemedi")
+            cap.release()
+            return
+        print(f"↩️ {video_name}: kontrol noktasından devam ediliyor ({start_frame}. kare, "
+              f"{len(people_tracked)} kişi sayılmış)")
 
     fps = int(cap.get(cv2.CAP_PROP_FPS))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     width = config.VIDEO_WIDTH
     height = config.VIDEO_HEIGHT
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-    model = YOLO(model_name)
-
-    # BURADAN KALDIRILACAK: Bu blok kaldırılmalı, mantık main.py'ye taşındı
-    # if db:
-    #     try:
-    #         create_document(db, PROCESSING_STATUS_COLLECTION, {"completed": False, "last_update_time": firestore.SERVER_TIMESTAMP}, document_id=PROCESSING_COMPLETE_DOC_ID)
-    #         print(f"Firestore: Video işleme durumu '{wagon_document_id}' için başlatıldı.")
-    #     except Exception as e:
-    #         print(f"UYARI: Firestore'a işlem durumu yazılırken hata oluştu: {e}")
-
-    frame_count = 0
-    last_log_time = time.time()
-    log_interval_seconds = 1
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame_count += 1
-
-        frame = cv2.resize(frame, (width, height))
-        cv2.polylines(frame, [counting_zone_polygon], isClosed=True,
-                      color=config.ZONE_POLYGON_COLOR, thickness=config.POLYGON_THICKNESS)
-
-        result = model.track(
-            frame,
-            persist=config.YOLO_TRACK_PERSIST,
-            verbose=False,
-            conf=config.YOLO_CONF_THRESHOLD,
-            iou=config.YOLO_IOU_THRESHOLD,
-            max_det=config.YOLO_MAX_DETECTIONS,
-            tracker=config.YOLO_TRACKER,
-            classes=[person_id],
-            agnostic_nms=True
-        )[0]
-
-        bboxes = np.array([])
-
-        if result.boxes is not None and len(result.boxes) > 0:
-            bboxes_raw = np.array(result.boxes.data.tolist(), dtype="int")
-
-            valid_bboxes = []
-            for box in bboxes_raw:
-                if is_valid_detection(box, width, height):
-                    valid_bboxes.append(box)
-
-            if valid_bboxes:
-                bboxes = np.array(valid_bboxes, dtype="int")
-
-                def filter_duplicate_detections(boxes, iou_threshold=config.DETECTION_IOU_THRESHOLD):
-                    if len(boxes) == 0:
-                        return boxes
-
-                    sorted_boxes = sorted(boxes, key=lambda x: x[4] if len(x) > 4 else 1.0, reverse=True)
-                    filtered_boxes = []
-                    used_indices = set()
-
-                    for i, box1 in enumerate(sorted_boxes):
-                        if i in used_indices:
-                            continue
-                        filtered_boxes.append(box1)
-                        used_indices.add(i)
-
-                        for j, box2 in enumerate(sorted_boxes):
-                            if j <= i or j in used_indices:
-                                continue
-
-                            x1_1, y1_1, x2_1, y2_1 = box1[:4]
-                            x1_2, y1_2, x2_2, y2_2 = box2[:4]
-
-                            x1_inter = max(x1_1, x1_2)
-                            y1_inter = max(y1_1, y1_2)
-                            x2_inter = min(x2_1, x2_2)
-                            y2_inter = min(y2_1, y2_2)
-
-                            inter_area = 0
-                            if x2_inter > x1_inter and y2_inter > y1_inter:
-                                inter_area = (x2_inter - x1_inter) * (y2_inter - y1_inter)
-
-                            area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-                            area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
-                            union_area = area1 + area2 - inter_area
-
-                            if union_area > 0:
-                                iou = inter_area / union_area
-                                if iou > iou_threshold:
-                                    used_indices.add(j)
-                    return np.array(filtered_boxes, dtype="int") if filtered_boxes else np.array([])
-
-                bboxes = filter_duplicate_detections(bboxes)
-
-
-        detected_people_in_zone = set()
-
-        for box in bboxes:
-            if len(box) >= 6:
-                if len(box) == 7:
-                    x1, y1, x2, y2, track_id, score, class_id = box
-                elif len(box) == 6:
-                    x1, y1, x2, y2, score, class_id = box
-                    track_id = None
-                else:
-                    continue
-
-                if track_id is None:
-                    continue
-
-                track_id = int(track_id)
-
-                if class_id == person_id:
-                    person_anchor_point = (int((x1 + x2) / 2), int(y2))
-                    is_inside = cv2.pointPolygonTest(counting_zone_polygon, person_anchor_point, False) >= 0
-
-                    if is_inside:
-                        detected_people_in_zone.add(track_id)
-                        people_tracked.add(track_id)
-
-                    color = config.TRACKED_COLOR if track_id in people_tracked else config.OUTSIDE_COLOR
-                    status = "TRACKED" if track_id in people_tracked else "OUTSIDE"
-                    if is_inside:
-                        color = config.IN_ZONE_COLOR
-                        status = "IN_ZONE"
-
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, config.BBOX_THICKNESS)
-                    conf_text = f"{score:.2f}" if len(box) >= 5 else "N/A"
-                    text = f"ID:{track_id} {status} ({conf_text})"
-                    text_size = cv2.getTextSize(text, config.FONT_HERSHEY_SIMPLEX,
-                                                config.FONT_SCALE_SMALL, config.FONT_THICKNESS_SMALL)[0]
-                    cv2.rectangle(frame, (x1, y1 - 25), (x1 + text_size[0], y1), color, -1)
-                    cv2.putText(frame, text, (x1, y1 - 5), config.FONT_HERSHEY_SIMPLEX,
-                                config.FONT_SCALE_SMALL, (0, 0, 0), config.FONT_THICKNESS_SMALL)
-                    cv2.circle(frame, person_anchor_point, 5, color, -1)
-
-        people_in_zone = detected_people_in_zone
-        current_count = len(people_tracked)
-        count_text = f"Wagon Count: {current_count}/{wagon_capacity}"
-        cv2.putText(frame, count_text, config.COUNT_TEXT_POSITION,
-                    config.FONT_HERSHEY_SIMPLEX, config.FONT_SCALE_LARGE,
-                    config.IN_ZONE_COLOR, config.FONT_THICKNESS_LARGE)
-
-        debug_text = f"In Zone: {len(people_in_zone)} | Tracked: {len(people_tracked)} | Detections: {len(bboxes)}"
-        cv2.putText(frame, debug_text, config.DEBUG_TEXT_POSITION,
-                    config.FONT_HERSHEY_SIMPLEX, config.FONT_SCALE_MEDIUM,
-                    (255, 255, 255), config.FONT_THICKNESS_MEDIUM)
-
-        percent_Full = (current_count / wagon_capacity * 100)
-        percent_Full = max(0, min(100, percent_Full))
-
-        fullness_text = f"Fullness: {percent_Full:.1f}%"
-        fullness_color = (0, 255, 0) if percent_Full < 80 else (0, 165, 255) if percent_Full < 95 else (0, 0, 255)
-        cv2.putText(frame, fullness_text, (50, 150),
-                    config.FONT_HERSHEY_SIMPLEX, config.FONT_SCALE_MEDIUM,
-                    fullness_color, config.FONT_THICKNESS_MEDIUM)
-
-        # Firestore'a anlık doluluk oranını yazma (canlı Streamlit görünümü için)
-        if db:
-            try:
-                data_to_save_current = {
-                    "fullness_percentage": float(f"{percent_Full:.2f}"),
-                    "last_updated": firestore.SERVER_TIMESTAMP
-                }
-                create_document(db, WAGON_CURRENT_FULLNESS_COLLECTION, data_to_save_current, document_id=wagon_document_id)
-            except Exception as e:
-                print(f"UYARI: Firestore'a anlık doluluk oranı yazılırken hata oluştu: {e}")
-
-            # Firestore'a tarihsel log kaydını yazma (oynatma özelliği için)
-            current_time = time.time()
-            if current_time - last_log_time >= log_interval_seconds:
-                try:
-                    data_to_save_history = {
-                        "wagon_id": wagon_document_id, # Hangi vagona ait olduğunu belirt
-                        "fullness_percentage": float(f"{percent_Full:.2f}"),
-                        "timestamp": firestore.SERVER_TIMESTAMP,
-                        "frame_count": frame_count
+    out, render_stride, output_size = create_video_output(output_path, fps, width, height, render_mode,
+                                                          preview_scale, preview_fraction)
+
+    # Bölge maskesi kamera başına bir kez hazırlanır
+    zone_lookup = ZoneLookup(zones_for_camera(wagon_document_id), width, height)
+    zone_polygons = list(zone_lookup.polygons.values())
+
+    if imgsz and not inference_server:
+        print(f"📐 {video_name}: çıkarım boyutu {imgsz}")
+    detector = create_detector(inference_lane, imgsz)
+    if roi_cropped:
+        # Kırpma dikdörtgeni de kamera başına bir kez hesaplanır
+        roi = zone_roi(zone_polygons, width, height)
+        detector = RoiDetector(detector, roi)
+        print(f"✂️ {video_name}: çıkarım {roi} bölgesine kırpılıyor "
+              f"(karenin %{roi_pixel_ratio(roi, width, height) * 100:.0f}'i)")
+    batched_tracker = BatchedTracker(detector, FrameTracker())
+
+    # Gerçek zamanlı modda kareler düşürüldüğünden önbellek videonun tamamını temsil etmez
+    detection_cache = None
+    if cached and not realtime:
+        cache_dir = cache_directory(video_file, imgsz, motion_gated, roi_cropped, inference_server)
+        if is_complete(cache_dir):
+            print(f"💾 {video_name}: tespit önbelleği zaten var, yeniden yazılmayacak ({cache_dir})")
+        else:
+            detection_cache = DetectionCacheWriter(cache_dir, start_frame)
+    if resume_state and not batched_tracker.tracker.set_state(resume_state["tracker"]):
+        print(f"UYARI: {video_name} için tracker durumu geri yüklenemedi, takip yeni id'lerle sürecek.")
+
+    timings = stage_timings or StageTimings()
+
+    def render_and_write(item):
+        frame, frame_result = item
+        with timings.timed("draw"):
+            annotate_frame(frame, frame_result, zone_polygons)
+        with timings.timed("encode"):
+            if output_size != (width, height):
+                frame = cv2.resize(frame, output_size, interpolation=cv2.INTER_AREA)
+            out.write(frame)
+
+    motion_gate = None
+    if motion_gated:
+        motion_gate = MotionGate(zone_lookup.polygons[COUNTING_ZONE_NAME], width, height)
+
+    # Boyutlandırılmış kareler önceden ayrılmış halkaya yazılır; halka, bir yuva yeniden yazılmadan
+    # önce karesinin ön-okuma, işleme ve çizim kuyruklarından çıkmış olacağı kadar büyüktür.
+    # Ön-okuma kuyruğu batch sayısıyla değil kare sayısıyla (PIPELINE_PREFETCH_FRAMES) sınırlanır ki
+    # büyük batch'lerde halkanın belleği batch * kuyruk derinliği kadar büyümesin.
+    rendering = out is not None
+    ring_slots = (ring_slots_for(batch_size, config.PIPELINE_QUEUE_SIZE, prefetch=not realtime,
+                                 rendering=rendering, render_stride=render_stride)
+                  if pipelined else batch_size)
+    frame_ring = FrameRing(ring_slots, width, height)
+
+    grabber = None
+    if realtime:
+        grabber = LatestFrameGrabber(cap, paced=config.REALTIME_PACE_FILES and os.path.isfile(video_file),
+                                     timings=timings).start()
+        frame_source = RealtimeFrameSource(grabber, width, height, timings, ring=frame_ring)
+        print(f"📡 {video_name}: gerçek zamanlı mod ({1 / grabber.frame_interval:.1f} fps kaynak)")
+    else:
+        frame_source = iter_frame_batches(cap, batch_size, width, height, timings, ring=frame_ring)
+
+    # Kaynak aşaması ("frames") okuma + boyutlandırma + hareket kapısının batch başına toplamıdır.
+    # Gerçek zamanlı modda kaynak önden okunmaz; en yeni kare okuma thread'inde tutulur.
+    pipeline = StagePipeline(gate_batches(frame_source, motion_gate),
+                             render_and_write if rendering else None,
+                             queue_size=config.PIPELINE_QUEUE_SIZE, threaded=pipelined,
+                             source_stage="frames", timings=timings, prefetch=not realtime,
+                             source_queue_size=prefetch_batches_for(batch_size))
+
+    frame_count = start_frame
+    frame_result = None
+    log_state = {"last_log_time": time.time(), "interval_seconds": config.HISTORY_MIRROR_INTERVAL_SECONDS,
+                 "run_id": run_id, "checkpoint_epoch": checkpoint_epoch}
+    write_observer = metrics.observe_db_write if metrics else None
+    current_writer = CoalescingWriter(storage, WAGON_CURRENT_FULLNESS_COLLECTION,
+                                      min_interval_seconds=config.CURRENT_FULLNESS_MIN_INTERVAL_SECONDS,
+                                      heartbeat_seconds=config.CURRENT_FULLNESS_HEARTBEAT_SECONDS,
+                                      write_observer=write_observer)
+    history_writer = None
+    if storage and config.HISTORY_MIRROR_ENABLED:
+        if resuming:
+            discard_uncheckpointed_history(run_id, wagon_document_id,
+                                           checkpoint_epoch if resume_state else None)
+        history_writer = BackgroundBatchWriter(storage, WAGON_HISTORICAL_LOGS_COLLECTION,
+                                               max_batch_size=config.HISTORY_WRITER_BATCH_SIZE,
+                                               flush_interval_seconds=config.HISTORY_WRITER_FLUSH_SECONDS,
+                                               queue_size=config.HISTORY_WRITER_QUEUE_SIZE,
+                                               overflow_policy=config.HISTORY_WRITER_OVERFLOW_POLICY,
+                                               write_observer=write_observer)
+    local_history = None
+    if config.LOCAL_HISTORY_ENABLED:
+        # Devam ederken kontrol noktasından sonra eklenmiş satırlar kesilir (kontrol noktası yoksa hepsi)
+        resume_rows = (resume_state["history_rows"] if resume_state else 0) if resuming else None
+        local_history = HistoryWriter(run_directory(run_id), wagon_document_id, resume_rows=resume_rows)
+
+    def save_checkpoint():
+        """Yazıcıları boşaltır ve o ana kadarki durumu yeni bir kontrol noktası olarak kaydeder"""
+        if history_writer:
+            history_writer.flush()
+        if local_history:
+            local_history.flush()
+        if detection_cache:
+            # Devam eden deneme önbelleği kontrol noktasındaki kareye kısaltır
+            detection_cache.flush()
+        epoch = log_state["checkpoint_epoch"] + 1
+        try:
+            checkpoint.save({
+                "completed": False,
+                "frame_index": frame_count,
+                "people_tracked": people_tracked,
+                "tracker": batched_tracker.tracker.get_state(),
+                "history_rows": local_history.rows_written if local_history else 0,
+                "epoch": epoch
+            })
+        except Exception as e:
+            print(f"UYARI: {video_name} kontrol noktası yazılamadı: {e}")
+            return
+        # Bundan sonraki tarihsel kayıtlar yeni kontrol noktasına aittir
+        log_state["checkpoint_epoch"] = epoch
+
+    if metrics:
+        for queue_name in pipeline.queues:
+            metrics.watch_queue(queue_name, lambda name=queue_name: pipeline.depths().get(name, 0))
+        if history_writer:
+            metrics.watch_queue("history_writer", history_writer.depth)
+
+    start_time = time.time()
+    last_checkpoint_time = time.monotonic()
+
+    try:
+        for frames, infer_flags in pipeline:
+            if all(infer_flags):
+                infer_frames = frames  # Hareket kapısı yoksa ya da hiçbir kare atlanmadıysa kopya liste yok
+            else:
+                infer_frames = [frame for frame, should_infer in zip(frames, infer_flags) if should_infer]
+            inference_start = time.perf_counter()
+            with pipeline.timed("inference", len(infer_frames)):
+                tracks_batch = iter(batched_tracker.track(infer_frames) if infer_frames else [])
+            if metrics and infer_frames:
+                metrics.observe_inference(time.perf_counter() - inference_start)
+
+            for index_in_batch, (frame, should_infer) in enumerate(zip(frames, infer_flags)):
+                frame_count += 1
+
+                if should_infer or frame_result is None:
+                    tracks = next(tracks_batch)
+                    if detection_cache:
+                        with pipeline.timed("cache"):
+                            detection_cache.append(tracks)
+                    with pipeline.timed("filter"):
+                        # Boyut filtresi + çift tespit bastırma (vektörize, float skorlarla)
+                        bboxes = filter_detections(tracks, width, height)
+                    if metrics:
+                        metrics.observe_detections(len(bboxes))
+
+                    with pipeline.timed("zone"):
+                        # Tüm çapa noktaları tek seferde bölge maskesinde sınıflandırılır
+                        anchors = anchor_points(bboxes)
+                        in_counting_zone = zone_lookup.contains(COUNTING_ZONE_NAME, anchors)
+                        people_in_zone, statuses = count_people(bboxes, in_counting_zone, people_tracked)
+
+                    frame_result = {
+                        "boxes": bboxes,
+                        "anchors": anchors,
+                        "statuses": statuses,
+                        "in_zone_count": people_in_zone,
+                        "tracked_count": len(people_tracked),
+                        "fullness": fullness_percentage(len(people_tracked))
                     }
-                    create_document(db, WAGON_HISTORICAL_LOGS_COLLECTION, data_to_save_history)
-                    last_log_time = current_time
-                except Exception as e:
-                    print(f"UYARI: Firestore'a tarihsel log yazılırken hata oluştu: {e}")
-
-        out.write(frame)
-
-    cap.release()
-    out.release()
-    print(f"✅ Video kaydedildi: {output_path}")
+                elif detection_cache:
+                    detection_cache.append_skipped()
+                # Atlanan karelerde son tespitler ve sayım aynen taşınır
+
+                with pipeline.timed("db_write"):
+                    publish_fullness(wagon_document_id, frame_result["fullness"], frame_count, log_state,
+                                     current_writer, history_writer, local_history)
+
+                if grabber:
+                    latency = time.monotonic() - frame_source.batch_capture_times[index_in_batch]
+                    timings.stage("capture_to_publish").record(latency)
+                    if metrics:
+                        metrics.observe_capture_latency(latency, grabber.stats["dropped"])
+
+                if out is not None and (frame_count - 1) % render_stride == 0:
+                    pipeline.submit((frame, frame_result))
+
+            if metrics:
+                metrics.set_progress(frame_count, total_frames)
+            if progress_callback:
+                progress_callback(frame_count, total_frames)
+
+            if checkpoint and time.monotonic() - last_checkpoint_time >= config.CHECKPOINT_INTERVAL_SECONDS:
+                with pipeline.timed("checkpoint"):
+                    save_checkpoint()
+                last_checkpoint_time = time.monotonic()
+
+        pipeline.close()
+        if storage:
+            # Hız limiti yüzünden bekleyen son doluluk değeri kaybolmasın
+            current_writer.flush()
+        if detection_cache:
+            detection_cache.complete({
+                "video": video_name,
+                "fps": fps,
+                "people_tracked": len(people_tracked),
+                "settings": detection_settings(wagon_document_id, imgsz, motion_gated, roi_cropped)
+            })
+    except BaseException:
+        pipeline.abort()
+        raise
+    finally:
+        if grabber:
+            grabber.stop()
+        cap.release()
+        if out is not None:
+            out.release()
+        if history_writer:
+            # İşçi kapanırken kuyrukta kalan tarihsel kayıtlar son bir batch ile yazılır
+            history_writer.close()
+        if local_history:
+            local_history.close()
+        if detection_cache:
+            detection_cache.close()
+
+    if out is not None:
+        print(f"✅ Video kaydedildi: {output_path}")
     print(f"📊 Toplam tespit edilen kişi (işlem sonunda): {len(people_tracked)}")
 
+    elapsed = time.time() - start_time
+    processing_fps = (frame_count - start_frame) / elapsed if elapsed > 0 else 0.0
+    pipeline_stats = pipeline.stats()
+    print(f"⏱️ {video_name}: {frame_count} kare, {elapsed:.1f} sn, {processing_fps:.1f} fps (batch={batch_size})")
+    print(f"🔬 {video_name} aşamalar: {format_stats(pipeline_stats)}")
+
+    summary = {
+        "video": video_name,
+        "frames": frame_count,
+        "people_tracked": len(people_tracked),
+        "elapsed_seconds": elapsed,
+        "fps": processing_fps,
+        "pipeline": pipeline_stats,
+        "current_fullness_writes": dict(current_writer.stats),
+        "history_writes": dict(history_writer.stats) if history_writer else {},
+        "local_history_rows": local_history.rows_written if local_history else 0,
+        "resumed_from_frame": start_frame
+    }
+    if storage:
+        print(f"📝 {video_name}: anlık doluluk {current_writer.stats['published']} kez yazıldı, "
+              f"{current_writer.suppressed_count()} yazma bastırıldı")
+    if history_writer:
+        print(f"📝 {video_name}: {history_writer.stats['written']} tarihsel kayıt "
+              f"{history_writer.stats['batches']} batch ile yazıldı, {history_writer.stats['dropped']} kayıt düşürüldü")
+    if local_history:
+        print(f"💾 {video_name}: {local_history.rows_written} kayıt yerel geçmişe eklendi (vagon #{local_history.wagon_index})")
+    if grabber:
+        latency = timings.stage("capture_to_publish").as_dict()
+        summary["realtime"] = dict(grabber.stats, drop_ratio=grabber.drop_ratio(),
+                                   avg_latency_ms=latency["avg_ms"], max_latency_ms=latency["max_ms"])
+        print(f"📡 {video_name}: {grabber.stats['captured']} kare yakalandı, {grabber.stats['dropped']} bayat kare "
+              f"düşürüldü (%{grabber.drop_ratio() * 100:.1f}), yakalama→yayın gecikmesi ort. "
+              f"{latency['avg_ms']:.0f} ms, en çok {latency['max_ms']:.0f} ms")
+    if motion_gate:
+        summary.update(motion_gate.stats())
+        print(f"🎞️ {video_name}: karelerin %{summary['skip_ratio'] * 100:.1f}'i hareket olmadığı için atlandı")
+    if checkpoint:
+        checkpoint.mark_completed(summary)
+    return summary
+
 
 # Ana program (Sadece doğrudan video_processor.py çalıştırıldığında)
 # Buradaki global status yönetimi KALDIRILACAK, main.py'ye taşınacak.
@@ -0,0 +1,216 @@
+# features/worker_pool.py
+# Videoları sınırlı sayıda eşzamanlı süreçle işleyen zamanlayıcı.
+# Bekleyen videolar kuyrukta tutulur, her video için ilerleme ve süre raporlanır,
+# çöken işçiler sessizce yutulmaz; özet tabloda başarısız olarak gösterilir.
+import os
+import queue
+import time
+import traceback
+from collections import deque
+from multiprocessing import Process, Queue
+
+import config
+from features.metrics import WorkerMetrics
+
+
+def physical_core_count():
+    """Fiziksel çekirdek sayısını döndürür; psutil yoksa mantıksal çekirdek sayısına düşer"""
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+        if count:
+            return count
+    except ImportError:
+        pass
+    return os.cpu_count() or 1
+
+
+def default_max_workers(threads_per_worker=None):
+    """Varsayılan eşzamanlılık: fiziksel çekirdek sayısı / işçi başına thread sayısı"""
+    threads_per_worker = threads_per_worker or config.TORCH_THREADS_PER_WORKER
+    return max(1, physical_core_count() // max(1, threads_per_worker))
+
+
+def _limit_worker_threads(threads_per_worker):
+    """İşçi sürecin PyTorch ve OpenCV thread havuzlarını sınırlar"""
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+    try:
+        import cv2
+        cv2.setNumThreads(threads_per_worker)
+    except ImportError:
+        pass
+
+
+def _camera_id(video_file):
+    return os.path.splitext(os.path.basename(video_file))[0]
+
+
+def _run_worker(target, video_file, kwargs, event_queue, threads_per_worker, collect_metrics=False):
+    """
+    İşçi süreç gövdesi: hedef fonksiyonu çalıştırır, ilerlemeyi ve sonucu kuyruğa yazar.
+    collect_metrics True ise hedefe bir WorkerMetrics verilir ve anlık görüntüsü
+    config.METRICS_REPORT_INTERVAL_SECONDS aralığıyla kuyruğa yazılır.
+    """
+    _limit_worker_threads(threads_per_worker)
+
+    last_report = [0.0, 0.0]  # ilerleme, metrik
+    metrics = None
+    if collect_metrics:
+        metrics = WorkerMetrics(_camera_id(video_file))
+        kwargs = dict(kwargs, metrics=metrics)
+
+    def report_progress(frame_count, total_frames):
+        now = time.time()
+        if now - last_report[0] >= config.PROGRESS_REPORT_INTERVAL_SECONDS:
+            last_report[0] = now
+            event_queue.put(("progress", video_file, (frame_count, total_frames)))
+        if metrics and now - last_report[1] >= config.METRICS_REPORT_INTERVAL_SECONDS:
+            last_report[1] = now
+            event_queue.put(("metrics", video_file, metrics.snapshot()))
+
+    try:
+        summary = target(video_file, progress_callback=report_progress, **kwargs)
+    except Exception:
+        if metrics:
+            event_queue.put(("metrics", video_file, metrics.snapshot()))
+        event_queue.put(("failed", video_file, traceback.format_exc()))
+        raise SystemExit(1)
+
+    if metrics:
+        event_queue.put(("metrics", video_file, metrics.snapshot()))
+
+    if summary is None:
+        event_queue.put(("failed", video_file, "İşlem sonuç döndürmedi (video açılamamış olabilir)."))
+        raise SystemExit(1)
+    event_queue.put(("done", video_file, summary))
+
+
+class VideoWorkerPool:
+    """
+    En fazla max_workers videoyu aynı anda işleyen süreç havuzu.
+    Çıkarım sunucusu verilirse her çalışan işçiye boşta olan bir kanal (lane) atanır.
+    metrics_aggregator verilirse işçilerin metrik anlık görüntüleri ve durumları ona iletilir.
+    """
+
+    def __init__(self, target, max_workers=None, threads_per_worker=None, inference_server=None,
+                 worker_kwargs=None, metrics_aggregator=None):
+        self.target = target
+        self.threads_per_worker = threads_per_worker or config.TORCH_THREADS_PER_WORKER
+        self.max_workers = max_workers or default_max_workers(self.threads_per_worker)
+        self.inference_server = inference_server
+        self.worker_kwargs = worker_kwargs or {}
+        self.metrics_aggregator = metrics_aggregator
+        self.event_queue = Queue()
+        self.free_lanes = deque(range(len(inference_server.lanes))) if inference_server else deque()
+
+    def _start_worker(self, video_file):
+        kwargs = dict(self.worker_kwargs)
+        lane_index = None
+        if self.inference_server and self.free_lanes:
+            lane_index = self.free_lanes.popleft()
+            kwargs["inference_lane"] = self.inference_server.lane(lane_index)
+        elif self.inference_server:
+            print(f"UYARI: {os.path.basename(video_file)} için boş çıkarım kanalı yok, model süreç içinde yüklenecek.")
+
+        p = Process(target=_run_worker,
+                    args=(self.target, video_file, kwargs, self.event_queue, self.threads_per_worker,
+                          self.metrics_aggregator is not None))
+        p.start()
+        if self.metrics_aggregator:
+            self.metrics_aggregator.set_state(_camera_id(video_file), "running")
+        return {"process": p, "lane": lane_index, "start_time": time.time()}
+
+    def _handle_event(self, event, results):
+        kind, video_file, payload = event
+        name = os.path.basename(video_file)
+        if kind == "progress":
+            frame_count, total_frames = payload
+            percent = f" (%{frame_count / total_frames * 100:.0f})" if total_frames > 0 else ""
+            print(f"⏳ {name}: {frame_count}/{total_frames} kare{percent}")
+        elif kind == "metrics":
+            if self.metrics_aggregator:
+                self.metrics_aggregator.update(_camera_id(video_file), payload)
+        elif kind == "done":
+            results[video_file]["summary"] = payload
+        elif kind == "failed":
+            results[video_file]["error"] = payload
+            print(f"❌ {name} işlenirken hata oluştu:\n{payload}")
+
+    def _drain_events(self, results, timeout):
+        try:
+            self._handle_event(self.event_queue.get(timeout=timeout), results)
+            while True:
+                self._handle_event(self.event_queue.get_nowait(), results)
+        except queue.Empty:
+            pass
+
+    def _finish_worker(self, video_file, worker, results):
+        p = worker["process"]
+        p.join()
+        # Süreç çıktıktan sonra kuyruğa yazdığı son olayları topla
+        self._drain_events(results, timeout=0.1)
+
+        result = results[video_file]
+        result["wall_time"] = time.time() - worker["start_time"]
+        result["exitcode"] = p.exitcode
+        result["ok"] = p.exitcode == 0 and "summary" in result and "error" not in result
+        if not result["ok"] and "error" not in result:
+            result["error"] = f"İşçi süreç beklenmedik şekilde sonlandı (exitcode={p.exitcode})."
+
+        if worker["lane"] is not None:
+            if result["ok"]:
+                self.free_lanes.append(worker["lane"])
+            else:
+                # Çöken işçinin kanalında yarım kalmış yanıtlar olabilir, kanal tekrar kullanılmaz
+                print(f"UYARI: Çıkarım kanalı {worker['lane']} başarısız işçi nedeniyle devre dışı bırakıldı.")
+
+        if self.metrics_aggregator:
+            self.metrics_aggregator.set_state(_camera_id(video_file), "done" if result["ok"] else "failed")
+
+        status = "✅" if result["ok"] else "❌"
+        print(f"{status} {os.path.basename(video_file)} bitti: {result['wall_time']:.1f} sn")
+
+    def run(self, video_files):
+        """Tüm videoları işler ve video başına sonuç sözlüğü döndürür"""
+        pending = deque(video_files)
+        running = {}
+        results = {video_file: {} for video_file in video_files}
+
+        print(f"🧵 {len(video_files)} video en fazla {self.max_workers} eşzamanlı süreçle işlenecek "
+              f"(süreç başına {self.threads_per_worker} thread).")
+
+        while pending or running:
+            while pending and len(running) < self.max_workers:
+                video_file = pending.popleft()
+                running[video_file] = self._start_worker(video_file)
+                print(f"▶️ {os.path.basename(video_file)} başlatıldı ({len(pending)} video kuyrukta)")
+
+            self._drain_events(results, timeout=0.5)
+
+            for video_file, worker in list(running.items()):
+                if not worker["process"].is_alive():
+                    self._finish_worker(video_file, worker, results)
+                    del running[video_file]
+
+        return results
+
+
+def print_summary(results):
+    """Video başına durum, süre ve hız içeren özet tabloyu basar; başarısız video sayısını döndürür"""
+    print("\n📋 İşlem özeti")
+    print(f"{'video':<24}{'durum':>8}{'süre (sn)':>12}{'kare':>8}{'fps':>8}{'kişi':>6}")
+    failed = 0
+    for video_file, result in results.items():
+        summary = result.get("summary") or {}
+        ok = result.get("ok", False)
+        failed += 0 if ok else 1
+        print(f"{os.path.basename(video_file):<24}{'OK' if ok else 'HATA':>8}"
+              f"{result.get('wall_time', 0.0):>12.1f}{summary.get('frames', 0):>8}"
+              f"{summary.get('fps', 0.0):>8.1f}{summary.get('people_tracked', 0):>6}")
+    if failed:
+        print(f"❌ {failed} video başarısız oldu.")
+    return failed
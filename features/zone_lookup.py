@@ -0,0 +1,72 @@
+# features/zone_lookup.py
+# Bölge (polygon) testlerini önceden rasterize edilmiş bir maske üzerinden yapar.
+# Her bölge maskede bir bit'e karşılık gelir; bir karedeki tüm çapa noktaları
+# tek bir NumPy indeksleme işlemiyle sınıflandırılır.
+import cv2
+import numpy as np
+
+import config
+
+COUNTING_ZONE_NAME = "counting"
+
+
+def zones_for_camera(camera_id):
+    """
+    Kameraya ait adlandırılmış bölgeleri döndürür.
+    config.CAMERA_ZONES'ta tanım yoksa sadece COUNTING_ZONE_POLYGON kullanılır;
+    tanım varsa ama sayım bölgesi içermiyorsa sayım bölgesi eklenir.
+    """
+    zones = dict(config.CAMERA_ZONES.get(camera_id, {}))
+    zones.setdefault(COUNTING_ZONE_NAME, config.COUNTING_ZONE_POLYGON)
+    return zones
+
+
+def anchor_points(boxes):
+    """Kutuların ayak çapa noktalarını (alt kenarın ortası) (N, 2) int dizi olarak döndürür"""
+    if len(boxes) == 0:
+        return np.empty((0, 2), dtype=np.int32)
+    xs = ((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.int32)
+    ys = boxes[:, 3].astype(np.int32)
+    return np.stack([xs, ys], axis=1)
+
+
+class ZoneLookup:
+    """Birden fazla adlandırılmış bölgeyi tek bir bit maskesinde tutan arama tablosu"""
+
+    def __init__(self, zones, width, height):
+        if len(zones) > 32:
+            raise ValueError("Bir kamera için en fazla 32 bölge tanımlanabilir.")
+        dtype = np.uint8 if len(zones) <= 8 else np.uint16 if len(zones) <= 16 else np.uint32
+
+        self.width = width
+        self.height = height
+        self.names = list(zones.keys())
+        self.polygons = {name: np.array(polygon, np.int32) for name, polygon in zones.items()}
+        self.mask = np.zeros((height, width), dtype=dtype)
+
+        layer = np.zeros((height, width), dtype=np.uint8)
+        for bit, name in enumerate(self.names):
+            layer[:] = 0
+            cv2.fillPoly(layer, [self.polygons[name]], 1)
+            self.mask |= layer.astype(dtype) << dtype(bit)
+
+    def lookup(self, points):
+        """Her nokta için bölge bit kodunu döndürür; kare dışındaki noktalar 0 olur"""
+        points = np.asarray(points)
+        codes = np.zeros(len(points), dtype=self.mask.dtype)
+        if len(points) == 0:
+            return codes
+        xs, ys = points[:, 0], points[:, 1]
+        inside_frame = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        codes[inside_frame] = self.mask[ys[inside_frame], xs[inside_frame]]
+        return codes
+
+    def classify(self, points):
+        """Her bölge adı için noktaların o bölgede olup olmadığını gösteren bool dizi döndürür"""
+        codes = self.lookup(points)
+        return {name: ((codes >> bit) & 1).astype(bool) for bit, name in enumerate(self.names)}
+
+    def contains(self, name, points):
+        """Noktaların tek bir bölgede olup olmadığını döndürür"""
+        bit = self.names.index(name)
+        return ((self.lookup(points) >> bit) & 1).astype(bool)
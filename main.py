@@ -1,69 +1,192 @@
 import os
+import sys
+import argparse
 import subprocess
-from multiprocessing import Process, freeze_support
+from multiprocessing import freeze_support
 import glob
 import time
 
-# Firebase istemcisini ve CRUD fonksiyonlarını main.py için import et
-from features.database.initialize_firebase import initialize_firebase
-# delete_all_documents_in_collection fonksiyonunu import et
-from features.database.firestore_crud import create_document, delete_all_documents_in_collection
-from firebase_admin import firestore # SERVER_TIMESTAMP için gerekli
+import config
+
+# Depolama arka ucu (config.STORAGE_BACKEND: firestore, sqlite veya memory)
+from features.database.storage import SERVER_TIMESTAMP, create_storage
+from features.database.history_store import new_run_id
+from features.database.retention import PROCESSING_RUNS_COLLECTION, latest_unfinished_run, start_background_purge
 
 # Video işleme fonksiyonunu import et
-from features.video_processor import process_video
+from features.video_processor import RENDER_MODES, process_video
+from features.checkpoint import video_checkpoint
+from features.exported_model import BACKEND_PYTORCH, export_model
+from features.inference_server import InferenceServer
+from features.metrics import MetricsAggregator, MetricsServer
+from features.worker_pool import VideoWorkerPool, default_max_workers, print_summary
 
 # Firestore status sabitleri (streamlit_app.py ile eşleşmeli)
 PROCESSING_STATUS_COLLECTION = "processing_status"
 PROCESSING_COMPLETE_DOC_ID = "video_analysis_status"
 WAGON_HISTORICAL_LOGS_COLLECTION = "wagon_fullness_history" # Yeni eklendi: Tarihsel log koleksiyon adı
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vagon videolarını işler ve doluluk oranlarını Firestore'a yazar")
+    parser.add_argument("--max-workers", type=int, default=config.MAX_CONCURRENT_WORKERS,
+                        help="Aynı anda çalışacak en fazla video süreci (varsayılan: fiziksel çekirdek / işçi thread sayısı)")
+    parser.add_argument("--threads-per-worker", type=int, default=config.TORCH_THREADS_PER_WORKER,
+                        help="Her video sürecinin kullanacağı PyTorch/OpenCV thread sayısı")
+    parser.add_argument("--inference-server", action=argparse.BooleanOptionalAction,
+                        default=config.INFERENCE_SERVER_ENABLED,
+                        help="Modeli tek süreçte yükleyen paylaşımlı çıkarım sunucusunu kullan")
+    parser.add_argument("--mode", choices=RENDER_MODES, default=config.RENDER_MODE,
+                        help="full: tam çizim ve kayıt, headless: sadece sayım/doluluk, preview: düşük çözünürlüklü önizleme")
+    parser.add_argument("--preview-scale", type=float, default=config.PREVIEW_SCALE,
+                        help="preview modunda çıktı videosunun çözünürlük oranı")
+    parser.add_argument("--preview-fraction", type=float, default=config.PREVIEW_FRAME_FRACTION,
+                        help="preview modunda kaydedilecek karelerin oranı")
+    parser.add_argument("--realtime", action=argparse.BooleanOptionalAction, default=config.REALTIME_MODE,
+                        help="Gerçek zamanlı mod: kaynak kendi hızında okunur, geride kalınca bayat kareler düşürülür")
+    parser.add_argument("--metrics-port", type=int,
+                        default=config.METRICS_PORT if config.METRICS_ENABLED else 0,
+                        help="Prometheus metrik uç noktasının portu (0: kapalı)")
+    parser.add_argument("--resume", action=argparse.BooleanOptionalAction,
+                        default=config.CHECKPOINT_RESUME and config.CHECKPOINT_ENABLED,
+                        help="Tamamlanmamış son çalıştırmayı kontrol noktalarından sürdür")
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
     freeze_support()
+    args = parse_args()
 
-    # main.py için Firebase istemcisini başlat (bu kritik)
-    db = initialize_firebase()
-    if not db:
-        print("🚨 HATA: Firebase istemcisi main.py içinde başlatılamadı. İşlem durumu Firestore'a yazılamayacak.")
-        exit() # Firebase bağlantısı olmadan devam etmeyelim
+    # main.py için depolama arka ucunu başlat (bu kritik)
+    # İşçi süreçleri de aynı arka ucu config.STORAGE_BACKEND'ten seçer
+    storage = create_storage()
+    if not storage:
+        print("🚨 HATA: Depolama arka ucu main.py içinde başlatılamadı. İşlem durumu yazılamayacak.")
+        exit() # Depolama bağlantısı olmadan devam etmeyelim
 
     video_files = glob.glob("data/videos/*.mp4")
 
-    # --- ESKİ TARİHSEL LOGLARI TEMİZLE ---
-    try:
-        delete_all_documents_in_collection(db, WAGON_HISTORICAL_LOGS_COLLECTION)
-    except Exception as e:
-        print(f"UYARI: Tarihsel loglar temizlenirken hata oluştu: {e}")
-    # --- TEMİZLEME BİTTİ ---
+    # Tüm işçilerin kayıtları bu çalıştırma kimliğini taşır, yerel geçmişi outputs/history/<run_id>/ altına yazılır.
+    # Eski kayıtlar başlangıçta silinmez; dashboard sadece en son çalıştırmayı oynatır.
+    # Son çalıştırma tamamlanmadıysa (işçi çöktü ya da video başarısız oldu) aynı run_id ile sürdürülür:
+    # tamamlanmış videolar atlanır, diğerleri son kontrol noktasından devam eder.
+    run_id = None
+    if args.resume:
+        try:
+            run_id = latest_unfinished_run(storage)
+        except Exception as e:
+            print(f"UYARI: Sürdürülecek çalıştırma aranırken hata oluştu: {e}")
+    resumed = run_id is not None
+    if resumed:
+        print(f"↩️ Tamamlanmamış çalıştırma sürdürülüyor: {run_id}")
+        completed_videos = [video_file for video_file in video_files
+                            if video_checkpoint(run_id, video_file,
+                                                inference_server=args.inference_server).completed_summary()]
+        if completed_videos:
+            print(f"⏭️ {len(completed_videos)} video bu çalıştırmada zaten tamamlanmış, atlanıyor: "
+                  f"{', '.join(os.path.basename(video_file) for video_file in completed_videos)}")
+        video_files = [video_file for video_file in video_files if video_file not in completed_videos]
+        try:
+            storage.update_document(PROCESSING_RUNS_COLLECTION, run_id, {"resumed_at": SERVER_TIMESTAMP})
+        except Exception as e:
+            print(f"UYARI: Çalıştırma kaydı güncellenirken hata oluştu: {e}")
+    else:
+        run_id = new_run_id()
+        print(f"🆔 Çalıştırma kimliği: {run_id}")
+        try:
+            storage.create_document(PROCESSING_RUNS_COLLECTION,
+                                    {"run_id": run_id, "started_at": SERVER_TIMESTAMP, "completed": False,
+                                     "video_count": len(video_files)},
+                                    document_id=run_id)
+        except Exception as e:
+            print(f"UYARI: Çalıştırma kaydı yazılırken hata oluştu: {e}")
+
+    # --- ESKİ ÇALIŞTIRMALARI ARKA PLANDA TEMİZLE (saklama politikası) ---
+    purge_thread = start_background_purge(storage, run_id, [WAGON_HISTORICAL_LOGS_COLLECTION],
+                                          keep_runs=config.HISTORY_RETENTION_KEEP_RUNS,
+                                          keep_days=config.HISTORY_RETENTION_KEEP_DAYS,
+                                          max_workers=config.PURGE_MAX_WORKERS)
 
     # --- İşlem başlangıcında 'completed' bayrağını FALSE olarak ayarla ---
     try:
-        create_document(db, PROCESSING_STATUS_COLLECTION, {"completed": False, "last_update_time": firestore.SERVER_TIMESTAMP}, document_id=PROCESSING_COMPLETE_DOC_ID)
+        storage.create_document(PROCESSING_STATUS_COLLECTION, {"completed": False, "run_id": run_id, "last_update_time": SERVER_TIMESTAMP}, document_id=PROCESSING_COMPLETE_DOC_ID)
         print("Firestore: Toplam video işleme başlangıcı için tamamlanma bayrağı sıfırlandı.")
     except Exception as e:
         print(f"UYARI: Firestore'a başlangıç bayrağı yazılırken hata oluştu: {e}")
     # --- DURUM SIFIRLAMA BİTTİ ---
 
 
-    print("🧵 Video işleme süreçleri başlatılıyor...")
-    processes = []
-
-    for video_file in video_files:
-        p = Process(target=process_video, args=(video_file,))
-        p.start()
-        processes.append(p)
-
+    max_workers = args.max_workers or default_max_workers(args.threads_per_worker)
+    max_workers = max(1, min(max_workers, len(video_files) or 1))
+
+    # --- PyTorch dışı arka uçta model işçiler başlamadan bir kez dışa aktarılır ---
+    # (aksi halde her işçi süreci aynı dışa aktarmayı aynı anda yapmaya çalışırdı)
+    if config.INFERENCE_BACKEND != BACKEND_PYTORCH and video_files:
+        export_model(config.MODEL_NAME, config.INFERENCE_BACKEND)
+        print(f"🧠 Çıkarım arka ucu: {config.INFERENCE_BACKEND}")
+
+    # --- İsteğe bağlı paylaşımlı çıkarım sunucusu ---
+    # Kanal sayısı video sayısına değil eşzamanlı süreç sayısına göre belirlenir
+    inference_server = None
+    if args.inference_server and video_files:
+        inference_server = InferenceServer(num_lanes=max_workers).start()
+        print("🧠 Paylaşımlı çıkarım sunucusu başlatıldı, model tek süreçte yüklenecek.")
+
+    # --- İsteğe bağlı canlı metrik uç noktası (Prometheus) ---
+    metrics_aggregator = None
+    metrics_server = None
+    if args.metrics_port:
+        metrics_aggregator = MetricsAggregator()
+        try:
+            metrics_server = MetricsServer(metrics_aggregator, config.METRICS_HOST, args.metrics_port).start()
+            print(f"📈 Metrikler: http://{config.METRICS_HOST}:{metrics_server.port}/metrics")
+        except OSError as e:
+            print(f"UYARI: Metrik uç noktası başlatılamadı ({e}), metrikler toplanmayacak.")
+            metrics_aggregator = None
 
-
-    # Video işleme süreçlerinin tamamlanmasını bekle
-    for p in processes:
-        p.join()
+    print("🧵 Video işleme süreçleri başlatılıyor...")
+    pool = VideoWorkerPool(process_video, max_workers=max_workers,
+                           threads_per_worker=args.threads_per_worker,
+                           inference_server=inference_server,
+                           metrics_aggregator=metrics_aggregator,
+                           worker_kwargs={"run_id": run_id,
+                                          "resume": resumed,
+                                          "realtime": args.realtime,
+                                          "render_mode": args.mode,
+                                          "preview_scale": args.preview_scale,
+                                          "preview_fraction": args.preview_fraction})
+    try:
+        results = pool.run(video_files)
+    finally:
+        if inference_server:
+            inference_server.stop()
+        if metrics_server:
+            metrics_server.stop()
+
+    failed_count = print_summary(results)
+
+    # Temizlik video işleme ile paralel yürür; çıkmadan önce bitmesi beklenir
+    if purge_thread.is_alive():
+        print("⏳ Eski çalıştırmaların temizliğinin bitmesi bekleniyor...")
+    purge_thread.join()
+
+    if failed_count:
+        # Başarısız video varsa 'completed' bayrağı TRUE yapılmaz, hata koduyla çıkılır
+        try:
+            storage.create_document(PROCESSING_STATUS_COLLECTION,
+                                    {"completed": False, "run_id": run_id, "failed_videos": failed_count,
+                                     "last_update_time": SERVER_TIMESTAMP},
+                                    document_id=PROCESSING_COMPLETE_DOC_ID)
+        except Exception as e:
+            print(f"UYARI: Firestore'a hata durumu yazılırken hata oluştu: {e}")
+        sys.exit(1)
 
     print("✅ Tüm video işleme tamamlandı.")
 
     # --- İşlem tamamlandıktan sonra 'completed' bayrağını TRUE olarak ayarla ---
     try:
-        create_document(db, PROCESSING_STATUS_COLLECTION, {"completed": True, "last_completion_time": firestore.SERVER_TIMESTAMP}, document_id=PROCESSING_COMPLETE_DOC_ID)
+        storage.create_document(PROCESSING_STATUS_COLLECTION, {"completed": True, "run_id": run_id, "last_completion_time": SERVER_TIMESTAMP}, document_id=PROCESSING_COMPLETE_DOC_ID)
+        storage.update_document(PROCESSING_RUNS_COLLECTION, run_id, {"completed": True, "completed_at": SERVER_TIMESTAMP})
         print("Firestore: Tüm video işleme tamamlandı bayrağı ayarlandı.")
     except Exception as e:
         print(f"UYARI: Firestore'a tamamlama bayrağı yazılırken hata oluştu: {e}")
@@ -0,0 +1,95 @@
+# recount.py
+# Tespit önbelleğinden (features/detection_cache.py) sayımı modelsiz yeniden hesaplar.
+# Sayım bölgesi, MIN_DETECTION_*, DETECTION_IOU_THRESHOLD ya da WAGON_CAPACITY değiştiğinde
+# YOLO'yu yeniden çalıştırmadan sadece filtre + bölge + sayım adımları tekrarlanır.
+# Önbellek, videonun main.py ile en az bir kez (aynı model/YOLO ayarlarıyla) işlenmesiyle oluşur.
+# Kullanım: python recount.py [--videos "data/videos/*.mp4"] [--output outputs/recount.json]
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+import config
+from features.counting import TrackedIdSet, count_people, fullness_percentage
+from features.detection_cache import DetectionCacheReader, cache_directory, is_complete
+from features.detection_filter import filter_detections
+from features.zone_lookup import COUNTING_ZONE_NAME, ZoneLookup, anchor_points, zones_for_camera
+
+
+def recount_video(reader, camera_id, width, height):
+    """Önbellekteki kareleri sırayla sayar; atlanan karelerde önceki sonuç taşınır"""
+    zone_lookup = ZoneLookup(zones_for_camera(camera_id), width, height)
+    people_tracked = TrackedIdSet()
+    fullness = np.empty(len(reader), dtype=np.float32)
+    people_in_zone = 0
+    counted = False
+    for index, (tracks, inferred) in enumerate(reader):
+        if inferred or not counted:
+            bboxes = filter_detections(tracks, width, height)
+            in_counting_zone = zone_lookup.contains(COUNTING_ZONE_NAME, anchor_points(bboxes))
+            people_in_zone, _ = count_people(bboxes, in_counting_zone, people_tracked)
+            counted = True
+        fullness[index] = fullness_percentage(len(people_tracked))
+    return {
+        "frames": len(reader),
+        "people_tracked": len(people_tracked),
+        "last_in_zone_count": people_in_zone,
+        "max_fullness": float(fullness.max()) if len(fullness) else 0.0,
+        "final_fullness": float(fullness[-1]) if len(fullness) else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tespit önbelleğinden sayımı modelsiz yeniden hesaplar")
+    parser.add_argument("--videos", default=os.path.join(config.INPUT_VIDEO_DIRECTORY, "*.mp4"))
+    parser.add_argument("--imgsz", type=int, default=None,
+                        help="Önbelleğin yazıldığı giriş boyutu (varsayılan: çıkarımın fiilen kullandığı boyut)")
+    parser.add_argument("--inference-server", action=argparse.BooleanOptionalAction,
+                        default=config.INFERENCE_SERVER_ENABLED,
+                        help="Önbellek paylaşımlı çıkarım sunucusuyla mı yazıldı (sunucu kamera profilini uygulamaz)")
+    parser.add_argument("--motion-gate", action=argparse.BooleanOptionalAction, default=config.MOTION_GATE_ENABLED,
+                        help="Önbellek hareket kapısı açıkken mi yazıldı")
+    parser.add_argument("--roi-crop", action=argparse.BooleanOptionalAction, default=config.ROI_CROP_ENABLED,
+                        help="Önbellek ROI kırpma açıkken mi yazıldı")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    video_files = sorted(glob.glob(args.videos))
+    if not video_files:
+        print(f"❌ Hata: '{args.videos}' ile eşleşen video bulunamadı.")
+        return
+
+    width, height = config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+    results = {}
+    print(f"{'video':<20}{'kare':>8}{'kare/sn':>11}{'kişi (önbellek)':>17}{'kişi (şimdi)':>14}{'en yüksek %':>13}")
+    for video_file in video_files:
+        video_name = os.path.basename(video_file)
+        camera_id = os.path.splitext(video_name)[0]
+        directory = cache_directory(video_file, args.imgsz, args.motion_gate, args.roi_crop, args.inference_server)
+        if not is_complete(directory):
+            print(f"⏭️ {video_name}: tamamlanmış tespit önbelleği yok ({directory}), önce main.py ile işleyin.")
+            continue
+
+        reader = DetectionCacheReader(directory)
+        start = time.perf_counter()
+        result = recount_video(reader, camera_id, width, height)
+        elapsed = time.perf_counter() - start
+        result["recount_fps"] = result["frames"] / elapsed if elapsed > 0 else 0.0
+        result["cached_people_tracked"] = reader.meta.get("people_tracked")
+        results[video_name] = result
+        print(f"{video_name:<20}{result['frames']:>8}{result['recount_fps']:>11.0f}"
+              f"{str(result['cached_people_tracked']):>17}{result['people_tracked']:>14}"
+              f"{result['max_fullness']:>13.1f}")
+
+    if args.output and results:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"📄 Sonuçlar yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
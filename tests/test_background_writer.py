@@ -0,0 +1,158 @@
+# tests/test_background_writer.py
+# BackgroundBatchWriter'ı bellek içi Firestore istemcisi (MemoryStorage) üzerinde dener.
+import threading
+
+import pytest
+
+from features.database.background_writer import (FIRESTORE_MAX_BATCH_SIZE, OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST,
+                                                  OVERFLOW_DROP_OLDEST, BackgroundBatchWriter)
+from features.database.storage import MemoryStorage
+
+COLLECTION = "wagon_fullness_history"
+
+
+class GatedStorage(MemoryStorage):
+    """Commit'i gate açılana kadar bekletir; yazıcı thread'i meşgulken kuyruk doldurulabilsin diye"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+
+    def create_documents(self, collection_name, records):
+        self.entered.set()
+        self.gate.wait(5)
+        return super().create_documents(collection_name, records)
+
+
+class FlakyStorage(MemoryStorage):
+    """İlk commit'te hata verir, sonrakileri yazar"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def create_documents(self, collection_name, records):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("deadline exceeded")
+        return super().create_documents(collection_name, records)
+
+
+def written_values(storage):
+    return sorted(data["i"] for data in storage.get_all_documents(COLLECTION).values())
+
+
+def test_commits_are_split_at_max_batch_size():
+    storage = MemoryStorage()
+    writer = BackgroundBatchWriter(storage, COLLECTION, max_batch_size=3, flush_interval_seconds=60)
+    for i in range(7):
+        writer.submit({"i": i})
+    writer.close()
+
+    assert written_values(storage) == list(range(7))
+    assert storage.client.commit_count == 3  # 3 + 3 + kapanışta 1
+    assert writer.stats["batches"] == 3
+
+
+def test_max_batch_size_is_capped_at_firestore_limit():
+    writer = BackgroundBatchWriter(MemoryStorage(), COLLECTION, max_batch_size=FIRESTORE_MAX_BATCH_SIZE * 2)
+    writer.close()
+    assert writer.max_batch_size == FIRESTORE_MAX_BATCH_SIZE
+
+
+def fill_while_busy(policy, block_timeout_seconds=0.05):
+    """Yazıcı ilk kaydın commit'inde beklerken 2 kayıtlık kuyruğu doldurur, sonra bir kayıt daha gönderir"""
+    storage = GatedStorage()
+    writer = BackgroundBatchWriter(storage, COLLECTION, max_batch_size=1, flush_interval_seconds=60,
+                                   queue_size=2, overflow_policy=policy,
+                                   block_timeout_seconds=block_timeout_seconds)
+    writer.submit({"i": 0})
+    assert storage.entered.wait(5)
+    assert writer.submit({"i": 1})
+    assert writer.submit({"i": 2})
+    return storage, writer
+
+
+def test_drop_newest_rejects_the_new_record():
+    storage, writer = fill_while_busy(OVERFLOW_DROP_NEWEST)
+    assert not writer.submit({"i": 3})
+    storage.gate.set()
+    writer.close()
+
+    assert written_values(storage) == [0, 1, 2]
+    assert writer.stats["dropped"] == 1
+
+
+def test_drop_oldest_replaces_the_oldest_queued_record():
+    storage, writer = fill_while_busy(OVERFLOW_DROP_OLDEST)
+    assert writer.submit({"i": 3})
+    storage.gate.set()
+    writer.close()
+
+    assert written_values(storage) == [0, 2, 3]
+    assert writer.stats["dropped"] == 1
+
+
+def test_block_drops_after_timeout():
+    storage, writer = fill_while_busy(OVERFLOW_BLOCK)
+    assert not writer.submit({"i": 3})
+    storage.gate.set()
+    writer.close()
+
+    assert written_values(storage) == [0, 1, 2]
+    assert writer.stats["dropped"] == 1
+
+
+def test_block_waits_for_space():
+    storage, writer = fill_while_busy(OVERFLOW_BLOCK, block_timeout_seconds=5)
+    release = threading.Timer(0.1, storage.gate.set)
+    release.start()
+    assert writer.submit({"i": 3})
+    writer.close()
+    release.join()
+
+    assert written_values(storage) == [0, 1, 2, 3]
+    assert writer.stats["dropped"] == 0
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        BackgroundBatchWriter(MemoryStorage(), COLLECTION, overflow_policy="spill")
+
+
+def test_close_writes_everything_queued():
+    storage = MemoryStorage()
+    writer = BackgroundBatchWriter(storage, COLLECTION, max_batch_size=100, flush_interval_seconds=60)
+    for i in range(10):
+        writer.submit({"i": i})
+    writer.close()
+
+    assert written_values(storage) == list(range(10))
+    assert storage.client.commit_count == 1
+    with pytest.raises(RuntimeError):
+        writer.submit({"i": 10})
+
+
+def test_flush_commits_submitted_records():
+    storage = MemoryStorage()
+    writer = BackgroundBatchWriter(storage, COLLECTION, max_batch_size=100, flush_interval_seconds=60)
+    writer.submit({"i": 0})
+    assert writer.flush(timeout=5)
+    assert written_values(storage) == [0]
+    writer.close()
+
+
+def test_failed_commit_is_counted_and_thread_keeps_running():
+    storage = FlakyStorage()
+    writer = BackgroundBatchWriter(storage, COLLECTION, max_batch_size=100, flush_interval_seconds=60)
+    writer.submit({"i": 0})
+    assert writer.flush(timeout=5)
+    writer.submit({"i": 1})
+    writer.close(timeout=5)
+
+    assert not writer._thread.is_alive()
+    assert written_values(storage) == [1]
+    assert writer.stats["failed_batches"] == 1
+    assert writer.stats["failed_records"] == 1
+    assert writer.stats["written"] == 1
@@ -0,0 +1,127 @@
+# tests/test_coalescing_writer.py
+# CoalescingWriter'ı bellek içi Firestore istemcisi (MemoryStorage) ve elle ilerletilen saatle dener.
+from features.database.coalescing_writer import CoalescingWriter
+from features.database.storage import MemoryStorage
+
+COLLECTION = "wagon_fullness_current"
+WAGON = "wagon1"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingStorage(MemoryStorage):
+    """failing True iken create_document başarısız olur (None döndürür), denemeler sayılır"""
+
+    def __init__(self):
+        super().__init__()
+        self.failing = False
+        self.attempts = 0
+
+    def create_document(self, collection_name, data, document_id=None):
+        self.attempts += 1
+        if self.failing:
+            return None
+        return super().create_document(collection_name, data, document_id=document_id)
+
+
+def make_writer(storage=None):
+    clock = FakeClock()
+    storage = storage or MemoryStorage()
+    writer = CoalescingWriter(storage, COLLECTION, min_interval_seconds=1.0, heartbeat_seconds=10.0, clock=clock)
+    return writer, storage, clock
+
+
+def publish(writer, value):
+    return writer.publish(WAGON, {"fullness_percentage": value}, value)
+
+
+def stored_value(storage):
+    document = storage.get_document(COLLECTION, WAGON)
+    return document["fullness_percentage"] if document else None
+
+
+def test_unchanged_value_is_suppressed_until_heartbeat():
+    writer, storage, clock = make_writer()
+    assert publish(writer, 10.0)
+    clock.now = 5.0
+    assert not publish(writer, 10.0)
+    clock.now = 10.0
+    assert publish(writer, 10.0)
+
+    assert writer.stats["published"] == 2
+    assert writer.stats["heartbeats"] == 1
+    assert writer.stats["suppressed_unchanged"] == 1
+
+
+def test_rate_limited_value_is_written_by_flush():
+    writer, storage, clock = make_writer()
+    publish(writer, 10.0)
+    clock.now = 0.2
+    assert not publish(writer, 20.0)
+    clock.now = 0.4
+    assert not publish(writer, 30.0)
+    writer.flush()
+
+    assert stored_value(storage) == 30.0
+    assert writer.pending == {}
+    assert writer.stats["suppressed_rate_limited"] == 2
+
+
+def test_rate_limited_value_is_written_by_next_publish():
+    writer, storage, clock = make_writer()
+    publish(writer, 10.0)
+    clock.now = 0.5
+    publish(writer, 20.0)
+    clock.now = 1.0
+    assert publish(writer, 30.0)
+    assert stored_value(storage) == 30.0
+
+
+def test_revert_to_published_value_drops_stale_pending():
+    writer, storage, clock = make_writer()
+    publish(writer, 10.0)
+    clock.now = 0.2
+    publish(writer, 20.0)  # Hız limiti yüzünden bekler
+    clock.now = 0.4
+    publish(writer, 10.0)  # Yayınlanmış değere geri döndü
+    writer.flush()
+
+    assert stored_value(storage) == 10.0
+    assert writer.stats["published"] == 1
+
+
+def test_failed_write_is_rate_limited_and_retried_by_flush():
+    writer, storage, clock = make_writer(FailingStorage())
+    storage.failing = True
+    assert not publish(writer, 10.0)
+    for step in range(1, 9):
+        clock.now = step * 0.1
+        assert not publish(writer, 10.0 + step)
+    # Başarısız deneme de hız limitine sayılır: arızalı arka uca kare başına yazılmaz
+    assert storage.attempts == 1
+    assert writer.stats["failed"] == 1
+
+    storage.failing = False
+    writer.flush()
+    assert stored_value(storage) == 18.0
+    assert writer.pending == {}
+
+
+def test_failed_flush_keeps_value_pending():
+    writer, storage, clock = make_writer(FailingStorage())
+    publish(writer, 10.0)
+    clock.now = 0.5
+    publish(writer, 20.0)
+    storage.failing = True
+    writer.flush()
+    assert writer.pending[WAGON][1] == 20.0
+
+    storage.failing = False
+    writer.flush()
+    assert stored_value(storage) == 20.0
@@ -0,0 +1,64 @@
+# tests/test_firestore_crud.py
+# Sayfalı delete_query_results'ı bellek içi Firestore istemcisi üzerinde dener.
+import pytest
+
+from features.database import memory_client
+from features.database.firestore_crud import delete_query_results
+from features.database.memory_client import InMemoryFirestoreClient
+
+COLLECTION = "wagon_fullness_history"
+
+
+def seeded_client(old_count, new_count):
+    client = InMemoryFirestoreClient()
+    collection = client.collection(COLLECTION)
+    for i in range(old_count):
+        collection.add({"run_id": "old", "i": i})
+    for i in range(new_count):
+        collection.add({"run_id": "new", "i": i})
+    return client
+
+
+@pytest.fixture
+def page_limits(monkeypatch):
+    """Sorgulara verilen limit() değerlerini kaydeder"""
+    limits = []
+    original = memory_client.Query.limit
+
+    def limit(self, count):
+        limits.append(count)
+        return original(self, count)
+
+    monkeypatch.setattr(memory_client.Query, "limit", limit)
+    return limits
+
+
+@pytest.mark.parametrize("old_count", [0, 7, 40, 95])
+def test_deletes_only_matching_documents(old_count):
+    client = seeded_client(old_count, 5)
+    query = client.collection(COLLECTION).where("run_id", "==", "old")
+
+    deleted = delete_query_results(client, query, batch_size=10, max_workers=2)
+
+    assert deleted == old_count
+    remaining = [snapshot.to_dict() for snapshot in client.collection(COLLECTION).stream()]
+    assert sorted(data["i"] for data in remaining) == list(range(5))
+    assert all(data["run_id"] == "new" for data in remaining)
+
+
+def test_reads_in_bounded_pages(page_limits):
+    # 40 doküman, sayfa 20: iki dolu sayfa + boş sayfayla biten sorgu
+    client = seeded_client(40, 0)
+    deleted = delete_query_results(client, client.collection(COLLECTION), batch_size=10, max_workers=2)
+
+    assert deleted == 40
+    assert page_limits == [20, 20, 20]
+    assert client.commit_count == 4
+
+
+def test_partial_last_page_stops_without_extra_query(page_limits):
+    client = seeded_client(25, 0)
+    deleted = delete_query_results(client, client.collection(COLLECTION), batch_size=10, max_workers=2)
+
+    assert deleted == 25
+    assert page_limits == [20, 20]